@@ -27,11 +27,41 @@
 #                    parameter to allow script to continue running in case of region connectivity issues.
 #                    Without "--ignore_conn_err", script will crash during connection errors. Moved
 #                    subset of test regions constant to aws_cleanup.py.
+#  2026.10.19 - ag - CloudFormation stacks deleted first, concurrently per region; exporting stacks after importers.
+#  2026.10.19 - ag - Added bulkDelete (batch or bounded parallel deletes) for Key Pairs, Alarms, Log Groups, Config Rules, SNS.
+#  2026.10.19 - ag - Assessment Targets: paginated, described in batches of 10; regions without Inspector skipped.
+#  2026.10.19 - ag - Added dependIndexClass: one dependency sweep per region for the SG/Subnet/Route Table/VPC warnings.
+#  2026.10.19 - ag - Added delete journal and "--resume JOURNAL"; inventory moved into inventoryRegion()/inventoryGlobal().
+#  2026.10.19 - ag - Default VPC rebuild regions come from the inventory; rebuild runs concurrently across regions.
+#  2026.10.19 - ag - termTrack is now a termTrackClass of termRecord items; fixed the Instance Profile assignment.
+#  2026.10.19 - ag - Added progressClass and "--progress": live status line / log lines for inventory and delete.
+#  2026.10.19 - ag - Added "--stream" (per-region report rows as scanned) and "--final_report".
+#  2026.10.19 - ag - Added "--watch INTERVAL": rescans on watchSchedule and prints changes; items kept in invTrack.
+#  2026.10.19 - ag - Added "--serve PORT": inventory as JSON over HTTP on 127.0.0.1, refreshed after serveCacheTTL.
+#  2026.10.19 - ag - Added metricsClass and "--metrics FILE": Prometheus textfile metrics (also /metrics with --serve).
+#  2026.10.19 - ag - Added "--history DB" (SQLite inventory history) and the "query" subcommand.
+#  2026.10.19 - ag - Added "--shard i/N" shard files and the "merge" subcommand (combined report, delete plan).
+#  2026.10.19 - ag - Connect/read timeouts, bounded retries and a per service/region circuit breaker (connBreakerClass).
+#  2026.10.19 - ag - Added AMIs and Snapshots; AMIs deregistered before their snapshots are deleted.
+#  2026.10.19 - ag - Added NAT Gateways, Elastic IPs, Network Interfaces, deleted in the background by netTeardownClass.
+#  2026.10.19 - ag - Volumes deleted by volumeTeardown(): batched state polls per region, concurrent deletes.
+#  2026.10.19 - ag - Account/region metadata cached per account (metaCacheFile, metaCacheTTL); added "--refresh_cache".
+#  2026.10.19 - ag - Added "--preflight [drop]": permission check with iam:SimulatePrincipalPolicy before the inventory.
+#  2026.10.19 - ag - Added "--summary": item count matrix per component and region.
+#  2026.10.19 - ag - S3 bucket regions resolved concurrently; bucket sizes from CloudWatch; largest buckets purged first.
+#  2026.10.19 - ag - Added "--trace FILE": Chrome trace of scans, API calls and delete stages.
+#  2026.10.19 - ag - Added "--deadline MINUTES" with deadlinePriority scan order and deadlineReserve cut-off.
+#  2026.10.19 - ag - Added verifyDeletes(): planned deletes looked up again by ID after the delete phase.
 import sys
 import os
 import re
 import random
+import json
 import signal
+import atexit
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 try:
   import boto3
 except ImportError as e:
@@ -41,19 +71,40 @@ except ImportError as e:
 import argparse
 import io
 import textwrap
-from botocore.exceptions import ClientError,NoCredentialsError,EndpointConnectionError
+import sqlite3
+import zlib
+import http.server
+import socketserver
+from urllib.parse import urlparse, parse_qs, quote
+from botocore.exceptions import ClientError,NoCredentialsError,EndpointConnectionError,ConnectTimeoutError,ReadTimeoutError
+from botocore.config import Config
 from collections import deque,defaultdict,namedtuple    # used for initializing nested dictionaries
 try:
   from aws_cleanup_import import constantKeepTag, regionTestSubset, componentDef, awsComponentClass, aws_cleanup_import_ver
+  from aws_cleanup_import import regionMaxWorkers, deleteMaxWorkers, cfnPollInterval, cfnTimeout
+  from aws_cleanup_import import progressInterval, progressLogInterval, watchSchedule, serveCacheTTL
+  from aws_cleanup_import import awsConnectTimeout, awsReadTimeout, awsMaxAttempts, connBreakerThreshold
+  from aws_cleanup_import import netPollInterval, netTimeout, volPollInterval, volTimeout, journalSyncInterval
+  from aws_cleanup_import import metaCacheFile, metaCacheTTL
+  from aws_cleanup_import import deadlinePriority, deadlineReserve
 except ImportError:
   print('ERROR: aws_cleanup_import.py is missing. This file is required')
   exit(1)
+#  shutdownEvent - set on ctrl-c so background workers stop polling and the script can exit.
+shutdownEvent = threading.Event()
+deleteJournal = None
+progress = None
 def signal_handler(sig, frame):
+        if progress:
+          progress.stop()
         print('\nTERMINATING SCRIPT')
+        if deleteJournal:
+          print('Completed deletes are recorded in {0}; continue with "--resume {0}"'.format(deleteJournal.path))
+        shutdownEvent.set()
         sys.exit(0)
 signal.signal(signal.SIGINT, signal_handler)
 
-aws_cleanup_main_ver = 2.10
+aws_cleanup_main_ver = 2.21
 if aws_cleanup_import_ver != aws_cleanup_main_ver:
   print('WARNING: incorrect version of aws_cleanup_import.py file (version number is {0}; expected {1}).'.format(aws_cleanup_import_ver, aws_cleanup_main_ver))
   ign = input('Press enter to continue: ')
@@ -85,7 +136,7 @@ def chkRouteTablesAssociations(parRouteId, parScriptArg, parRegion):
   #  Digging through the route table associations to see if the route table is set as 'Main' 
   #  was repeated in a couple areas - easier to have as a function and include any
   #  associated subnets.
-  clientEC2Route = boto3.client('ec2', region_name=parRegion)
+  clientEC2Route = awsClient('ec2', parRegion)
   RouteTableIsMain = False
   RouteTableSubnets = []
 
@@ -135,6 +186,8 @@ class awsRpt:
     #  self.regionBreak variables - used for tracking when the region changes.
     self.regionBreak_newRpt = True
     self.reportBreak_colValueTrack = None
+    #  self.streamPos - offset in self.outputRpt of the rows not yet returned by streamf().
+    self.streamPos = 0
 
     #  Remove column headers with the value of "None".
     while None in self.headerList:
@@ -227,6 +280,31 @@ class awsRpt:
     else:
       return ""
 
+  def reset(self):
+    #  Drops all rows (watch mode rescans report from scratch).
+    self.outputRpt = ""
+    self.rows = 0
+    self.streamPos = 0
+    self.reportBreak_colValueTrack = None
+
+  def streamf(self, parKeep=False):
+    #  streamf - same format as resultf(), for only the rows added since the previous streamf()
+    #    call. The streamed rows are dropped from the report unless parKeep is set (needed
+    #    when resultf() is also wanted at the end).
+    streamRpt = self.outputRpt[self.streamPos:].lstrip('\n')
+    #  A region break at the start of the streamed rows is already shown by the header.
+    if streamRpt.startswith(self.lines):
+      streamRpt = streamRpt[len(self.lines):].lstrip('\n')
+    if parKeep:
+      self.streamPos = len(self.outputRpt)
+    else:
+      self.outputRpt = ""
+      self.rows = 0
+    if streamRpt:
+      return "\n{0}\n{1}\n{2}\n{3}\n{4}\n{5}\n\n".format(self.title, self.lines, self.header, self.lines, streamRpt, self.lines)
+    else:
+      return ""
+
 def tupleVal(parChkVal):
   #  As itemsKeep is processed as a tuple, added tupleVal function to reduce operating
   #  instructions and confusion, where ('abc') is a string and ('abc',) is a tuple.
@@ -299,15 +377,1842 @@ class tagScan:
       if parScriptArg.del_all:
         self.delThisItem = True
 
-argUsage = "usage: aws_cleanup.py -[h][--del][--vpc_rebuild][--ignore_conn_err]"
+class termRecord:
+  #  termRecord - one AWS item in-scope for termination/deletion. __slots__ keeps the per-item
+  #    footprint small for accounts with 100k+ items.
+  #      display: display name for messages (defaults to the id)
+  #      vpcId: parent VPC (Route Tables, Subnets, Internet Gateways)
+  #      isDefault: default VPC; isAwsService: service-linked role
+  #      state: 'planned', 'terminating' (EC2 terminate issued) or 'deleted'
+  __slots__ = ('component', 'region', 'id', 'display', 'vpcId', 'isDefault', 'isAwsService', 'state')
+  fieldList = ('display', 'vpcId', 'isDefault', 'isAwsService', 'state')
+
+  def __init__(self, parComponent, parRegion, parId, display=None, vpcId=None, isDefault=False, isAwsService=False, state='planned'):
+    self.component = parComponent
+    self.region = parRegion
+    self.id = parId
+    self.display = display or parId
+    self.vpcId = vpcId
+    self.isDefault = isDefault
+    self.isAwsService = isAwsService
+    self.state = state
+
+  def fields(self):
+    return dict((fieldName, getattr(self, fieldName)) for fieldName in self.fieldList)
+
+class termTrackClass:
+  #  termTrackClass - items in-scope for termination/deletion, indexed by component, then
+  #    region (None for global components), then id. The same shape is used for every
+  #    component. add() is locked so scanners in different threads can insert at the same time.
+  def __init__(self):
+    self.lock = threading.Lock()
+    self.items = {}
+    self.itemCount = 0
+
+  def add(self, parComponent, parRegion, parId, **parFields):
+    with self.lock:
+      idDict = self.items.setdefault(parComponent, {}).setdefault(parRegion, {})
+      if parId not in idDict:
+        self.itemCount += 1
+      idDict[parId] = termRecord(parComponent, parRegion, parId, **parFields)
+      return idDict[parId]
+
+  def lookup(self, parComponent, parRegion, parId):
+    return self.items.get(parComponent, {}).get(parRegion, {}).get(parId)
+
+  def byRegion(self, parComponent):
+    #  {region: {id: termRecord}} for one component, sorted by region.
+    return dict(sorted(self.items.get(parComponent, {}).items(), key=lambda x: x[0] or ''))
+
+  def ids(self, parComponent, parRegion=None):
+    #  {id: termRecord} for one component and region (global components: region None).
+    return self.items.get(parComponent, {}).get(parRegion, {})
+
+  def count(self, parComponent):
+    return sum(len(idDict) for idDict in self.items.get(parComponent, {}).values())
+
+  def drop(self, parComponent):
+    #  Takes a component out of the run ("--deadline"); the delete stages skip it.
+    with self.lock:
+      self.itemCount -= sum(len(idDict) for idDict in self.items.pop(parComponent, {}).values())
+
+  def components(self):
+    return list(self.items)
+
+  def records(self):
+    for compItems in list(self.items.values()):
+      for idDict in list(compItems.values()):
+        for record in list(idDict.values()):
+          yield record
+
+  def setState(self, parComponent, parRegion, parId, parState):
+    record = self.lookup(parComponent, parRegion, parId)
+    if record:
+      record.state = parState
+
+  def __contains__(self, parComponent):
+    return parComponent in self.items
+
+  def __len__(self):
+    return self.itemCount
+
+class invTrackClass:
+  #  invTrackClass - every item found by the latest scan of each component/region, kept items
+  #    included: {(component, region): {id: (keep, row)}}, region None for global components.
+  #    row is the item's report row (awsRpt columns). Items from a scan are staged with
+  #    begin()/add(), and commit() replaces the previous scan of the same component/region -
+  #    except when the scan failed (fail()), so a connection error doesn't look like a delete.
+  #    scanTime is the time of the latest scan attempt, failed or not; lastFailed holds the
+  #    component/regions whose latest attempt failed (their items are from an older scan).
+  def __init__(self):
+    self.lock = threading.Lock()
+    self.items = {}
+    self.scanTime = {}
+    self.pending = {}
+    self.failed = set()
+    self.lastFailed = set()
+
+  def begin(self, parComponent, parRegion):
+    with self.lock:
+      self.pending[(parComponent, parRegion)] = {}
+
+  def add(self, parComponent, parRegion, parId, parKeep, parRow):
+    #  parRow is the awsRpt.addLine() argument list; the report break flag is dropped.
+    with self.lock:
+      self.pending.setdefault((parComponent, parRegion), {})[parId] = (bool(parKeep), tuple(parRow[1:]))
+    progress.itemFound()
+
+  def fail(self, parComponent, parRegion):
+    with self.lock:
+      self.failed.add((parComponent, parRegion))
+
+  def query(self, parComponent=None, parRegion=None, parKeep=None):
+    #  Items as JSON-ready dicts, with the report columns as "fields". None = no filter.
+    retItems = []
+    with self.lock:
+      itemList = [(scanKey, dict(idDict)) for scanKey, idDict in self.items.items()]
+    for (compDef, currentRegion), idDict in sorted(itemList, key=lambda x: (componentKey[x[0][0]], x[0][1] or '')):
+      if (parComponent and compDef is not parComponent) or (parRegion and currentRegion != parRegion):
+        continue
+      colTitles = [col[0] for col in componentRpt[compDef].headerList]
+      for id, (keep, row) in idDict.items():
+        if parKeep is None or keep == parKeep:
+          retItems.append({'component': componentKey[compDef], 'region': currentRegion, 'id': id, 'keep': keep,
+                           'fields': dict(zip(colTitles, [x for x in row if x is not None]))})
+    return retItems
+
+  def oldestScan(self):
+    with self.lock:
+      return min(self.scanTime.values()) if self.scanTime else 0
+
+  def failedScans(self):
+    #  Component/regions whose latest scan failed, as JSON-ready dicts.
+    with self.lock:
+      return [{'component': componentKey[compDef], 'region': currentRegion} for compDef, currentRegion in sorted(self.lastFailed, key=lambda x: (componentKey[x[0]], x[1] or ''))]
+
+  def commit(self):
+    #  Returns the changes from the previous scans as [(event, component, region, id)], event
+    #  'added', 'removed' or 'changed'. A component/region scanned for the first time has no events.
+    retEvents = []
+    with self.lock:
+      for scanKey, newItems in self.pending.items():
+        if scanKey in self.failed:
+          continue
+        oldItems = self.items.get(scanKey)
+        if oldItems is not None:
+          for id, idDetail in newItems.items():
+            if id not in oldItems:
+              retEvents.append(('added',) + scanKey + (id,))
+            elif oldItems[id] != idDetail:
+              retEvents.append(('changed',) + scanKey + (id,))
+          for id in oldItems:
+            if id not in newItems:
+              retEvents.append(('removed',) + scanKey + (id,))
+        self.items[scanKey] = newItems
+        self.scanTime[scanKey] = time.time()
+      #  A failed attempt counts as a scan for the age (so the --serve cache doesn't rescan on
+      #  every request while an endpoint is down), and is flagged until a scan succeeds.
+      for scanKey in self.failed:
+        self.scanTime[scanKey] = time.time()
+      self.lastFailed = (self.lastFailed - set(self.pending)) | self.failed
+      self.pending = {}
+      self.failed = set()
+    return retEvents
+
+#  Every client fails fast on an unreachable or degraded endpoint (botocore defaults: 60 second
+#  timeouts, retried) - awsConnErrors are the errors counted by connBreaker.
+awsConfig = Config(connect_timeout=awsConnectTimeout, read_timeout=awsReadTimeout, retries={'max_attempts': awsMaxAttempts, 'mode': 'standard'})
+awsConnErrors = (EndpointConnectionError, ConnectTimeoutError, ReadTimeoutError)
+
+class connBreakerClass:
+  #  connBreakerClass - circuit breaker per (service, region) endpoint. After parThreshold
+  #    connection errors the endpoint is open: its remaining scans are skipped instead of each
+  #    one waiting for its own timeouts. failed holds the components not inventoried,
+  #    {(component, region): reason}, listed under the inventory report.
+  def __init__(self, parThreshold):
+    self.lock = threading.Lock()
+    self.threshold = parThreshold
+    self.errorCount = defaultdict(int)
+    self.failed = {}
+
+  def isOpen(self, parService, parRegion):
+    with self.lock:
+      return self.errorCount[(parService, parRegion)] >= self.threshold
+
+  def error(self, parService, parRegion, parComponent, parReason):
+    with self.lock:
+      self.errorCount[(parService, parRegion)] += 1
+      self.failed[(parComponent, parRegion)] = parReason
+
+  def skip(self, parComponent, parRegion):
+    with self.lock:
+      self.failed[(parComponent, parRegion)] = 'skipped, endpoint failed'
+
+  def reset(self, parComponents=None):
+    #  Before a rescan: endpoints get another chance, and the rescanned components are cleared.
+    with self.lock:
+      self.errorCount.clear()
+      for compDef, currentRegion in list(self.failed):
+        if parComponents is None or compDef in parComponents:
+          del self.failed[(compDef, currentRegion)]
+
+  def report(self):
+    with self.lock:
+      failedList = sorted(self.failed.items(), key=lambda x: (x[0][1] or '', x[0][0].compName))
+    if not failedList:
+      return ''
+    output = '\nWARNING: the following components were not inventoried (connection errors):\n'
+    for (compDef, currentRegion), reason in failedList:
+      output += '  {0:16}{1} - {2}\n'.format(currentRegion or 'global', compDef.compName, reason)
+    return output + '\n'
+
+class deadlineClass:
+  #  deadlineClass - "--deadline MINUTES": time budget for the run. A work unit (a component's
+  #    scan in a region, a delete stage) is only started while more than deadlineReserve seconds
+  #    are left; units already running are finished. undone holds what wasn't started:
+  #    {('inventory'|'delete', component): [regions or item counts]}, listed by report().
+  def __init__(self, parMinutes):
+    self.lock = threading.Lock()
+    self.minutes = parMinutes
+    self.endTime = time.time() + parMinutes * 60 if parMinutes else None
+    self.reached = False
+    self.undone = defaultdict(list)
+
+  def expired(self):
+    if self.endTime is None or time.time() < self.endTime - deadlineReserve:
+      return False
+    with self.lock:
+      if not self.reached:
+        self.reached = True
+        print('\nDEADLINE: less than {0} seconds left - finishing the work in progress, nothing new is started\n'.format(deadlineReserve))
+    return True
+
+  def order(self):
+    #  Components in deadlinePriority order, then the others in inventory (report) order.
+    priorityList = [getattr(awsComponent, x) for x in deadlinePriority if type(getattr(awsComponent, x, None)) is componentDef]
+    return priorityList + [x for x in componentRpt if x not in priorityList]
+
+  def skipScan(self, parComponent, parRegion):
+    with self.lock:
+      self.undone[('inventory', parComponent)].append(parRegion or 'global')
+
+  def startStage(self, *parComponents):
+    #  False once the deadline is reached: the components' items are taken out of termTrack
+    #  (they stay in the delete journal, for --resume) and listed as undone.
+    if not self.expired():
+      return True
+    for compDef in parComponents:
+      itemCount = termTrack.count(compDef)
+      if itemCount:
+        termTrack.drop(compDef)
+        with self.lock:
+          self.undone[('delete', compDef)].append(itemCount)
+    return False
+
+  def report(self, parPhase):
+    with self.lock:
+      undoneList = [x for x in self.undone.items() if x[0][0] == parPhase]
+    if not undoneList:
+      return ''
+    output = '\nDEADLINE ({0} minutes) - {1} not started:\n'.format(self.minutes, parPhase)
+    for (phase, compDef), undoneDetail in undoneList:
+      if phase == 'inventory':
+        output += '  {0:10}{1} - {2}\n'.format(phase, compDef.compName, ', '.join(undoneDetail))
+      else:
+        output += '  {0:10}{1} - {2} item(s)\n'.format(phase, compDef.compName, sum(undoneDetail))
+    return output + '\n'
+
+#  boto3 clients can be shared between threads, but creating them from the default session
+#  isn't thread safe. awsClient creates clients under a lock and keeps one per service/region.
+awsClientLock = threading.Lock()
+awsClientCache = {}
+def awsClient(parService, parRegion=None):
+  with awsClientLock:
+    if (parService, parRegion) not in awsClientCache:
+      awsClientCache[(parService, parRegion)] = boto3.client(parService, region_name=parRegion, config=awsConfig)
+    return awsClientCache[(parService, parRegion)]
+
+def fmtBytes(parBytes):
+  for unit in ('B', 'KB', 'MB', 'GB', 'TB'):
+    if parBytes < 1024 or unit == 'TB':
+      return '{0:.0f} {1}'.format(parBytes, unit) if unit == 'B' else '{0:.1f} {1}'.format(parBytes, unit)
+    parBytes /= 1024.0
+
+def fmtSeconds(parSeconds):
+  parSeconds = int(parSeconds)
+  return '{0}:{1:02d}:{2:02d}'.format(parSeconds // 3600, parSeconds // 60 % 60, parSeconds % 60)
+
+class progressOutClass:
+  #  progressOutClass - stands in for sys.stdout while progress is shown, so the status line
+  #    is cleared before regular output is written over it, and progress isn't written into
+  #    the middle of a partial line.
+  def __init__(self, parProgress, parStream):
+    self.progress = parProgress
+    self.stream = parStream
+    self.atLineStart = True
+
+  def write(self, parText):
+    with self.progress.lock:
+      self.progress.clearLine()
+      retVal = self.stream.write(parText)
+      if parText:
+        self.atLineStart = parText.endswith('\n')
+      return retVal
+
+  def __getattr__(self, parName):
+    return getattr(self.stream, parName)
+
+class progressClass:
+  #  progressClass - live status during the inventory and delete phases, so a slow run can be
+  #    told apart from a hung one:
+  #      inventory: regions done, region/component being scanned, items found (and per second)
+  #      delete: items deleted out of the plan, delete rate and ETA
+  #      both: API calls in flight and total, counted from botocore's before-call/after-call
+  #            events on the default session (every client created from it is included)
+  #    parMode 'line' redraws one status line on stderr every progressInterval seconds; 'log'
+  #    prints a progress line every progressLogInterval seconds (for output going to a file or
+  #    pipe); 'off' disables it. 'auto' picks 'line' on a terminal, 'log' otherwise.
+  def __init__(self, parMode='off'):
+    #  RLock: stop() may run from the ctrl-c handler while the main thread is writing output.
+    self.lock = threading.RLock()
+    if parMode == 'auto':
+      parMode = 'line' if sys.stdout.isatty() and sys.stderr.isatty() else 'log'
+    self.mode = parMode
+    self.phase = None
+    self.stopEvent = threading.Event()
+    self.thread = None
+    self.lineShown = False
+    self.out = None
+    self.apiInFlight = 0
+    self.apiCalls = 0
+    self.itemsFound = 0
+    self.regionTotal = 0
+    self.regionsDone = 0
+    self.regionUnit = 'regions'
+    self.scanningNow = {}
+    self.deleteTotal = 0
+    self.deleteDone = 0
+    self.phaseStart = time.time()
+
+  def hookSession(self, parSession):
+    parSession.events.register('before-call', self.apiStart)
+    parSession.events.register('after-call', self.apiEnd)
+    parSession.events.register('after-call-error', self.apiEnd)
+
+  def apiStart(self, **kwargs):
+    with self.lock:
+      self.apiInFlight += 1
+      self.apiCalls += 1
+
+  def apiEnd(self, **kwargs):
+    with self.lock:
+      self.apiInFlight = max(0, self.apiInFlight - 1)
+
+  def itemFound(self):
+    with self.lock:
+      self.itemsFound += 1
+
+  def itemDeleted(self):
+    with self.lock:
+      self.deleteDone += 1
+
+  def scanning(self, parRegion, parComponent):
+    with self.lock:
+      self.scanningNow[parRegion or 'global'] = parComponent.compName
+
+  def regionDone(self, parRegion):
+    with self.lock:
+      self.scanningNow.pop(parRegion or 'global', None)
+      self.regionsDone += 1
+
+  def startInventory(self, parRegionTotal, parUnit='regions'):
+    #  "--deadline" counts (component, region) units instead of regions.
+    self.regionTotal = parRegionTotal
+    self.regionUnit = parUnit
+    self.regionsDone = 0
+    self.itemsFound = 0
+    self.start('inventory')
+
+  def startDelete(self, parDeleteTotal):
+    self.deleteTotal = parDeleteTotal
+    self.deleteDone = 0
+    self.start('delete')
+
+  def start(self, parPhase):
+    self.phase = parPhase
+    self.phaseStart = time.time()
+    if self.mode == 'off' or self.thread:
+      return
+    self.out = progressOutClass(self, sys.stdout)
+    sys.stdout = self.out
+    self.stopEvent.clear()
+    self.thread = threading.Thread(target=self.run, daemon=True)
+    self.thread.start()
+
+  def stop(self):
+    #  Called before any input() prompt and at the end of a phase.
+    if not self.thread:
+      return
+    self.stopEvent.set()
+    self.thread.join()
+    self.thread = None
+    with self.lock:
+      self.clearLine()
+      sys.stdout = self.out.stream
+      self.out = None
+    if self.mode == 'log':
+      print('[progress] {0}'.format(self.status()))
+
+  def clearLine(self):
+    #  Caller holds self.lock.
+    if self.lineShown:
+      sys.stderr.write('\r\033[K')
+      sys.stderr.flush()
+      self.lineShown = False
+
+  def status(self):
+    elapsed = max(time.time() - self.phaseStart, 0.001)
+    if self.phase == 'inventory':
+      retVal = 'Inventory: {0}/{1} {2}'.format(self.regionsDone, self.regionTotal, self.regionUnit)
+      if self.scanningNow:
+        retVal += ' ({0})'.format(', '.join('{0} {1}'.format(region, compName) for region, compName in sorted(self.scanningNow.items())))
+      retVal += ', {0} items found ({1:.1f}/s)'.format(self.itemsFound, self.itemsFound / elapsed)
+    else:
+      rate = self.deleteDone / elapsed
+      retVal = 'Delete: {0}/{1} items ({2:.1f}/s)'.format(self.deleteDone, self.deleteTotal, rate)
+      if rate and self.deleteDone < self.deleteTotal:
+        retVal += ', ETA {0}'.format(fmtSeconds((self.deleteTotal - self.deleteDone) / rate))
+    return '{0}, API calls in flight: {1} ({2} total), elapsed {3}'.format(retVal, self.apiInFlight, self.apiCalls, fmtSeconds(elapsed))
+
+  def run(self):
+    interval = progressInterval if self.mode == 'line' else progressLogInterval
+    while not self.stopEvent.wait(interval) and not shutdownEvent.is_set():
+      with self.lock:
+        if not self.out.atLineStart:
+          #  Skipped while a partial line (print(..., end='')) is on screen.
+          continue
+        statusLine = self.status()
+        if self.mode == 'log':
+          self.out.stream.write('[progress] {0}\n'.format(statusLine))
+          self.out.stream.flush()
+        else:
+          width = os.get_terminal_size(sys.stderr.fileno()).columns if sys.stderr.isatty() else 120
+          sys.stderr.write('\r\033[K' + statusLine[:width - 1])
+          sys.stderr.flush()
+          self.lineShown = True
+
+class metricsClass:
+  #  metricsClass - Prometheus text format metrics:
+  #      aws_cleanup_items{component,region,keep}              gauge, items from the latest scans
+  #      aws_cleanup_scan_duration_seconds{component}          histogram, one per region scanned
+  #      aws_cleanup_delete_duration_seconds{component}        histogram, one per delete stage
+  #                                                            (CloudFormation: one per region)
+  #      aws_cleanup_deleted_items_total{component}            counter
+  #      aws_cleanup_api_calls_total{service,operation}        counter
+  #      aws_cleanup_api_errors_total{service,operation,code}  counter
+  #      aws_cleanup_api_throttles_total{service,operation}    counter
+  #    API calls are counted from botocore events, like progressClass.
+  bucketList = (0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 300, 900)
+  throttleCodes = ('Throttling', 'ThrottlingException', 'ThrottledException', 'RequestLimitExceeded',
+                   'RequestThrottled', 'RequestThrottledException', 'TooManyRequestsException', 'SlowDown')
+  helpText = {'aws_cleanup_items': ('gauge', 'AWS items found by the latest scan'),
+              'aws_cleanup_scan_duration_seconds': ('histogram', 'Inventory time per component and region'),
+              'aws_cleanup_delete_duration_seconds': ('histogram', 'Delete stage time per component'),
+              'aws_cleanup_deleted_items_total': ('counter', 'AWS items deleted'),
+              'aws_cleanup_api_calls_total': ('counter', 'AWS API calls'),
+              'aws_cleanup_api_errors_total': ('counter', 'AWS API calls that returned an error'),
+              'aws_cleanup_api_throttles_total': ('counter', 'AWS API calls that were throttled')}
+
+  def __init__(self):
+    self.lock = threading.Lock()
+    self.counters = defaultdict(int)
+    self.histograms = {}
+    self.scanOpen = {}
+    self.stageOpen = None
+
+  def hookSession(self, parSession):
+    parSession.events.register('before-call', self.apiCall)
+    parSession.events.register('after-call', self.apiResult)
+    parSession.events.register('after-call-error', self.apiError)
+
+  def apiLabels(self, parEventName):
+    #  Event names are "<event>.<service>.<Operation>".
+    eventParts = (parEventName or '').split('.')
+    return (('service', eventParts[1] if len(eventParts) > 1 else ''), ('operation', eventParts[2] if len(eventParts) > 2 else ''))
+
+  def apiCall(self, event_name=None, **kwargs):
+    with self.lock:
+      self.counters[('aws_cleanup_api_calls_total', self.apiLabels(event_name))] += 1
+
+  def apiResult(self, event_name=None, parsed=None, **kwargs):
+    errorCode = (parsed or {}).get('Error', {}).get('Code')
+    if errorCode:
+      self.countError(event_name, errorCode)
+
+  def apiError(self, event_name=None, exception=None, **kwargs):
+    self.countError(event_name, type(exception).__name__)
+
+  def countError(self, parEventName, parCode):
+    labels = self.apiLabels(parEventName)
+    with self.lock:
+      self.counters[('aws_cleanup_api_errors_total', labels + (('code', parCode),))] += 1
+      if parCode in self.throttleCodes:
+        self.counters[('aws_cleanup_api_throttles_total', labels)] += 1
+
+  def observe(self, parName, parComponent, parSeconds):
+    with self.lock:
+      histogram = self.histograms.setdefault((parName, componentKey[parComponent]), [0] * (len(self.bucketList) + 2))
+      for bucketNo, bucket in enumerate(self.bucketList):
+        if parSeconds <= bucket:
+          histogram[bucketNo] += 1
+      histogram[-2] += parSeconds
+      histogram[-1] += 1
+
+  def scanStart(self, parRegion, parComponent):
+    #  A component's scan ends when the next component in the region starts (or the region ends).
+    self.scanEnd(parRegion)
+    self.scanOpen[parRegion] = (parComponent, time.time())
+
+  def scanEnd(self, parRegion):
+    if parRegion in self.scanOpen:
+      compDef, startTime = self.scanOpen.pop(parRegion)
+      self.observe('aws_cleanup_scan_duration_seconds', compDef, time.time() - startTime)
+
+  def deleteStage(self, parComponent):
+    #  Delete stages run one after another; parComponent None ends the last one. Stages with
+    #  nothing to delete aren't observed.
+    if self.stageOpen:
+      self.observe('aws_cleanup_delete_duration_seconds', self.stageOpen[0], time.time() - self.stageOpen[1])
+    self.stageOpen = (parComponent, time.time()) if parComponent and termTrack.count(parComponent) else None
+
+  def deleted(self, parComponent):
+    with self.lock:
+      self.counters[('aws_cleanup_deleted_items_total', (('component', componentKey[parComponent]),))] += 1
+
+  def text(self):
+    def fmtLabels(parLabels):
+      return '{' + ','.join('{0}="{1}"'.format(k, str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')) for k, v in parLabels) + '}'
+    itemCounts = defaultdict(int)
+    with invTrack.lock:
+      for (compDef, currentRegion), idDict in invTrack.items.items():
+        for keep, row in idDict.values():
+          itemCounts[(('component', componentKey[compDef]), ('region', currentRegion or 'global'), ('keep', 'yes' if keep else 'no'))] += 1
+    sampleList = defaultdict(list)
+    for labels, value in sorted(itemCounts.items()):
+      sampleList['aws_cleanup_items'].append(('aws_cleanup_items' + fmtLabels(labels), value))
+    with self.lock:
+      for (name, labels), value in sorted(self.counters.items()):
+        sampleList[name].append((name + fmtLabels(labels), value))
+      for (name, compName), histogram in sorted(self.histograms.items()):
+        for bucketNo, bucket in enumerate(self.bucketList + ('+Inf',)):
+          bucketCount = histogram[-1] if bucket == '+Inf' else histogram[bucketNo]
+          sampleList[name].append((name + '_bucket' + fmtLabels((('component', compName), ('le', bucket))), bucketCount))
+        sampleList[name].append((name + '_sum' + fmtLabels((('component', compName),)), round(histogram[-2], 3)))
+        sampleList[name].append((name + '_count' + fmtLabels((('component', compName),)), histogram[-1]))
+    retText = ''
+    for name, (metricType, metricHelp) in self.helpText.items():
+      if sampleList[name]:
+        retText += '# HELP {0} {1}\n# TYPE {0} {2}\n'.format(name, metricHelp, metricType)
+        retText += ''.join('{0} {1}\n'.format(sample, value) for sample, value in sampleList[name])
+    return retText
+
+  def writeFile(self, parPath):
+    #  Written to a temporary file and renamed, so a textfile collector never reads half a file.
+    with open(parPath + '.tmp', 'w') as metricsFile:
+      metricsFile.write(self.text())
+    os.replace(parPath + '.tmp', parPath)
+
+class traceClass:
+  #  traceClass - "--trace FILE": Chrome Trace Event format ("X" complete events, in microseconds
+  #    from the start of the run, one track per thread):
+  #      api     one span per AWS API call ("<service>.<Operation>", outcome ok or the error code),
+  #              from botocore events like metricsClass
+  #      scan    one span per component and region inventoried
+  #      delete  one span per delete stage (CloudFormation and NAT gateway teardown: one per region),
+  #              with an instant event for each item deleted
+  #    Events are kept in memory and written once, when the run ends.
+  def __init__(self, parPath):
+    self.path = parPath
+    self.lock = threading.Lock()
+    self.events = []
+    self.threadNames = {}
+    self.apiOpen = threading.local()
+    self.scanOpen = {}
+    self.stageOpen = None
+    self.startTime = time.time()
+
+  def hookSession(self, parSession):
+    parSession.events.register('before-call', self.apiCall)
+    parSession.events.register('after-call', self.apiResult)
+    parSession.events.register('after-call-error', self.apiError)
+
+  def add(self, parEvent):
+    currentThread = threading.current_thread()
+    parEvent.update(pid=1, tid=currentThread.ident)
+    with self.lock:
+      self.threadNames.setdefault(currentThread.ident, currentThread.name)
+      self.events.append(parEvent)
+
+  def span(self, parName, parCat, parStart, parArgs=None):
+    #  parStart is a time.time() value; the span ends now.
+    if self.path:
+      self.add({'name': parName, 'cat': parCat, 'ph': 'X', 'ts': round((parStart - self.startTime) * 1e6),
+                'dur': round((time.time() - parStart) * 1e6), 'args': parArgs or {}})
+
+  def apiCall(self, event_name=None, **kwargs):
+    self.apiOpen.start = time.time()
+
+  def apiEnd(self, parEventName, parOutcome):
+    #  Event names are "<event>.<service>.<Operation>".
+    startTime = getattr(self.apiOpen, 'start', None)
+    if startTime is not None:
+      self.apiOpen.start = None
+      self.span('.'.join((parEventName or '').split('.')[1:3]), 'api', startTime, {'outcome': parOutcome})
+
+  def apiResult(self, event_name=None, parsed=None, **kwargs):
+    self.apiEnd(event_name, (parsed or {}).get('Error', {}).get('Code') or 'ok')
+
+  def apiError(self, event_name=None, exception=None, **kwargs):
+    self.apiEnd(event_name, type(exception).__name__)
+
+  def scanStart(self, parRegion, parComponent):
+    #  Same boundaries as metricsClass.scanStart.
+    self.scanEnd(parRegion)
+    self.scanOpen[parRegion] = (parComponent, time.time())
+
+  def scanEnd(self, parRegion):
+    if parRegion in self.scanOpen:
+      compDef, startTime = self.scanOpen.pop(parRegion)
+      self.span('scan ' + componentKey[compDef], 'scan', startTime, {'region': parRegion or 'global'})
+
+  def deleteStage(self, parComponent):
+    if self.stageOpen:
+      self.span('delete ' + componentKey[self.stageOpen[0]], 'delete', self.stageOpen[1], {'items': termTrack.count(self.stageOpen[0])})
+    self.stageOpen = (parComponent, time.time()) if parComponent and termTrack.count(parComponent) else None
+
+  def deleted(self, parComponent, parRegion, parId):
+    if self.path:
+      self.add({'name': 'deleted', 'cat': 'delete', 'ph': 'i', 's': 't', 'ts': round((time.time() - self.startTime) * 1e6),
+                'args': {'component': componentKey[parComponent], 'region': parRegion or 'global', 'id': parId}})
+
+  def writeFile(self):
+    #  Registered with atexit, so runs that end early (ctrl-c, errors, exit()) are traced too.
+    self.deleteStage(None)
+    with self.lock:
+      traceEvents = [{'name': 'thread_name', 'ph': 'M', 'pid': 1, 'tid': tid, 'args': {'name': name}} for tid, name in self.threadNames.items()]
+      traceEvents += self.events
+    try:
+      with open(self.path + '.tmp', 'w') as traceFile:
+        json.dump({'traceEvents': traceEvents, 'displayTimeUnit': 'ms'}, traceFile)
+      os.replace(self.path + '.tmp', self.path)
+      print('Trace written to "{0}" ({1} events)'.format(self.path, len(self.events)))
+    except OSError as e:
+      print('ERROR: can\'t write trace file "{0}":'.format(self.path), e)
+
+def bulkDelete(parComponent, parService, parItems, parDeleteCall, parBatchSize=1, parGoneCodes=(), parWaitRegion=None):
+  #  bulkDelete - deletes all items of a regional component. parItems is termTrack.byRegion()
+  #    {region: {id: termRecord}}; parDeleteCall(client, idList) deletes up to parBatchSize ids
+  #    with one API call. APIs without a batch form use parBatchSize=1, and the calls are fanned
+  #    out over a bounded thread pool (deleteMaxWorkers). When a batch call fails, the batch is
+  #    retried one id at a time so the error can be tied to an item. Error codes in parGoneCodes
+  #    mean the item was already deleted. Errors are printed as one summary at the end.
+  def deleteChunk(parRegion, parIdList):
+    try:
+      ign = parDeleteCall(awsClient(parService, parRegion), parIdList)
+      for id in parIdList:
+        markDeleted(parComponent, parRegion, id)
+      return len(parIdList), 0, []
+    except (ClientError,) + awsConnErrors as e:
+      if len(parIdList) > 1:
+        retDeleted = retGone = 0
+        retErrors = []
+        for id in parIdList:
+          chkDeleted, chkGone, chkErrors = deleteChunk(parRegion, [id])
+          retDeleted += chkDeleted
+          retGone += chkGone
+          retErrors += chkErrors
+        return retDeleted, retGone, retErrors
+      if isinstance(e, ClientError) and e.response['Error']['Code'] in parGoneCodes:
+        markDeleted(parComponent, parRegion, parIdList[0])
+        return 0, 1, []
+      return 0, 0, [(parRegion, parIdList[0], e)]
+
+  deletedCount = goneCount = 0
+  errorList = []
+  futureList = []
+  with ThreadPoolExecutor(max_workers=deleteMaxWorkers) as executor:
+    for currentRegion, idDict in sorted(parItems.items()):
+      if parWaitRegion:
+        parWaitRegion(currentRegion)
+      idList = list(idDict)
+      print('Deleting {0} {1}: {2} item(s)'.format(currentRegion, parComponent.compName, len(idList)))
+      for i in range(0, len(idList), parBatchSize):
+        futureList.append(executor.submit(deleteChunk, currentRegion, idList[i:i + parBatchSize]))
+    for chkFuture in as_completed(futureList):
+      chkDeleted, chkGone, chkErrors = chkFuture.result()
+      deletedCount += chkDeleted
+      goneCount += chkGone
+      errorList += chkErrors
+
+  if futureList:
+    print('  {0}: {1} deleted{2}{3}'.format(parComponent.compName, deletedCount, ', {0} already deleted'.format(goneCount) if goneCount else '', ', {0} error(s)'.format(len(errorList)) if errorList else ''))
+    for currentRegion, id, e in sorted(errorList, key=lambda x: (x[0], x[1])):
+      print('    ERROR: {0} "{1}":'.format(currentRegion, parItems[currentRegion][id].display), e)
+  return errorList
+
+def volumeTeardown(parItems, parWaitRegion):
+  #  volumeTeardown - deletes the Volumes in parItems (termTrack.byRegion()), one worker per
+  #    region. Volumes can still be in-use or deleting right after the EC2 terminate, so each
+  #    region polls all of its pending volumes with one describe_volumes (filtered by id, 200 per
+  #    call) until they're available, and each volume is deleted as soon as it is. A volume
+  #    missing from the describe went with its instance (DeleteOnTermination). Only volumes
+  #    attached to instances being terminated are waited on; a volume attached to an instance
+  #    that's kept is reported as an error and left attached. The deletes share a pool of
+  #    deleteMaxWorkers. Returns [(region, id, error)], printed as one summary like bulkDelete.
+  def deleteVolume(parRegion, parId):
+    try:
+      ign = awsClient('ec2', parRegion).delete_volume(VolumeId=parId)
+      markDeleted(awsComponent.Volumes, parRegion, parId)
+      return 'deleted', None
+    except ClientError as e:
+      if e.response['Error']['Code'] == 'InvalidVolume.NotFound':
+        markDeleted(awsComponent.Volumes, parRegion, parId)
+        return 'gone', None
+      return 'error', e
+    except awsConnErrors as e:
+      return 'error', e
+
+  def teardownRegion(parRegion):
+    parWaitRegion(parRegion)
+    clientEC2Region = awsClient('ec2', parRegion)
+    pending = dict(parItems[parRegion])
+    retCount = defaultdict(int)
+    retErrors = []
+    timeoutAt = time.time() + volTimeout
+    print('Deleting {0} {1}: {2} item(s)'.format(parRegion, awsComponent.Volumes.compName, len(pending)))
+    while pending:
+      volumeFound = {}
+      idList = sorted(pending)
+      for i in range(0, len(idList), 200):
+        for page in clientEC2Region.get_paginator('describe_volumes').paginate(Filters=[{'Name': 'volume-id', 'Values': idList[i:i + 200]}]):
+          for Volumes in page['Volumes']:
+            volumeFound[Volumes['VolumeId']] = Volumes
+      futureList = []
+      for id in idList:
+        Volumes = volumeFound.get(id)
+        if Volumes is None or Volumes['State'] == 'deleted':
+          markDeleted(awsComponent.Volumes, parRegion, id)
+          retCount['gone'] += 1
+          del pending[id]
+        elif Volumes['State'] == 'available':
+          futureList.append((id, deleteExecutor.submit(deleteVolume, parRegion, id)))
+        elif Volumes['State'] == 'in-use':
+          attachedList = [x['InstanceId'] for x in Volumes.get('Attachments', []) if x.get('InstanceId')]
+          if not any(termTrack.lookup(awsComponent.EC2, parRegion, x) for x in attachedList):
+            retErrors.append((parRegion, id, 'attached to {0}, which isn\'t being terminated'.format(', '.join(attachedList))))
+            del pending[id]
+      for id, chkFuture in futureList:
+        chkResult, chkError = chkFuture.result()
+        retCount[chkResult] += 1
+        if chkError:
+          retErrors.append((parRegion, id, chkError))
+        del pending[id]
+      if not pending:
+        break
+      if time.time() > timeoutAt:
+        for id in sorted(pending):
+          retErrors.append((parRegion, id, 'not available after {0} seconds (state: {1})'.format(volTimeout, volumeFound[id]['State'])))
+        break
+      if shutdownEvent.wait(volPollInterval):
+        break
+    return retCount, retErrors
+
+  deletedCount = goneCount = 0
+  errorList = []
+  with ThreadPoolExecutor(max_workers=deleteMaxWorkers) as deleteExecutor:
+    with ThreadPoolExecutor(max_workers=regionMaxWorkers) as executor:
+      futureRegion = dict((executor.submit(teardownRegion, currentRegion), currentRegion) for currentRegion in sorted(parItems))
+      for chkFuture in as_completed(futureRegion):
+        try:
+          chkCount, chkErrors = chkFuture.result()
+        except (ClientError,) + awsConnErrors as e:
+          #  The region's describe failed: its volumes not deleted yet are reported with the error.
+          currentRegion = futureRegion[chkFuture]
+          errorList += [(currentRegion, id, e) for id, idDetail in parItems[currentRegion].items() if idDetail.state != 'deleted']
+          deletedCount += sum(idDetail.state == 'deleted' for idDetail in parItems[currentRegion].values())
+          continue
+        deletedCount += chkCount['deleted']
+        goneCount += chkCount['gone']
+        errorList += chkErrors
+
+  if parItems:
+    print('  {0}: {1} deleted{2}{3}'.format(awsComponent.Volumes.compName, deletedCount, ', {0} already deleted'.format(goneCount) if goneCount else '', ', {0} error(s)'.format(len(errorList)) if errorList else ''))
+    for currentRegion, id, e in sorted(errorList, key=lambda x: (x[0], x[1])):
+      print('    ERROR: {0} "{1}":'.format(currentRegion, parItems[currentRegion][id].display), e)
+  return errorList
+
+#  Which regions a service is offered in comes from the endpoint data bundled with botocore,
+#  so no network call is needed. Cached per service; an empty list (service unknown to this
+#  botocore version) is treated as available everywhere.
+serviceRegionLock = threading.Lock()
+serviceRegionCache = {}
+def serviceInRegion(parService, parRegion):
+  with serviceRegionLock:
+    if parService not in serviceRegionCache:
+      serviceRegionCache[parService] = set(boto3.session.Session().get_available_regions(parService))
+    return not serviceRegionCache[parService] or parRegion in serviceRegionCache[parService]
+
+class metaCacheClass:
+  #  metaCacheClass - account/region facts that rarely change, kept in a JSON file per AWS
+  #    account: {account: {"time", "alias", "regions", "optIn", "services"}}. "services" is
+  #    {service: [regions]} (serviceInRegion). Entries older than parTTL are reloaded from AWS.
+  #    The connected user isn't cached: get_caller_identity is called on every run, so rotated
+  #    keys or another role under the same profile can't leave a stale ARN or account behind.
+  def __init__(self, parPath, parTTL):
+    self.path = os.path.expanduser(parPath)
+    self.ttl = parTTL
+    try:
+      with open(self.path) as cacheFile:
+        self.data = json.load(cacheFile)
+    except (IOError, OSError, ValueError):
+      self.data = {}
+
+  def get(self, parAccount):
+    entry = self.data.get(parAccount)
+    if entry and time.time() - entry.get('time', 0) < self.ttl:
+      return entry
+    return None
+
+  def load(self, parAccount):
+    #  One call each: describe_regions (all regions, with opt-in status), list_account_aliases.
+    optIn = dict((region['RegionName'], region.get('OptInStatus', 'opt-in-not-required')) for region in awsClient('ec2').describe_regions(AllRegions=True)['Regions'])
+    aliasList = awsClient('iam').list_account_aliases()['AccountAliases']
+    with serviceRegionLock:
+      serviceRegionCache.clear()
+    for chkService in set(componentService.values()):
+      ign = serviceInRegion(chkService, None)
+    entry = {'time': time.time(), 'alias': aliasList[0] if aliasList else '',
+             'regions': sorted(region for region, status in optIn.items() if status != 'not-opted-in'), 'optIn': optIn,
+             'services': dict((chkService, sorted(regionSet)) for chkService, regionSet in serviceRegionCache.items())}
+    self.data[parAccount] = entry
+    try:
+      with open(self.path + '.tmp', 'w') as cacheFile:
+        json.dump(self.data, cacheFile, indent=1)
+      os.replace(self.path + '.tmp', self.path)
+    except (IOError, OSError) as e:
+      print('WARNING: cannot write metadata cache {0}:'.format(self.path), e)
+    return entry
+
+class dependIndexClass:
+  #  dependIndexClass - reverse dependency index for one region, built from a single sweep of
+  #    describe_vpcs/subnets/instances/network_interfaces/vpc_endpoints/internet_gateways/
+  #    route_tables. The delete stages take their conflict warnings from here instead of
+  #    querying AWS for every item and check. Network interfaces not attached to an EC2
+  #    instance show users the instance checks miss (Lambda, ELB, NAT gateways, ...).
+  #    Items deleted during the run are passed to markGone() so later stages ignore them.
+  #
+  #    self.users: {resource id (sg-/subnet-/vpc-): {kind: {dependent id: display name}}}
+  #      kind: 'instance', 'interface', 'endpoint', 'subnet', 'gateway', 'routeTable'
+  def __init__(self, parRegion, parScriptArg):
+    self.users = defaultdict(lambda : defaultdict(dict))
+    self.routeTables = {}
+    self.vpcDisplay = {}
+    self.gone = set()
+    clientEC2Region = awsClient('ec2', parRegion)
+    def describeAll(parOperation, parKey):
+      for page in clientEC2Region.get_paginator(parOperation).paginate():
+        for item in page[parKey]:
+          yield item
+
+    for VPC in describeAll('describe_vpcs', 'Vpcs'):
+      self.vpcDisplay[VPC['VpcId']] = VPC['VpcId'] + tagNameFind(VPC.get('Tags'), parScriptArg)
+
+    subnetDisplay = {}
+    for Subnets in describeAll('describe_subnets', 'Subnets'):
+      subnetDisplay[Subnets['SubnetId']] = Subnets['SubnetId'] + tagNameFind(Subnets.get('Tags'), parScriptArg)
+      self.users[Subnets['VpcId']]['subnet'][Subnets['SubnetId']] = subnetDisplay[Subnets['SubnetId']]
+
+    instanceDisplay = {}
+    for resv in describeAll('describe_instances', 'Reservations'):
+      for inst in resv['Instances']:
+        if inst['State']['Name'] == 'terminated':
+          continue
+        instanceDisplay[inst['InstanceId']] = inst['InstanceId'] + tagNameFind(inst.get('Tags'), parScriptArg)
+        for useId in [sg['GroupId'] for sg in inst.get('SecurityGroups', [])] + [inst.get('SubnetId'), inst.get('VpcId')]:
+          if useId:
+            self.users[useId]['instance'][inst['InstanceId']] = instanceDisplay[inst['InstanceId']]
+
+    #  An instance's secondary interfaces can be in other subnets/security groups, so the
+    #  interfaces are scanned for instances too.
+    for eni in describeAll('describe_network_interfaces', 'NetworkInterfaces'):
+      instanceId = eni.get('Attachment', {}).get('InstanceId')
+      if instanceId:
+        if instanceId not in instanceDisplay:
+          continue
+        userKind, userId, userDisplay = 'instance', instanceId, instanceDisplay[instanceId]
+      else:
+        userKind, userId = 'interface', eni['NetworkInterfaceId']
+        userDisplay = userId + formatDispName(eni.get('InterfaceType') if eni.get('InterfaceType') != 'interface' else '', eni.get('Description'))
+      for useId in [sg['GroupId'] for sg in eni.get('Groups', [])] + [eni.get('SubnetId'), eni.get('VpcId')]:
+        if useId:
+          self.users[useId][userKind][userId] = userDisplay
+
+    for VPCEndpoints in describeAll('describe_vpc_endpoints', 'VpcEndpoints'):
+      if VPCEndpoints['State'].lower() != 'deleted':
+        for useId in [VPCEndpoints['VpcId']] + VPCEndpoints.get('SubnetIds', []):
+          self.users[useId]['endpoint'][VPCEndpoints['VpcEndpointId']] = VPCEndpoints['VpcEndpointId']
+
+    for InternetGateways in describeAll('describe_internet_gateways', 'InternetGateways'):
+      for attachChk in InternetGateways['Attachments']:
+        self.users[attachChk['VpcId']]['gateway'][InternetGateways['InternetGatewayId']] = InternetGateways['InternetGatewayId'] + tagNameFind(InternetGateways.get('Tags'), parScriptArg)
+
+    for RouteTables in describeAll('describe_route_tables', 'RouteTables'):
+      #  Same layout as chkRouteTablesAssociations()
+      RouteTablesAssociations = {'Main': False, 'Subnets': []}
+      for chkAssociations in RouteTables['Associations']:
+        if chkAssociations.get('Main'):
+          RouteTablesAssociations['Main'] = True
+        if chkAssociations.get('SubnetId'):
+          RouteTablesAssociations['Subnets'].append(subnetDisplay.get(chkAssociations['SubnetId'], chkAssociations['SubnetId']))
+      self.routeTables[RouteTables['RouteTableId']] = RouteTablesAssociations
+      if not RouteTablesAssociations['Main']:
+        self.users[RouteTables['VpcId']]['routeTable'][RouteTables['RouteTableId']] = RouteTables['RouteTableId'] + tagNameFind(RouteTables.get('Tags'), parScriptArg)
+
+  def dependents(self, parId, parKind):
+    return [dispName for id, dispName in self.users[parId][parKind].items() if id not in self.gone]
+
+  def markGone(self, parId):
+    self.gone.add(parId)
+
+dependIndexCache = {}
+def dependIndex(parRegion):
+  #  Built on first use - the first user is the Security Group stage, after EC2 termination.
+  if parRegion not in dependIndexCache:
+    dependIndexCache[parRegion] = dependIndexClass(parRegion, aws_cleanupArg)
+  return dependIndexCache[parRegion]
+
+class cfnTeardownClass:
+  #  cfnTeardownClass - deletes CloudFormation stacks for all regions concurrently (one worker
+  #    per region) and tracks completion with a single list_stacks poll per region instead of
+  #    a waiter per stack. Ordering handled within a region:
+  #      - nested stacks are never deleted directly; they're removed with their root stack.
+  #      - a stack exporting values is held back until the stacks importing them are gone.
+  #    Delete stages that follow call waitRegion() before touching a region, so each region is
+  #    released as soon as its own stacks are gone.
+  def __init__(self, parStacks):
+    #  parStacks: termTrack.byRegion() for CloudFormation stacks - {region: {StackId: termRecord}}
+    self.stacks = parStacks
+    self.regionDone = {}
+    self.regionFuture = {}
+    for currentRegion in parStacks:
+      self.regionDone[currentRegion] = threading.Event()
+
+  def start(self):
+    if not self.stacks:
+      return
+    executor = ThreadPoolExecutor(max_workers=regionMaxWorkers)
+    for currentRegion in sorted(self.stacks):
+      self.regionFuture[currentRegion] = executor.submit(self.teardownRegion, currentRegion)
+    #  Don't block here - the regions finish in the background.
+    executor.shutdown(wait=False)
+
+  def waitRegion(self, parRegion):
+    #  Anything but an AWS error in a region's worker is raised here, in the waiting thread.
+    regionDone = self.regionDone.get(parRegion)
+    if regionDone is not None and not regionDone.is_set():
+      print('Waiting for {0} {1} to finish deleting...'.format(parRegion, awsComponent.CloudFormationStacks.compName))
+      regionDone.wait()
+    if parRegion in self.regionFuture:
+      ign = self.regionFuture[parRegion].result()
+
+  def waitAll(self):
+    for currentRegion in sorted(self.regionDone):
+      self.waitRegion(currentRegion)
+
+  def pollStacks(self, parClient):
+    #  One (paginated) list_stacks for the whole region. Deleted stacks stay in the list as
+    #  DELETE_COMPLETE, so a stack missing from the list is treated as gone.
+    retStacks = {}
+    for page in parClient.get_paginator('list_stacks').paginate():
+      for stackSummary in page['StackSummaries']:
+        retStacks[stackSummary['StackId']] = stackSummary
+    return retStacks
+
+  def exportBlockers(self, parClient, parRegion, parStackStatus, parPending):
+    #  Returns {exporting StackId: set(importing StackIds)} for stacks in parPending. Nested
+    #  stacks are mapped to their root stack, as that's the stack the delete is issued against.
+    retBlockers = defaultdict(set)
+    liveByName = {}
+    for stackId, stackSummary in parStackStatus.items():
+      if stackSummary['StackStatus'] != 'DELETE_COMPLETE':
+        liveByName[stackSummary['StackName']] = stackId
+    def rootId(parStackId):
+      return parStackStatus.get(parStackId, {}).get('RootId') or parStackId
+    for page in parClient.get_paginator('list_exports').paginate():
+      for exportChk in page['Exports']:
+        exportingId = rootId(exportChk['ExportingStackId'])
+        if exportingId not in parPending:
+          continue
+        try:
+          for importPage in parClient.get_paginator('list_imports').paginate(ExportName=exportChk['Name']):
+            for importName in importPage['Imports']:
+              importingId = rootId(liveByName.get(importName, importName))
+              if importingId != exportingId:
+                retBlockers[exportingId].add(importingId)
+        except ClientError as e:
+          #  list_imports raises a ValidationError when nothing imports the export.
+          if e.response['Error']['Code'] != 'ValidationError':
+            print('  {0} {1} - unable to list imports for export "{2}":'.format(parRegion, awsComponent.CloudFormationStacks.compName, exportChk['Name']), e)
+    return retBlockers
+
+  def teardownRegion(self, parRegion):
+    teardownStart = time.time()
+    try:
+      clientCloudFormationRegion = awsClient('cloudformation', parRegion)
+      pending = dict(self.stacks[parRegion])
+      stackStatus = self.pollStacks(clientCloudFormationRegion)
+
+      for id, idDetail in list(pending.items()):
+        parentId = stackStatus.get(id, {}).get('ParentId')
+        if parentId and (stackStatus.get(id, {}).get('RootId') or parentId) not in pending:
+          print('  NOTE: {0} nested stack "{1}" is removed with its root stack, which isn\'t in-scope for deletion.'.format(parRegion, idDetail.display))
+          del pending[id]
+      blockers = self.exportBlockers(clientCloudFormationRegion, parRegion, stackStatus, pending)
+      for id in list(blockers):
+        keptImporters = [stackStatus.get(i, {}).get('StackName', i) for i in blockers[id] if i not in pending]
+        if keptImporters:
+          print('  WARNING: {0} stack "{1}" exports values used by stack(s) not in-scope for deletion: {2}'.format(parRegion, pending[id].display, ', '.join(keptImporters)))
+          del pending[id]
+
+      issued = set()
+      timeoutAt = time.time() + cfnTimeout
+      while pending:
+        for id, idDetail in sorted(pending.items(), key=lambda x: x[1].display):
+          if id in issued or stackStatus.get(id, {}).get('ParentId') or (blockers[id] & set(pending)):
+            continue
+          print('Deleting {0} {1} "{2}"'.format(parRegion, awsComponent.CloudFormationStacks.compName, idDetail.display))
+          try:
+            ign = clientCloudFormationRegion.delete_stack(StackName=id)
+            issued.add(id)
+          except ClientError as e:
+            print("    ERROR:", e, '\n')
+            del pending[id]
+        if not pending:
+          break
+        if time.time() > timeoutAt:
+          print('  WARNING: {0} {1} still deleting after {2} seconds: {3}'.format(parRegion, awsComponent.CloudFormationStacks.compName, cfnTimeout, ', '.join(sorted(x.display for x in pending.values()))))
+          break
+        if shutdownEvent.wait(cfnPollInterval):
+          break
+        stackStatus = self.pollStacks(clientCloudFormationRegion)
+        for id, idDetail in list(pending.items()):
+          chkStatus = stackStatus.get(id, {}).get('StackStatus', 'DELETE_COMPLETE')
+          if chkStatus == 'DELETE_COMPLETE':
+            print('  {0} {1} "{2}" deleted'.format(parRegion, awsComponent.CloudFormationStacks.compName, idDetail.display))
+            markDeleted(awsComponent.CloudFormationStacks, parRegion, id)
+            del pending[id]
+          elif chkStatus == 'DELETE_FAILED':
+            print('  ERROR: {0} {1} "{2}" - DELETE_FAILED: {3}'.format(parRegion, awsComponent.CloudFormationStacks.compName, idDetail.display, stackStatus[id].get('StackStatusReason', '')))
+            del pending[id]
+    except (ClientError,) + awsConnErrors as e:
+      print('  ERROR: {0} {1} teardown stopped:'.format(parRegion, awsComponent.CloudFormationStacks.compName), e)
+    finally:
+      metrics.observe('aws_cleanup_delete_duration_seconds', awsComponent.CloudFormationStacks, time.time() - teardownStart)
+      trace.span('delete ' + componentKey[awsComponent.CloudFormationStacks], 'delete', teardownStart, {'region': parRegion})
+      self.regionDone[parRegion].set()
+
+class netTeardownClass:
+  #  netTeardownClass - NAT gateways, Elastic IPs and network interfaces block the Subnet,
+  #    Internet Gateway and VPC deletes (DependencyViolation). One background worker per region
+  #    (after the region's CloudFormation stacks) issues the NAT gateway deletes at once, then
+  #    polls with one describe per resource type for all pending ids:
+  #      - an Elastic IP is released once the NAT gateway using it is gone (other associations
+  #        are removed first).
+  #      - a network interface is deleted when it's "available". One in use is only waited on when
+  #        a delete of this run releases it (NAT gateway, terminated instance); one held by
+  #        anything else (load balancer, Lambda, ...) is reported at the first poll and skipped.
+  #    Stages that follow call waitRegion(), as with cfnTeardownClass.
+  def __init__(self, parNatGateways, parElasticIPs, parNetworkInterfaces, parCfnTeardown):
+    #  {region: {id: termRecord}} for each component (termTrack.byRegion()).
+    self.natGateways = parNatGateways
+    self.elasticIPs = parElasticIPs
+    self.networkInterfaces = parNetworkInterfaces
+    self.cfnTeardown = parCfnTeardown
+    self.regionDone = {}
+    self.regionFuture = {}
+    for currentRegion in set(parNatGateways) | set(parElasticIPs) | set(parNetworkInterfaces):
+      self.regionDone[currentRegion] = threading.Event()
+
+  def start(self):
+    if not self.regionDone:
+      return
+    executor = ThreadPoolExecutor(max_workers=regionMaxWorkers)
+    for currentRegion in sorted(self.regionDone):
+      self.regionFuture[currentRegion] = executor.submit(self.teardownRegion, currentRegion)
+    executor.shutdown(wait=False)
+
+  def waitRegion(self, parRegion):
+    #  Anything but an AWS error in a region's worker is raised here, in the main thread.
+    regionDone = self.regionDone.get(parRegion)
+    if regionDone is not None and not regionDone.is_set():
+      print('Waiting for {0} NAT gateways / Elastic IPs / network interfaces to finish deleting...'.format(parRegion))
+      regionDone.wait()
+    if parRegion in self.regionFuture:
+      ign = self.regionFuture[parRegion].result()
+
+  def waitAll(self):
+    for currentRegion in sorted(self.regionDone):
+      self.waitRegion(currentRegion)
+
+  #  describeSource: {operation: (result key, filter parameter, filter name)}. DescribeNatGateways
+  #  takes "Filter", the others "Filters".
+  describeSource = {'describe_nat_gateways': ('NatGateways', 'Filter', 'nat-gateway-id'),
+                    'describe_addresses': ('Addresses', 'Filters', 'allocation-id'),
+                    'describe_network_interfaces': ('NetworkInterfaces', 'Filters', 'network-interface-id')}
+
+  def describe(self, parClient, parOperation, parIdList):
+    #  Filters instead of the id parameters: an id that's already gone isn't an error.
+    resultKey, filterParam, filterName = self.describeSource[parOperation]
+    retItems = []
+    for i in range(0, len(parIdList), 200):
+      callParams = {filterParam: [{'Name': filterName, 'Values': parIdList[i:i + 200]}]}
+      if parClient.can_paginate(parOperation):
+        for page in parClient.get_paginator(parOperation).paginate(**callParams):
+          retItems += page[resultKey]
+      else:
+        retItems += getattr(parClient, parOperation)(**callParams)[resultKey]
+    return retItems
+
+  def teardownRegion(self, parRegion):
+    teardownStart = time.time()
+    try:
+      self.cfnTeardown.waitRegion(parRegion)
+      clientEC2Region = awsClient('ec2', parRegion)
+      natPending = dict(self.natGateways.get(parRegion, {}))
+      eipPending = dict(self.elasticIPs.get(parRegion, {}))
+      eniPending = dict(self.networkInterfaces.get(parRegion, {}))
+
+      for id, idDetail in sorted(natPending.items()):
+        print('Deleting {0} {1} {2}'.format(parRegion, awsComponent.NATGateways.compName, idDetail.display))
+        try:
+          ign = clientEC2Region.delete_nat_gateway(NatGatewayId=id)
+        except ClientError as e:
+          if e.response['Error']['Code'] != 'NatGatewayNotFound':
+            print("    ERROR:", e, '\n')
+            del natPending[id]
+
+      timeoutAt = time.time() + netTimeout
+      while natPending or eipPending or eniPending:
+        natInterfaces = set()
+        if natPending:
+          natFound = set()
+          for NATGateways in self.describe(clientEC2Region, 'describe_nat_gateways', list(natPending)):
+            natFound.add(NATGateways['NatGatewayId'])
+            if NATGateways['State'] == 'deleted':
+              natFound.discard(NATGateways['NatGatewayId'])
+            elif NATGateways['State'] == 'failed':
+              print('  ERROR: {0} {1} {2} - failed: {3}'.format(parRegion, awsComponent.NATGateways.compName, natPending[NATGateways['NatGatewayId']].display, NATGateways.get('FailureMessage', '')))
+              del natPending[NATGateways['NatGatewayId']]
+            else:
+              natInterfaces.update(x.get('NetworkInterfaceId') for x in NATGateways.get('NatGatewayAddresses', []))
+          for id in list(natPending):
+            if id not in natFound:
+              print('  {0} {1} {2} deleted'.format(parRegion, awsComponent.NATGateways.compName, natPending[id].display))
+              markDeleted(awsComponent.NATGateways, parRegion, id)
+              del natPending[id]
+
+        if eipPending:
+          addressFound = dict((x['AllocationId'], x) for x in self.describe(clientEC2Region, 'describe_addresses', list(eipPending)))
+          for id in list(eipPending):
+            ElasticIPs = addressFound.get(id)
+            if ElasticIPs and ElasticIPs.get('NetworkInterfaceId') in natInterfaces:
+              continue
+            try:
+              if ElasticIPs and ElasticIPs.get('AssociationId'):
+                ign = clientEC2Region.disassociate_address(AssociationId=ElasticIPs['AssociationId'])
+              if ElasticIPs:
+                print('Releasing {0} {1} {2}'.format(parRegion, awsComponent.ElasticIPs.compName, eipPending[id].display))
+                ign = clientEC2Region.release_address(AllocationId=id)
+              markDeleted(awsComponent.ElasticIPs, parRegion, id)
+            except ClientError as e:
+              print("    ERROR:", e, '\n')
+            del eipPending[id]
+
+        if eniPending:
+          interfaceFound = dict((x['NetworkInterfaceId'], x) for x in self.describe(clientEC2Region, 'describe_network_interfaces', list(eniPending)))
+          for id in list(eniPending):
+            NetworkInterfaces = interfaceFound.get(id)
+            if NetworkInterfaces and NetworkInterfaces['Status'] != 'available':
+              ownerInstance = NetworkInterfaces.get('Attachment', {}).get('InstanceId')
+              if id in natInterfaces or (ownerInstance and termTrack.lookup(awsComponent.EC2, parRegion, ownerInstance)):
+                continue
+              print('  ERROR: {0} {1} {2} - {3}, used by {4} (not deleted by this run)'.format(parRegion, awsComponent.NetworkInterfaces.compName, eniPending[id].display, NetworkInterfaces['Status'],
+                    ownerInstance or NetworkInterfaces.get('RequesterId') or NetworkInterfaces.get('Description') or 'another resource'))
+              del eniPending[id]
+              continue
+            try:
+              if NetworkInterfaces:
+                print('Deleting {0} {1} {2}'.format(parRegion, awsComponent.NetworkInterfaces.compName, eniPending[id].display))
+                ign = clientEC2Region.delete_network_interface(NetworkInterfaceId=id)
+              markDeleted(awsComponent.NetworkInterfaces, parRegion, id)
+            except ClientError as e:
+              if e.response['Error']['Code'] == 'InvalidNetworkInterfaceID.NotFound':
+                markDeleted(awsComponent.NetworkInterfaces, parRegion, id)
+              else:
+                print("    ERROR:", e, '\n')
+            del eniPending[id]
+
+        if not (natPending or eipPending or eniPending):
+          break
+        if time.time() > timeoutAt:
+          print('  WARNING: {0} still in use after {1} seconds: {2}'.format(parRegion, netTimeout, ', '.join(sorted(x.display for x in list(natPending.values()) + list(eipPending.values()) + list(eniPending.values())))))
+          break
+        if shutdownEvent.wait(netPollInterval):
+          break
+    except (ClientError,) + awsConnErrors as e:
+      print('  ERROR: {0} NAT gateway / Elastic IP / network interface teardown stopped:'.format(parRegion), e)
+    finally:
+      metrics.observe('aws_cleanup_delete_duration_seconds', awsComponent.NATGateways, time.time() - teardownStart)
+      trace.span('delete ' + componentKey[awsComponent.NATGateways], 'delete', teardownStart, {'region': parRegion})
+      self.regionDone[parRegion].set()
+
+class deleteJournalClass:
+  #  deleteJournalClass - append-only journal of the delete phase, one JSON record per line:
+  #      {"type": "header", ...}          run settings needed to resume (regions, vpc_rebuild, ...)
+  #      {"type": "plan", "component", "region", "id", "fields"}   one per item in termTrack
+  #      {"type": "planned"}              the plan is complete
+  #      {"type": "done", "component", "region", "id"}             item confirmed deleted
+  #    Components are recorded by their awsComponentClass attribute name (e.g. "EC2"), and
+  #    region is null for global components. Every record is flushed, so a crash or ctrl-c loses
+  #    at most the delete in flight. The plan is fsync'd once, before the "planned" record; done
+  #    records at most every journalSyncInterval seconds, so the delete workers don't queue up
+  #    behind an fsync each (a done record lost in an OS crash only means a delete is redone).
+  #    "--resume JOURNAL" rebuilds termTrack from the plan minus the done items, and appends to
+  #    the same journal.
+  def __init__(self, parPath):
+    self.path = parPath
+    self.lock = threading.Lock()
+    self.file = None
+    self.syncTime = 0
+
+  def write(self, parRecords, parSync=True):
+    #  parRecords are written with one flush; fsync'd now (parSync) or once journalSyncInterval
+    #  seconds have passed since the last fsync.
+    with self.lock:
+      if self.file is None:
+        #  If a crash cut off the last record, start on a fresh line.
+        partialLine = False
+        if os.path.isfile(self.path) and os.path.getsize(self.path) > 0:
+          with open(self.path, 'rb') as journalFile:
+            journalFile.seek(-1, os.SEEK_END)
+            partialLine = journalFile.read(1) != b'\n'
+        self.file = open(self.path, 'a')
+        if partialLine:
+          self.file.write('\n')
+      self.file.write(''.join(json.dumps(record) + '\n' for record in parRecords))
+      self.file.flush()
+      if parSync or time.time() - self.syncTime >= journalSyncInterval:
+        os.fsync(self.file.fileno())
+        self.syncTime = time.time()
+
+  def sync(self):
+    with self.lock:
+      if self.file is not None:
+        os.fsync(self.file.fileno())
+
+  def plan(self, parTermTrack, parHeader):
+    parHeader['type'] = 'header'
+    self.write([parHeader] + [{'type': 'plan', 'component': componentKey[record.component], 'region': record.region, 'id': record.id, 'fields': record.fields()}
+                              for record in parTermTrack.records()])
+    self.write([{'type': 'planned'}])
+
+  def done(self, parComponent, parRegion, parId):
+    self.write([{'type': 'done', 'component': componentKey[parComponent], 'region': parRegion, 'id': parId}], False)
+
+  def load(self):
+    #  Returns (header, termTrack) with the completed items removed. A record cut off by a
+    #  crash can only be the last line; it's ignored.
+    header = None
+    planned = False
+    planList = []
+    doneSet = set()
+    with open(self.path) as journalFile:
+      for line in journalFile:
+        try:
+          record = json.loads(line)
+        except ValueError:
+          continue
+        if record['type'] == 'header':
+          header = record
+        elif record['type'] == 'plan':
+          planList.append(record)
+        elif record['type'] == 'planned':
+          planned = True
+        elif record['type'] == 'done':
+          doneSet.add((record['component'], record['region'], record['id']))
+    if header is None or not planned:
+      raise ValueError('journal {0} has no complete delete plan'.format(self.path))
+    retTermTrack = termTrackClass()
+    for record in planList:
+      if (record['component'], record['region'], record['id']) not in doneSet:
+        #  A resumed EC2 terminate is issued again, so the state starts over as 'planned'.
+        record['fields']['state'] = 'planned'
+        ign = retTermTrack.add(getattr(awsComponent, record['component']), record['region'], record['id'], **record['fields'])
+    return header, retTermTrack
+
+def markDeleted(parComponent, parRegion, parId):
+  #  Called by the delete stages once an item's delete is confirmed.
+  termTrack.setState(parComponent, parRegion, parId, 'deleted')
+  deleteJournal.done(parComponent, parRegion, parId)
+  progress.itemDeleted()
+  metrics.deleted(parComponent)
+  trace.deleted(parComponent, parRegion, parId)
+
+def deleteStage(parComponent):
+  #  Delete stages run one after another; parComponent None ends the last one. A stage due
+  #  after the deadline ("--deadline") finds nothing to delete.
+  if parComponent:
+    ign = deadline.startStage(parComponent)
+  metrics.deleteStage(parComponent)
+  trace.deleteStage(parComponent)
+
+def vpcRebuild(parRegions):
+  #  vpcRebuild - re-creates the default VPC for parRegions, concurrently across regions.
+  #    create_default_vpc fails with DefaultVpcAlreadyExists when the default VPC is still
+  #    there (e.g. its delete failed), so regions aren't checked beforehand. The new VPCs are
+  #    then confirmed available with one vpc_available check per region, also concurrently.
+  def createRegion(parRegion):
+    try:
+      return awsClient('ec2', parRegion).create_default_vpc()['Vpc']['VpcId'], None
+    except ClientError as e:
+      if e.response['Error']['Code'] == 'DefaultVpcAlreadyExists':
+        return None, None
+      return None, e
+    except awsConnErrors as e:
+      return None, e
+
+  def verifyRegion(parRegion, parVpcId):
+    try:
+      awsClient('ec2', parRegion).get_waiter('vpc_available').wait(VpcIds=[parVpcId])
+      return None
+    except Exception as e:
+      return e
+
+  regionList = sorted(parRegions)
+  with ThreadPoolExecutor(max_workers=regionMaxWorkers) as executor:
+    createList = list(executor.map(createRegion, regionList))
+    createdVpc = {}
+    for currentRegion, (vpcId, e) in zip(regionList, createList):
+      if e:
+        print("\tRegion {0} - ERROR re-creating default VPC:".format(currentRegion), e)
+      elif vpcId:
+        createdVpc[currentRegion] = vpcId
+      else:
+        print("\tRegion {0} - default VPC exists; no need to re-create".format(currentRegion))
+    verifyList = list(executor.map(verifyRegion, list(createdVpc), list(createdVpc.values())))
+  for (currentRegion, vpcId), e in zip(createdVpc.items(), verifyList):
+    if e:
+      print("\tRegion {0} - re-created default VPC {1}, but it isn't available yet:".format(currentRegion, vpcId), e)
+    else:
+      print("\tRegion {0} - re-created default VPC {1}".format(currentRegion, vpcId))
+
+#  SQLite inventory history ("--history DB"). One row per scan in run, one row per item per scan
+#  in item. region is 'global' for global components; fields is the report row as JSON.
+historySchema = '''
+CREATE TABLE IF NOT EXISTS run (run_id INTEGER PRIMARY KEY, run_time TEXT, account TEXT, components TEXT);
+CREATE TABLE IF NOT EXISTS item (run_id INTEGER, run_time TEXT, account TEXT, region TEXT, component TEXT,
+                                 item_id TEXT, name_tag TEXT, keep INTEGER, state TEXT, fields TEXT);
+CREATE INDEX IF NOT EXISTS item_component ON item (component, region, item_id);
+CREATE INDEX IF NOT EXISTS item_id ON item (item_id);
+CREATE INDEX IF NOT EXISTS item_run ON item (run_id);
+'''
+historyStateCols = ('Status', 'State', 'Stack Status', 'VPC Status', 'Recording?')
+
+def writeHistory(parComponents=None):
+  #  writeHistory - adds the latest scan of parComponents (None = all) to the history database
+  #    in one transaction.
+  if not args.history:
+    return
+  runTime = time.strftime('%Y-%m-%d %H:%M:%S')
+  itemRows = []
+  for item in invTrack.query():
+    compDef = getattr(awsComponent, item['component'])
+    if parComponents is None or compDef in parComponents:
+      itemRows.append((runTime, currentAccountId, item['region'] or 'global', item['component'], item['id'], item['fields'].get('Name(Tag)', ''),
+                       int(item['keep']), next((item['fields'][col] for col in historyStateCols if col in item['fields']), ''), json.dumps(item['fields'])))
+  try:
+    historyDb = sqlite3.connect(args.history)
+    with historyDb:
+      historyDb.executescript(historySchema)
+      runId = historyDb.execute('INSERT INTO run (run_time, account, components) VALUES (?, ?, ?)',
+                                (runTime, currentAccountId, ','.join(componentKey[compDef] for compDef in (parComponents or componentKey)))).lastrowid
+      historyDb.executemany('INSERT INTO item VALUES ({0}, ?, ?, ?, ?, ?, ?, ?, ?, ?)'.format(runId), itemRows)
+    historyDb.close()
+  except sqlite3.Error as e:
+    print('ERROR: cannot write inventory history {0}:'.format(args.history), e)
+
+historyQueries = {
+  'runs': ('Runs', '''SELECT run.run_id, run.run_time, run.account, COUNT(item.item_id) FROM run LEFT JOIN item ON item.run_id = run.run_id
+                      GROUP BY run.run_id ORDER BY run.run_id''', ['Run', 'Time', 'Account', 'Items']),
+  'item': ('Item history', '''SELECT account, region, component, item_id, MIN(run_time), MAX(run_time), COUNT(*),
+                               (SELECT state FROM item i2 WHERE i2.item_id = item.item_id ORDER BY run_id DESC LIMIT 1)
+                             FROM item WHERE item_id = ? OR name_tag = ? GROUP BY account, region, component, item_id''',
+           ['Account', 'Region', 'Component', 'ID', 'First seen', 'Last seen', 'Scans', 'Last state']),
+  'trend': ('Item count per scan', '''SELECT run_time, region, COUNT(*), SUM(keep = 0) FROM item WHERE component = ?
+                                      GROUP BY run_id, region ORDER BY run_id, region''', ['Time', 'Region', 'Items', 'Not keep']),
+}
+
+def queryHistory(parPath, parQuery, parArg):
+  #  queryHistory - "query" subcommand: reads the history database only (no AWS calls).
+  #      runs               scans recorded
+  #      item ID|NAME       first/last seen, number of scans and last state of an item
+  #      trend COMPONENT    items per scan and region for a component (e.g. Volumes)
+  #      sql "SELECT ..."   any read-only query
+  if not os.path.isfile(parPath):
+    print('ERROR: history database {0} not found'.format(parPath))
+    exit(13)
+  if parQuery != 'runs' and not parArg:
+    print('ERROR: query "{0}" needs an argument'.format(parQuery))
+    exit(13)
+  try:
+    historyDb = sqlite3.connect('file:{0}?mode=ro'.format(quote(os.path.abspath(parPath))), uri=True)
+    if parQuery == 'sql':
+      queryCursor = historyDb.execute(parArg)
+      queryTitle, queryCols = 'Query', [col[0] for col in queryCursor.description or []]
+    else:
+      queryTitle, querySql, queryCols = historyQueries[parQuery]
+      queryCursor = historyDb.execute(querySql, (parArg, parArg)[:querySql.count('?')])
+    queryRows = [[str(x if x is not None else '') for x in row] for row in queryCursor.fetchall()]
+    historyDb.close()
+  except sqlite3.Error as e:
+    print('ERROR: history query failed:', e)
+    exit(13)
+  colWidths = [min(60, max([len(col)] + [len(row[colNo]) for row in queryRows])) for colNo, col in enumerate(queryCols)]
+  queryRpt = awsRpt('{0}{1}:'.format(queryTitle, formatDispName(parArg if parQuery != 'sql' else '')), *[[col, width] for col, width in zip(queryCols, colWidths)])
+  for row in queryRows:
+    queryRpt.addLine(False, *row)
+  print(queryRpt.resultf() or 'No rows found')
+
+def inventoryReport(parStream=False):
+  #  Report output for all components, in display order. parStream: only the rows added since
+  #  the previous streamed report (see awsRpt.streamf).
+  def rptText(parRpt):
+    if parStream:
+      return parRpt.streamf(args.final_report)
+    return parRpt.resultf()
+  output = ""
+  output += rptText(EC2Rpt)
+  output += rptText(SecurityGroupsRpt)
+  output += rptText(VolumesRpt)
+  output += rptText(AMIsRpt)
+  output += rptText(SnapshotsRpt)
+  output += rptText(KeyPairsRpt) 
+  output += rptText(VPCRpt)
+  if VPCNoDefaultByRegion and not parStream:
+    output += '\nThe following regions do not have default VPCs: {0}'.format(', '.join(VPCNoDefaultByRegion)) + ("\n" * 2)
+  output += rptText(RouteTablesRpt)
+  output += rptText(SubnetsRpt)
+  output += rptText(InternetGatewaysRpt)
+  output += rptText(VPCEndpointsRpt) 
+  output += rptText(NATGatewaysRpt)
+  output += rptText(ElasticIPsRpt)
+  output += rptText(NetworkInterfacesRpt)
+  output += rptText(MetricAlarmsRpt) 
+  output += rptText(CloudWatchLogGroupsRpt)
+  output += rptText(ConfigRulesRpt)
+  output += rptText(ConfigurationRecordersRpt)
+  output += rptText(CloudFormationStacksRpt)
+  output += rptText(CloudTrailRpt)
+  output += rptText(AssessmentTargetsRpt)
+  output += rptText(SNSTopicsRpt)
+  output += rptText(S3Rpt)
+  output += rptText(UsersRpt)
+  output += rptText(GroupsRpt)
+  output += rptText(PoliciesRpt)
+  output += rptText(RolesRpt)
+  output += rptText(InstanceProfilesRpt)
+  if not parStream:
+    output += connBreaker.report()
+  return output
+
+def preflightCheck(parMode):
+  #  preflightCheck - "--preflight [drop]": evaluates every action the in-scope components call
+  #    (componentActions; the delete actions too with --del) for the connected user or role with
+  #    iam:SimulatePrincipalPolicy, before anything is scanned. Denied actions are listed by
+  #    component; parMode 'drop' leaves those components out of the run (preflightSkip),
+  #    otherwise the run ends (exit 14). Identity and SCP limits the simulation can't see still
+  #    show up as errors later.
+  principalArn = currentUserArn
+  if re.match(r'arn:aws[\w-]*:iam::\d+:root$', principalArn):
+    print('Pre-flight check: skipped for the root user.\n')
+    return
+  assumedRole = re.match(r'arn:aws[\w-]*:sts::\d+:assumed-role/([^/]+)/', principalArn)
+  actionComponents = defaultdict(list)
+  for compDef, (invActions, delActions) in componentActions.items():
+    if aws_cleanupArg.inv:
+      chkActions = invActions
+    elif compDef.compDelete:
+      chkActions = invActions + delActions + (['ec2:CreateDefaultVpc'] if compDef is awsComponent.VPC and aws_cleanupArg.vpc_rebuild else [])
+    else:
+      continue
+    for chkAction in chkActions:
+      actionComponents[chkAction].append(compDef)
+  deniedActions = {}
+  try:
+    if assumedRole:
+      principalArn = clientIAM.get_role(RoleName=assumedRole.group(1))['Role']['Arn']
+    for page in clientIAM.get_paginator('simulate_principal_policy').paginate(PolicySourceArn=principalArn, ActionNames=sorted(actionComponents)):
+      for evalResult in page['EvaluationResults']:
+        if evalResult['EvalDecision'] != 'allowed':
+          deniedActions[evalResult['EvalActionName']] = evalResult['EvalDecision']
+  except ClientError as e:
+    print('WARNING: pre-flight check not possible for {0}:'.format(principalArn), e, '\n')
+    return
+  if not deniedActions:
+    print('Pre-flight check: all {0} actions allowed for {1}\n'.format(len(actionComponents), principalArn))
+    return
+  deniedByComponent = defaultdict(list)
+  for chkAction, chkDecision in deniedActions.items():
+    for compDef in actionComponents[chkAction]:
+      deniedByComponent[compDef].append('{0} ({1})'.format(chkAction, chkDecision))
+  print('Pre-flight check: actions denied for {0}:'.format(principalArn))
+  for compDef in sorted(deniedByComponent, key=lambda x: x.compName):
+    print('  {0}: {1}'.format(compDef.compName, ', '.join(sorted(deniedByComponent[compDef]))))
+  if parMode != 'drop':
+    print('\nFix the permissions, or add "--preflight drop" to leave these components out.')
+    exit(14)
+  preflightSkip.update(deniedByComponent)
+  print('These components are left out of this run.\n')
+
+def summaryCount(parComponent, parRegion):
+  #  summaryCount - (items, keep items) for one component/region with the summarySource call:
+  #    every page, nothing else. keep is None when it can't be told from the listing (S3).
+  service, operation, opParams, pageItems, idKey, tagKey = summarySource[parComponent]
+  client = awsClient(service, parRegion)
+  if client.can_paginate(operation):
+    pageList = client.get_paginator(operation).paginate(**opParams)
+  else:
+    pageList = [getattr(client, operation)(**opParams)]
+  itemCount = keepCount = 0
+  for page in pageList:
+    for item in pageItems(page):
+      itemCount += 1
+      if tagKey:
+        keepCount += bool(tagScan(item.get(tagKey), aws_cleanupArg).keepTagFound)
+      else:
+        keepCount += bool(reScanItemsKeep(item[idKey] if idKey else item, parComponent))
+  return itemCount, (None if parComponent is awsComponent.S3 else keepCount)
+
+def summaryInventory():
+  #  summaryInventory - "--summary": a component x region count matrix, "items(keep)" per cell.
+  #    Regions are counted concurrently (regionMaxWorkers); a cell that fails shows "error".
+  summaryStart = time.time()
+  def countRegion(parRegion):
+    retCounts = {}
+    for compDef in summarySource:
+      if (compDef in awsComponentGlobal) != (parRegion is None) or not inScan(compDef, None, parRegion):
+        continue
+      try:
+        retCounts[compDef] = summaryCount(compDef, parRegion)
+      except (ClientError,) + awsConnErrors as e:
+        retCounts[compDef] = e
+    return parRegion, retCounts
+  countTable = {}
+  with ThreadPoolExecutor(max_workers=regionMaxWorkers) as executor:
+    for currentRegion, regionCounts in executor.map(countRegion, sorted(regions) + [None]):
+      countTable[currentRegion] = regionCounts
+  regionCols = [x for x in sorted(regions) if any(not isinstance(y, tuple) or y[0] for y in countTable[x].values())] + [None]
+  summaryRpt = awsRpt('Item count per region - items(keep):', *[['Component', 25], ['Total', 7], ['Keep', 6]] + [[x or 'global', max(len(x or 'global'), 9)] for x in regionCols])
+  for compDef in summarySource:
+    totalCount = keepCount = 0
+    rowCells = []
+    for currentRegion in regionCols:
+      chkCount = countTable[currentRegion].get(compDef)
+      if chkCount is None:
+        rowCells.append('')
+      elif not isinstance(chkCount, tuple):
+        rowCells.append('error')
+      else:
+        totalCount += chkCount[0]
+        keepCount = None if keepCount is None or chkCount[1] is None else keepCount + chkCount[1]
+        rowCells.append('{0}{1}'.format(chkCount[0], '({0})'.format(chkCount[1]) if chkCount[1] else '') if chkCount[0] else '-')
+    if totalCount or 'error' in rowCells:
+      summaryRpt.addLine(False, compDef.compName, str(totalCount), '?' if keepCount is None else str(keepCount), *rowCells)
+  print(summaryRpt.resultf(), end='')
+  for currentRegion in regionCols:
+    for compDef, chkCount in sorted(countTable[currentRegion].items(), key=lambda x: x[0].compName):
+      if not isinstance(chkCount, tuple):
+        print('  ERROR: {0} {1}:'.format(currentRegion or 'global', compDef.compName), chkCount)
+  print('{0} regions counted in {1:.1f} seconds ("?": keep tags not listed by this call)\n'.format(len(regions), time.time() - summaryStart))
+
+def verifyParams(parComponent, parIdList):
+  #  verifyParams - summarySource call parameters for one verifySource batch of IDs.
+  service, operation, opParams, pageItems, idKey, tagKey = summarySource[parComponent]
+  paramName, filterName, batchSize, goneTest = verifySource[parComponent]
+  return dict(opParams, **{paramName: [{'Name': filterName, 'Values': parIdList}] if filterName else parIdList})
+
+def verifyDeletes():
+  #  verifyDeletes - after the delete phase, looks up the termTrack items of the verifySource
+  #    components again by ID: one summarySource call per component and batch of IDs, regions
+  #    checked concurrently (regionMaxWorkers). Items the call doesn't return (or returns in a
+  #    deleting/deleted state, per the verifySource gone test) count as deleted; a failed call
+  #    counts its IDs as errors.
+  verifyStart = time.time()
+  def verifyRegion(parRegion):
+    retResults = {}
+    retCalls = 0
+    for compDef, (paramName, filterName, batchSize, goneTest) in verifySource.items():
+      service, operation, opParams, pageItems, idKey, tagKey = summarySource[compDef]
+      idList = list(termTrack.ids(compDef, parRegion))
+      for i in range(0, len(idList), batchSize):
+        idBatch = idList[i:i + batchSize]
+        callParams = verifyParams(compDef, idBatch)
+        try:
+          client = awsClient(service, parRegion)
+          if client.can_paginate(operation):
+            pageList = client.get_paginator(operation).paginate(**callParams)
+          else:
+            pageList = [getattr(client, operation)(**callParams)]
+          presentIds = set()
+          for page in pageList:
+            retCalls += 1
+            presentIds.update(x[idKey] for x in pageItems(page) if not (goneTest and goneTest(x)))
+          for id in idBatch:
+            retResults[(compDef, id)] = 'present' if id in presentIds else 'deleted'
+        except (ClientError,) + awsConnErrors as e:
+          retCalls += 1
+          for id in idBatch:
+            retResults[(compDef, id)] = e
+    return parRegion, retResults, retCalls
+  verifyRegions = sorted({currentRegion for compDef in verifySource for currentRegion in termTrack.byRegion(compDef)})
+  if not verifyRegions:
+    return
+  print('\nVerifying deletes...')
+  resultTable = {}
+  callCount = 0
+  with ThreadPoolExecutor(max_workers=regionMaxWorkers) as executor:
+    for currentRegion, regionResults, regionCalls in executor.map(verifyRegion, verifyRegions):
+      resultTable[currentRegion] = regionResults
+      callCount += regionCalls
+  verifyRpt = awsRpt('Delete verification - items looked up again by ID:', ['Component', 25], ['Deleted', 9], ['Still present', 15], ['Error', 7])
+  for compDef in verifySource:
+    resultList = [x for regionResults in resultTable.values() for (y, id), x in regionResults.items() if y is compDef]
+    if resultList:
+      verifyRpt.addLine(False, compDef.compName, str(resultList.count('deleted')), str(resultList.count('present')), str(sum(not isinstance(x, str) for x in resultList)))
+  print(verifyRpt.resultf(), end='')
+  for currentRegion in verifyRegions:
+    errorShown = set()
+    for (compDef, id), result in sorted(resultTable[currentRegion].items(), key=lambda x: (x[0][0].compName, x[0][1])):
+      if result == 'present':
+        print('  STILL PRESENT: {0} {1} {2}'.format(currentRegion, compDef.compName, termTrack.lookup(compDef, currentRegion, id).display))
+      elif not isinstance(result, str) and compDef not in errorShown:
+        errorShown.add(compDef)
+        print('  ERROR: {0} {1}:'.format(currentRegion, compDef.compName), result)
+  print('{0} items checked with {1} API calls in {2:.1f} seconds (S3, IAM and the other components without a describe by ID aren\'t checked)\n'.format(
+        sum(len(x) for x in resultTable.values()), callCount, time.time() - verifyStart))
+
+def shardArg(parValue):
+  try:
+    shardIndex, shardCount = [int(x) for x in parValue.split('/')]
+  except ValueError:
+    raise argparse.ArgumentTypeError('expected i/N, e.g. 1/4')
+  if not 1 <= shardIndex <= shardCount:
+    raise argparse.ArgumentTypeError('shard number must be 1 to {0}'.format(shardCount))
+  return shardIndex, shardCount
+
+def shardOwns(parRegion, parComponent):
+  #  shardOwns - "--shard i/N": the (account, region, component) work units are split between
+  #    the N shards by a CRC32 of their name, so every shard makes the same split without any
+  #    coordination (separate processes or hosts).
+  if not args.shard:
+    return True
+  workUnit = '{0}/{1}/{2}'.format(currentAccountId, parRegion or 'global', componentKey[parComponent])
+  return zlib.crc32(workUnit.encode('utf-8')) % args.shard[1] == args.shard[0] - 1
+
+def writeShard(parPath):
+  #  writeShard - shard file, one JSON record per line: a "shard" header, an "item" record per
+  #    item scanned (invTrack), and with --del a "plan" record per item to delete (termTrack).
+  with open(parPath, 'w') as shardFile:
+    shardFile.write(json.dumps({'type': 'shard', 'shard': args.shard[0], 'shards': args.shard[1], 'account': currentAccountId,
+                                'time': time.strftime('%Y-%m-%d %H:%M:%S'), 'del': not aws_cleanupArg.inv, 'vpc_rebuild': aws_cleanupArg.vpc_rebuild,
+                                'regions': sorted(regions), 'VPCNoDefaultByRegion': VPCNoDefaultByRegion, 'currentUserArnDel': currentUserArnDel,
+                                'connFailed': [[componentKey[compDef], currentRegion, reason] for (compDef, currentRegion), reason in connBreaker.failed.items()]}) + '\n')
+    for (compDef, currentRegion), idDict in invTrack.items.items():
+      for id, (keep, row) in idDict.items():
+        shardFile.write(json.dumps({'type': 'item', 'component': componentKey[compDef], 'region': currentRegion, 'id': id, 'keep': keep, 'row': row}) + '\n')
+    for record in termTrack.records():
+      shardFile.write(json.dumps({'type': 'plan', 'component': componentKey[record.component], 'region': record.region, 'id': record.id, 'fields': record.fields()}) + '\n')
+
+def readShards(parPaths):
+  #  readShards - returns [(header, records)] for the shard files, after checking that they are
+  #    one complete set: same account, mode and shard count, and every shard present once.
+  retShards = []
+  for shardPath in parPaths:
+    try:
+      with open(shardPath) as shardFile:
+        recordList = [json.loads(line) for line in shardFile if line.strip()]
+    except (IOError, ValueError) as e:
+      print('ERROR: cannot read shard file {0}:'.format(shardPath), e)
+      exit(13)
+    if not recordList or recordList[0].get('type') != 'shard':
+      print('ERROR: {0} is not a shard file'.format(shardPath))
+      exit(13)
+    retShards.append((recordList[0], recordList[1:]))
+  firstHeader = retShards[0][0]
+  for header, records in retShards:
+    for chkKey in ('account', 'shards', 'del', 'vpc_rebuild'):
+      if header[chkKey] != firstHeader[chkKey]:
+        print('ERROR: shard files don\'t match ({0}: {1} / {2})'.format(chkKey, firstHeader[chkKey], header[chkKey]))
+        exit(13)
+  shardList = sorted(header['shard'] for header, records in retShards)
+  if shardList != list(range(1, firstHeader['shards'] + 1)):
+    print('ERROR: expected shards 1 to {0} once each; found: {1}'.format(firstHeader['shards'], ', '.join(str(x) for x in shardList)))
+    exit(13)
+  return retShards
+
+def mergeShards(parShards, parPlanPath):
+  #  mergeShards - "merge" subcommand: standard reports from all shards and, for shards run with
+  #    --del, one delete plan (a delete journal with nothing done yet, run with "--resume").
+  global VPCNoDefaultByRegion, currentUserArnDel
+  mergedHeader = parShards[0][0]
+  regionSet = set()
+  planList = []
+  for header, records in parShards:
+    regionSet.update(header['regions'])
+    VPCNoDefaultByRegion += header['VPCNoDefaultByRegion']
+    currentUserArnDel = currentUserArnDel or header['currentUserArnDel']
+    for compName, currentRegion, reason in header.get('connFailed', []):
+      connBreaker.failed[(getattr(awsComponent, compName), currentRegion)] = reason
+    for record in records:
+      if record['type'] == 'item':
+        invTrack.add(getattr(awsComponent, record['component']), record['region'], record['id'], record['keep'], [None] + record['row'])
+      elif record['type'] == 'plan':
+        planList.append(record)
+        ign = termTrack.add(getattr(awsComponent, record['component']), record['region'], record['id'], **record['fields'])
+  VPCNoDefaultByRegion.sort()
+  ign = invTrack.commit()
+  #  Report rows in region order; with --del only the items planned for deletion are listed.
+  for (compDef, currentRegion), idDict in sorted(invTrack.items.items(), key=lambda x: (componentKey[x[0][0]], x[0][1] or '')):
+    for id, (keep, row) in idDict.items():
+      if aws_cleanupArg.inv or termTrack.lookup(compDef, currentRegion, id):
+        componentRpt[compDef].addLine(currentRegion is not None, *row)
+  print('Merged {0} shard file(s) for AWS account {1}\n'.format(len(parShards), mergedHeader['account']))
+  print(inventoryReport())
+  if currentUserArnDel:
+    print('NOTE: the connected user was targeted for deletion in the shard runs and is left out of the plan.')
+  if not aws_cleanupArg.inv:
+    vpcRebuildRegions = set(VPCNoDefaultByRegion)
+    for currentRegion, idDict in termTrack.byRegion(awsComponent.VPC).items():
+      if any(idDetail.isDefault for idDetail in idDict.values()):
+        vpcRebuildRegions.add(currentRegion)
+    if not parPlanPath:
+      print('{0} item(s) planned for deletion; add "--plan FILE" to write the delete plan.'.format(len(termTrack)))
+      return
+    mergedPlan = deleteJournalClass(parPlanPath)
+    mergedPlan.plan(termTrack, {'time': time.strftime('%Y-%m-%d %H:%M:%S'), 'account': mergedHeader['account'], 'vpc_rebuild': aws_cleanupArg.vpc_rebuild,
+                                'regions': sorted(regionSet), 'VPCNoDefaultByRegion': VPCNoDefaultByRegion, 'vpcRebuildRegions': sorted(vpcRebuildRegions), 'merged': True})
+    print('Delete plan for {0} item(s) written to {1}. Review the report above, then run:\n\tpython3 aws_cleanup.py --resume {1}'.format(len(termTrack), parPlanPath))
+
+argUsage = "usage: aws_cleanup.py -[h][--del][--vpc_rebuild][--ignore_conn_err][--journal FILE][--resume JOURNAL][--progress MODE][--stream [--final_report]][--watch INTERVAL][--serve PORT][--metrics FILE][--history DB][--summary][--refresh_cache][--preflight [drop]][--shard i/N [--shard_file FILE]][--trace FILE][--deadline MINUTES]\n       aws_cleanup.py query --history DB {runs,item,trend,sql} [ARG]\n       aws_cleanup.py merge [--plan JOURNAL] SHARD_FILE..."
 parser = argparse.ArgumentParser(allow_abbrev=False,usage=argUsage)
 #  As "del" is a reserved word in Python, needed to have an alnternate destination.
 parser.add_argument('-d', '--del', dest='delete', help='delete/terminate AWS components', action="store_true", default=False)
 parser.add_argument('--vpc_rebuild', help='rebuild VPC default environment for all regions', action="store_true", default=False)
 parser.add_argument('--region_test', help='reduces number of in-scope regions for code testing for better performance -ww', action="store_true", default=False)
-parser.add_argument('--ignore_conn_err', help='during inventory, script will ignore connectivity errors to AWS regions', action="store_true", default=False)
+parser.add_argument('--ignore_conn_err', help='with --del, delete the items found even if some components couldn\'t be inventoried (connection errors)', action="store_true", default=False)
+parser.add_argument('--journal', help='file for the delete journal (default: aws_cleanup_<date>_<time>.journal)', default=None)
+parser.add_argument('--resume', metavar='JOURNAL', help='continue an interrupted delete from its journal, without re-inventorying', default=None)
+parser.add_argument('--progress', help='progress display: status line (line), periodic log lines (log), off, or auto (line on a terminal, else log)', choices=['auto', 'line', 'log', 'off'], default='auto')
+parser.add_argument('--stream', help='print each region\'s report as soon as the region is inventoried', action="store_true", default=False)
+parser.add_argument('--final_report', help='with --stream, also print the consolidated report at the end', action="store_true", default=False)
+parser.add_argument('--watch', metavar='INTERVAL', type=int, help='inventory only: keep rescanning every INTERVAL seconds and print changes', default=None)
+parser.add_argument('--metrics', metavar='FILE', help='write Prometheus metrics to FILE (textfile collector format) after each inventory/delete', default=None)
+parser.add_argument('--serve', metavar='PORT', type=int, help='inventory only: serve the inventory as JSON on http://127.0.0.1:PORT/inventory', default=None)
+parser.add_argument('--deadline', metavar='MINUTES', type=float, help='time budget: scan the deadlinePriority components first, and start no new scan or delete stage in the last deadlineReserve seconds', default=None)
+parser.add_argument('--trace', metavar='FILE', help='write a Chrome trace (chrome://tracing, Perfetto) of the scans, API calls and delete stages to FILE', default=None)
+parser.add_argument('--history', metavar='DB', help='add each inventory to the SQLite history database DB', default=None)
+parser.add_argument('--preflight', metavar='drop', nargs='?', const='check', choices=['check', 'drop'], help='check permissions for the in-scope components before the inventory; "drop" leaves out components with denied actions', default=None)
+parser.add_argument('--summary', help='item counts per component and region only (fast, no report tables)', action="store_true", default=False)
+parser.add_argument('--refresh_cache', help='reload the cached account/region metadata (metaCacheFile) from AWS', action="store_true", default=False)
+parser.add_argument('--shard', metavar='i/N', type=shardArg, help='inventory shard i of N and write a shard file, for the "merge" subcommand', default=None)
+parser.add_argument('--shard_file', metavar='FILE', help='shard file (default: aws_cleanup_shard_<i>of<N>.json)', default=None)
+subParsers = parser.add_subparsers(dest='command')
+mergeParser = subParsers.add_parser('merge', help='combine shard files into the reports and one delete plan')
+mergeParser.add_argument('--plan', metavar='JOURNAL', help='write the merged delete plan (shards run with --del) to JOURNAL', default=None)
+mergeParser.add_argument('shardFiles', metavar='SHARD_FILE', nargs='+')
+queryParser = subParsers.add_parser('query', help='query the inventory history (no AWS access)')
+queryParser.add_argument('--history', metavar='DB', dest='queryHistory', help='SQLite history database', required=True)
+queryParser.add_argument('query', choices=sorted(list(historyQueries) + ['sql']), help='runs | item ID | trend COMPONENT | sql "SELECT ..."')
+queryParser.add_argument('queryArg', metavar='ARG', nargs='?', default=None)
 args = parser.parse_args()
-if args.delete:
+if args.watch is not None and (args.delete or args.resume or args.watch < 1):
+  parser.error('--watch takes a positive number of seconds, and can\'t be used with --del or --resume')
+if args.serve is not None and (args.delete or args.resume):
+  parser.error('--serve can\'t be used with --del or --resume')
+if args.summary and (args.delete or args.resume or args.watch or args.serve or args.shard):
+  parser.error('--summary can\'t be used with --del, --resume, --watch, --serve or --shard')
+if args.preflight == 'drop' and args.resume:
+  parser.error('--preflight drop can\'t be used with --resume (the journal already lists what is deleted)')
+if args.shard and (args.resume or args.watch or args.serve):
+  parser.error('--shard can\'t be used with --resume, --watch or --serve')
+if args.deadline is not None and (args.deadline <= 0 or args.stream or args.watch or args.serve or args.summary or args.shard):
+  parser.error('--deadline takes a positive number of minutes, and can\'t be used with --stream, --watch, --serve, --summary or --shard')
+progress = progressClass(args.progress)
+metrics = metricsClass()
+trace = traceClass(args.trace)
+deadline = deadlineClass(args.deadline)
+boto3.setup_default_session()
+progress.hookSession(boto3.DEFAULT_SESSION)
+metrics.hookSession(boto3.DEFAULT_SESSION)
+if args.trace:
+  trace.hookSession(boto3.DEFAULT_SESSION)
+  atexit.register(trace.writeFile)
+if args.command == 'query':
+  queryHistory(args.queryHistory, args.query, args.queryArg)
+  exit(0)
+resumeHeader = None
+if args.resume:
+  deleteJournal = deleteJournalClass(args.resume)
+  try:
+    with open(args.resume) as journalFile:
+      for line in journalFile:
+        resumeHeader = json.loads(line)
+        break
+  except (IOError, ValueError) as e:
+    print('ERROR: cannot read delete journal {0}:'.format(args.resume), e)
+    exit(13)
+  if not resumeHeader or resumeHeader.get('type') != 'header':
+    print('ERROR: {0} is not a delete journal'.format(args.resume))
+    exit(13)
+  aws_cleanupArg = scriptArgsTuple(del_all=True, vpc_rebuild=resumeHeader['vpc_rebuild'], ignore_conn_err=args.ignore_conn_err)
+elif args.command == 'merge':
+  #  The reports and plan follow the settings the shards ran with.
+  mergeShardList = readShards(args.shardFiles)
+  if mergeShardList[0][0]['del']:
+    aws_cleanupArg = scriptArgsTuple(del_all=True, vpc_rebuild=mergeShardList[0][0]['vpc_rebuild'])
+  else:
+    aws_cleanupArg = scriptArgsTuple(inv=True, vpc_rebuild=mergeShardList[0][0]['vpc_rebuild'])
+elif args.delete:
   aws_cleanupArg = scriptArgsTuple(del_all=True, vpc_rebuild=args.vpc_rebuild, ignore_conn_err=args.ignore_conn_err)
 else:
   aws_cleanupArg = scriptArgsTuple(inv=True, vpc_rebuild=args.vpc_rebuild, ignore_conn_err=args.ignore_conn_err)
@@ -315,8 +2220,114 @@ else:
 keepTagHeader = [', '.join(aws_cleanupArg.keepTag)+"(Tag)","","^"]
 
 awsComponent = awsComponentClass()
-# Initialize the dictionary of items to delete/terminate
-termTrack = defaultdict(lambda : defaultdict(dict))
+#  componentKey: attribute name for each component (used by the delete journal).
+componentKey = {}
+for id, idDetail in vars(awsComponent).items():
+  if type(idDetail) is componentDef:
+    componentKey[idDetail] = id
+# Initialize the container of items to delete/terminate
+termTrack = termTrackClass()
+invTrack = invTrackClass()
+connBreaker = connBreakerClass(connBreakerThreshold)
+#  componentService: the AWS service (client) each component is scanned with, for connBreaker.
+componentService = {awsComponent.EC2: 'ec2', awsComponent.SecurityGroups: 'ec2', awsComponent.Volumes: 'ec2', awsComponent.KeyPairs: 'ec2',
+                    awsComponent.AMIs: 'ec2', awsComponent.Snapshots: 'ec2',
+                    awsComponent.VPC: 'ec2', awsComponent.RouteTables: 'ec2', awsComponent.Subnets: 'ec2', awsComponent.InternetGateways: 'ec2',
+                    awsComponent.VPCEndpoints: 'ec2', awsComponent.NATGateways: 'ec2', awsComponent.ElasticIPs: 'ec2',
+                    awsComponent.NetworkInterfaces: 'ec2', awsComponent.MetricAlarms: 'cloudwatch', awsComponent.CloudWatchLogGroups: 'logs',
+                    awsComponent.ConfigRules: 'config', awsComponent.ConfigurationRecorders: 'config', awsComponent.CloudFormationStacks: 'cloudformation',
+                    awsComponent.CloudTrail: 'cloudtrail', awsComponent.AssessmentTargets: 'inspector', awsComponent.SNSTopics: 'sns',
+                    awsComponent.S3: 's3', awsComponent.Users: 'iam', awsComponent.Groups: 'iam', awsComponent.Policies: 'iam',
+                    awsComponent.Roles: 'iam', awsComponent.InstanceProfiles: 'iam'}
+#  componentActions: IAM actions used by each component - (inventory, delete). Checked by "--preflight".
+componentActions = {awsComponent.EC2: (['ec2:DescribeInstances'], ['ec2:TerminateInstances']),
+                    awsComponent.SecurityGroups: (['ec2:DescribeSecurityGroups'], ['ec2:DeleteSecurityGroup']),
+                    awsComponent.Volumes: (['ec2:DescribeVolumes'], ['ec2:DetachVolume', 'ec2:DeleteVolume']),
+                    awsComponent.AMIs: (['ec2:DescribeImages'], ['ec2:DeregisterImage']),
+                    awsComponent.Snapshots: (['ec2:DescribeSnapshots', 'ec2:DescribeImages'], ['ec2:DeleteSnapshot']),
+                    awsComponent.KeyPairs: (['ec2:DescribeKeyPairs'], ['ec2:DeleteKeyPair']),
+                    awsComponent.MetricAlarms: (['cloudwatch:DescribeAlarms'], ['cloudwatch:DeleteAlarms']),
+                    awsComponent.CloudWatchLogGroups: (['logs:DescribeLogGroups'], ['logs:DeleteLogGroup']),
+                    awsComponent.ConfigRules: (['config:DescribeConfigRules'], ['config:DeleteConfigRule']),
+                    awsComponent.ConfigurationRecorders: (['config:DescribeConfigurationRecorderStatus'], ['config:DeleteConfigurationRecorder']),
+                    awsComponent.CloudFormationStacks: (['cloudformation:ListStacks'], ['cloudformation:DeleteStack', 'cloudformation:ListExports', 'cloudformation:ListImports']),
+                    awsComponent.CloudTrail: (['cloudtrail:DescribeTrails'], ['cloudtrail:DeleteTrail']),
+                    awsComponent.AssessmentTargets: (['inspector:ListAssessmentTargets', 'inspector:DescribeAssessmentTargets'], ['inspector:DeleteAssessmentTarget']),
+                    awsComponent.SNSTopics: (['sns:ListTopics'], ['sns:DeleteTopic']),
+                    awsComponent.VPC: (['ec2:DescribeVpcs'], ['ec2:DeleteVpc', 'ec2:DescribeSubnets', 'ec2:DescribeNetworkInterfaces', 'ec2:DescribeVpcEndpoints',
+                                                              'ec2:DescribeInternetGateways', 'ec2:DescribeRouteTables']),
+                    awsComponent.RouteTables: (['ec2:DescribeRouteTables', 'ec2:DescribeVpcs'], ['ec2:DeleteRouteTable']),
+                    awsComponent.Subnets: (['ec2:DescribeSubnets', 'ec2:DescribeVpcs'], ['ec2:DeleteSubnet']),
+                    awsComponent.InternetGateways: (['ec2:DescribeInternetGateways', 'ec2:DescribeVpcs'], ['ec2:DetachInternetGateway', 'ec2:DeleteInternetGateway']),
+                    awsComponent.VPCEndpoints: (['ec2:DescribeVpcEndpoints', 'ec2:DescribeVpcs'], ['ec2:DeleteVpcEndpoints']),
+                    awsComponent.NATGateways: (['ec2:DescribeNatGateways'], ['ec2:DeleteNatGateway']),
+                    awsComponent.ElasticIPs: (['ec2:DescribeAddresses'], ['ec2:DisassociateAddress', 'ec2:ReleaseAddress']),
+                    awsComponent.NetworkInterfaces: (['ec2:DescribeNetworkInterfaces'], ['ec2:DeleteNetworkInterface']),
+                    awsComponent.S3: (['s3:ListAllMyBuckets', 's3:GetBucketLocation', 's3:GetBucketTagging', 'cloudwatch:GetMetricData'], ['s3:ListBucket', 's3:DeleteObject', 's3:DeleteBucket']),
+                    awsComponent.Users: (['iam:ListUsers'], ['iam:GetLoginProfile', 'iam:DeleteLoginProfile', 'iam:ListAccessKeys', 'iam:DeleteAccessKey', 'iam:ListGroupsForUser',
+                                                            'iam:RemoveUserFromGroup', 'iam:ListAttachedUserPolicies', 'iam:DetachUserPolicy', 'iam:DeleteUser']),
+                    awsComponent.Groups: (['iam:ListGroups'], ['iam:GetGroup', 'iam:RemoveUserFromGroup', 'iam:ListAttachedGroupPolicies', 'iam:DetachGroupPolicy',
+                                                              'iam:ListGroupPolicies', 'iam:DeleteGroupPolicy', 'iam:DeleteGroup']),
+                    awsComponent.Policies: (['iam:ListPolicies'], ['iam:ListEntitiesForPolicy', 'iam:DetachUserPolicy', 'iam:DetachGroupPolicy', 'iam:DetachRolePolicy',
+                                                                  'iam:ListPolicyVersions', 'iam:DeletePolicyVersion', 'iam:DeletePolicy']),
+                    awsComponent.Roles: (['iam:ListRoles'], ['iam:ListAttachedRolePolicies', 'iam:DetachRolePolicy', 'iam:ListRolePolicies', 'iam:DeleteRolePolicy',
+                                                            'iam:ListInstanceProfilesForRole', 'iam:RemoveRoleFromInstanceProfile', 'iam:DeleteRole', 'iam:DeleteServiceLinkedRole']),
+                    awsComponent.InstanceProfiles: (['iam:ListInstanceProfiles'], ['iam:RemoveRoleFromInstanceProfile', 'iam:DeleteInstanceProfile'])}
+#  summarySource: the cheapest call listing each component for "--summary" - (service, operation,
+#  parameters, items from a page, id key, tag key). Items without tags use itemsKeep for keep.
+#  list_buckets has no tags, so S3 keep items aren't counted (None).
+summarySource = {awsComponent.EC2: ('ec2', 'describe_instances', {}, lambda page: [inst for resv in page['Reservations'] for inst in resv['Instances'] if inst['State']['Name'] != 'terminated'], 'InstanceId', 'Tags'),
+                 awsComponent.SecurityGroups: ('ec2', 'describe_security_groups', {}, lambda page: [x for x in page['SecurityGroups'] if x['GroupName'] != 'default'], 'GroupId', 'Tags'),
+                 awsComponent.Volumes: ('ec2', 'describe_volumes', {}, lambda page: page['Volumes'], 'VolumeId', 'Tags'),
+                 awsComponent.AMIs: ('ec2', 'describe_images', {'Owners': ['self']}, lambda page: page['Images'], 'ImageId', 'Tags'),
+                 awsComponent.Snapshots: ('ec2', 'describe_snapshots', {'OwnerIds': ['self']}, lambda page: page['Snapshots'], 'SnapshotId', 'Tags'),
+                 awsComponent.KeyPairs: ('ec2', 'describe_key_pairs', {}, lambda page: page['KeyPairs'], 'KeyName', None),
+                 awsComponent.VPC: ('ec2', 'describe_vpcs', {}, lambda page: page['Vpcs'], 'VpcId', 'Tags'),
+                 awsComponent.RouteTables: ('ec2', 'describe_route_tables', {}, lambda page: page['RouteTables'], 'RouteTableId', 'Tags'),
+                 awsComponent.Subnets: ('ec2', 'describe_subnets', {}, lambda page: page['Subnets'], 'SubnetId', 'Tags'),
+                 awsComponent.InternetGateways: ('ec2', 'describe_internet_gateways', {}, lambda page: page['InternetGateways'], 'InternetGatewayId', 'Tags'),
+                 awsComponent.VPCEndpoints: ('ec2', 'describe_vpc_endpoints', {}, lambda page: page['VpcEndpoints'], 'VpcEndpointId', None),
+                 awsComponent.NATGateways: ('ec2', 'describe_nat_gateways', {}, lambda page: [x for x in page['NatGateways'] if x['State'] not in ('deleting', 'deleted')], 'NatGatewayId', 'Tags'),
+                 awsComponent.ElasticIPs: ('ec2', 'describe_addresses', {}, lambda page: [x for x in page['Addresses'] if x.get('AllocationId')], 'AllocationId', 'Tags'),
+                 awsComponent.NetworkInterfaces: ('ec2', 'describe_network_interfaces', {}, lambda page: [x for x in page['NetworkInterfaces'] if not x.get('Attachment', {}).get('InstanceId')], 'NetworkInterfaceId', 'TagSet'),
+                 awsComponent.MetricAlarms: ('cloudwatch', 'describe_alarms', {}, lambda page: page['MetricAlarms'], 'AlarmName', None),
+                 awsComponent.CloudWatchLogGroups: ('logs', 'describe_log_groups', {}, lambda page: page['logGroups'], 'logGroupName', None),
+                 awsComponent.ConfigRules: ('config', 'describe_config_rules', {}, lambda page: page['ConfigRules'], 'ConfigRuleName', None),
+                 awsComponent.ConfigurationRecorders: ('config', 'describe_configuration_recorders', {}, lambda page: page['ConfigurationRecorders'], 'name', None),
+                 awsComponent.CloudFormationStacks: ('cloudformation', 'list_stacks', {}, lambda page: [x for x in page['StackSummaries'] if x['StackStatus'] != 'DELETE_COMPLETE'], 'StackName', None),
+                 awsComponent.CloudTrail: ('cloudtrail', 'describe_trails', {'includeShadowTrails': False}, lambda page: page['trailList'], 'Name', None),
+                 awsComponent.AssessmentTargets: ('inspector', 'list_assessment_targets', {}, lambda page: page['assessmentTargetArns'], None, None),
+                 awsComponent.SNSTopics: ('sns', 'list_topics', {}, lambda page: page['Topics'], 'TopicArn', None),
+                 awsComponent.S3: ('s3', 'list_buckets', {}, lambda page: page['Buckets'], 'Name', None),
+                 awsComponent.Users: ('iam', 'list_users', {}, lambda page: page['Users'], 'UserName', None),
+                 awsComponent.Groups: ('iam', 'list_groups', {}, lambda page: page['Groups'], 'GroupName', None),
+                 awsComponent.Policies: ('iam', 'list_policies', {'Scope': 'Local'}, lambda page: page['Policies'], 'PolicyName', None),
+                 awsComponent.Roles: ('iam', 'list_roles', {}, lambda page: page['Roles'], 'RoleName', None),
+                 awsComponent.InstanceProfiles: ('iam', 'list_instance_profiles', {}, lambda page: page['InstanceProfiles'], 'InstanceProfileName', None)}
+#  verifySource: for verifyDeletes, how a summarySource call is limited to a list of IDs -
+#  (parameter, EC2 filter name or None for an ID list parameter, IDs per call, gone test). Filters
+#  are used rather than the ID list parameters, which fail the whole call when one of the IDs is
+#  gone. The gone test (None: none needed) is true for an item returned in a deleting/deleted
+#  state; terminated instances and deleted NAT gateways are already left out by summarySource.
+verifySource = {awsComponent.EC2: ('Filters', 'instance-id', 200, lambda x: x['State']['Name'] == 'shutting-down'),
+                awsComponent.SecurityGroups: ('Filters', 'group-id', 200, None),
+                awsComponent.Volumes: ('Filters', 'volume-id', 200, lambda x: x['State'] in ('deleting', 'deleted')),
+                awsComponent.AMIs: ('Filters', 'image-id', 200, lambda x: x['State'] == 'deregistered'),
+                awsComponent.Snapshots: ('Filters', 'snapshot-id', 200, None),
+                awsComponent.KeyPairs: ('Filters', 'key-name', 200, None),
+                awsComponent.VPC: ('Filters', 'vpc-id', 200, None),
+                awsComponent.RouteTables: ('Filters', 'route-table-id', 200, None),
+                awsComponent.Subnets: ('Filters', 'subnet-id', 200, None),
+                awsComponent.InternetGateways: ('Filters', 'internet-gateway-id', 200, None),
+                awsComponent.VPCEndpoints: ('Filters', 'vpc-endpoint-id', 200, lambda x: x['State'] in ('Deleting', 'Deleted')),
+                awsComponent.NATGateways: ('Filter', 'nat-gateway-id', 200, None),
+                awsComponent.ElasticIPs: ('Filters', 'allocation-id', 200, None),
+                awsComponent.NetworkInterfaces: ('Filters', 'network-interface-id', 200, None),
+                awsComponent.MetricAlarms: ('AlarmNames', None, 100, None)}
+#  awsComponentGlobal: components that aren't regional.
+awsComponentGlobal = {awsComponent.S3, awsComponent.Users, awsComponent.Groups, awsComponent.Policies, awsComponent.Roles, awsComponent.InstanceProfiles}
+#  preflightSkip: components left out of the run by "--preflight drop".
+preflightSkip = set()
 noDeleteList = []
 print('AWS components in-scope for {}:'.format(sys.argv[0]))
 for id, idDetail in vars(awsComponent).items():
@@ -343,15 +2354,75 @@ for id, idDetail in vars(awsComponent).items():
 if aws_cleanupArg.keepTag:
   print('Tag used to identify which AWS items can\'t be terminated or deleted: {0}'.format(', '.join(aws_cleanupArg.keepTag)))
 print("\n")
+#  Initiate all awsRpt instances for regions here. Could be programmatically done when the output
+#  is generated, but too prone to errors.
+EC2Rpt = awsRpt("{0}:".format(awsComponent.EC2.compName), *[["Region", 16],["Instance ID", 25],["Name(Tag)", 30],keepTagHeader, ["Image ID", 30],["Status", 13]])
+SecurityGroupsRpt = awsRpt("{0}:".format(awsComponent.SecurityGroups.compName), *[["Region", 16],["Group ID", 25],["Name(Tag)", 30],keepTagHeader,["Group Name", 30],["Description", 35]])
+VolumesRpt = awsRpt("{0}:".format(awsComponent.Volumes.compName), *[["Region", 16],["Volume ID", 25],["Name(Tag)", 30],keepTagHeader,["Vol Type", 10],["State", 15]])
+AMIsRpt = awsRpt("{0}:".format(awsComponent.AMIs.compName), *[["Region", 16],["Image ID", 25],["Name(Tag)", 30],keepTagHeader,["Image Name", 40],["State", 12]])
+SnapshotsRpt = awsRpt("{0}:".format(awsComponent.Snapshots.compName), *[["Region", 16],["Snapshot ID", 25],["Name(Tag)", 30],keepTagHeader,["Volume ID", 25],["Size(GiB)", 9],["AMI", 25]])
+KeyPairsRpt = awsRpt("{0}:".format(awsComponent.KeyPairs.compName), *[["Region", 16],["KeyName", 30],["Keep"]])
+MetricAlarmsRpt = awsRpt("{0}:".format(awsComponent.MetricAlarms.compName), *[["Region", 16],["Alarm Name", 37],["Alarm Description", 40], ['State', 17], ["Namespace", 25], ["Metric Name", 30],["Keep"]])
+CloudWatchLogGroupsRpt = awsRpt("{0}:".format(awsComponent.CloudWatchLogGroups.compName), *[["Region", 16],["Cloud Watch Log Group Name", 37],["Keep"]])
+ConfigRulesRpt = awsRpt("{0}:".format(awsComponent.ConfigRules.compName), *[["Region", 16],["Config Rule Name", 37],["Rule Description", 70], ['State', 17] ,["Keep"]])
+ConfigurationRecordersRpt = awsRpt("{0}:".format(awsComponent.ConfigurationRecorders.compName), *[["Region", 16],["Config Recorder Name", 37],["Recording?"],["Keep"]])
+CloudFormationStacksRpt = awsRpt("{0}:".format(awsComponent.CloudFormationStacks.compName), *[["Region", 16], ["Name", 37],["Stack Status", 25],["Keep"]])
+CloudTrailRpt = awsRpt("{0}:".format(awsComponent.CloudTrail.compName), *[["Home Region", 16],["Name", 37],["All Regions?"],["S3BucketName", 30],["Keep"]])
+AssessmentTargetsRpt = awsRpt("{0}:".format(awsComponent.AssessmentTargets.compName), *[["Region", 16],["Assessment Target Name", 37],["Keep"]])
+SNSTopicsRpt = awsRpt("{0}:".format(awsComponent.SNSTopics.compName), *[["Region", 16],["SNS Topic", 37],["Keep"]])
+VPCRpt = awsRpt("{0}{1}:".format(awsComponent.VPC.compName, formatDispName('' if aws_cleanupArg.vpc_rebuild else 'non-default VPC')), *[["Region", 16],["CIDR Block", 20],["VPC ID", 25],["VPC Default"],["Name(Tag)", 30],keepTagHeader,["State", 10]])
+RouteTablesRpt = awsRpt("{0}{1}:".format(awsComponent.RouteTables.compName, formatDispName('' if aws_cleanupArg.vpc_rebuild else 'for non-default VPCs')), *[["Region", 16], ["Route Table ID", 28],["VPC ID", 35],["Main", 4],["Name(Tag)", 30],keepTagHeader])
+SubnetsRpt = awsRpt("{0}{1}:".format(awsComponent.Subnets.compName, formatDispName('' if aws_cleanupArg.vpc_rebuild else 'for non-default VPCs')), *[["Region", 16], ["CIDR Block", 20],["Subnet ID", 28],["VPC ID", 35],["Name(Tag)", 30],keepTagHeader,["State", 10]])
+InternetGatewaysRpt = awsRpt("{0}{1}:".format(awsComponent.InternetGateways.compName, formatDispName('' if aws_cleanupArg.vpc_rebuild else 'for non-default VPCs')), *[["Region", 16],["Internet Gateway ID", 28],["Attached VPC", 35],["VPC Status",10],["Name(Tag)", 30],keepTagHeader])
+S3Rpt = awsRpt("{0}:".format(awsComponent.S3.compName), *[["Bucket Name", 40],["Region", 16],["Objects", 10],["Std Size", 10],keepTagHeader])
+UsersRpt = awsRpt("{0}:".format(awsComponent.Users.compName),*[["User Name", 20], ["ARN", 50], ["Keep"]])
+GroupsRpt = awsRpt("{0}:".format(awsComponent.Groups.compName),*[["Group Name", 60], ["Keep"]])
+PoliciesRpt = awsRpt("{0}:".format(awsComponent.Policies.compName),*[["Policy Name", 70], ["Description", 40], ["Keep"]])
+RolesRpt = awsRpt("{0}:".format(awsComponent.Roles.compName),*[["Role Name", 75], ["AWS Service"], ["Keep"]])
+InstanceProfilesRpt = awsRpt("{0}:".format(awsComponent.InstanceProfiles.compName), *[["Instance Profile Name", 75], ["Keep"]])
+NATGatewaysRpt = awsRpt("{0}:".format(awsComponent.NATGateways.compName), *[["Region", 16],["NAT Gateway ID", 25],["Name(Tag)", 30],keepTagHeader,["VPC ID", 25],["State", 10]])
+ElasticIPsRpt = awsRpt("{0}:".format(awsComponent.ElasticIPs.compName), *[["Region", 16],["Allocation ID", 28],["Name(Tag)", 30],keepTagHeader,["Public IP", 16],["Associated With", 25]])
+NetworkInterfacesRpt = awsRpt("{0}:".format(awsComponent.NetworkInterfaces.compName), *[["Region", 16],["Interface ID", 25],keepTagHeader,["Type", 28],["Status", 10],["Description", 45]])
+VPCEndpointsRpt = awsRpt("{0}:".format(awsComponent.VPCEndpoints.compName), *[["Region", 16], ['Endpoint ID', 25], ['Endpoint Type', 20],['VPC ID', 35], ['Service Name', 45],['Keep']])
+
+#  componentRpt: report for each component (watch mode resets them between rescans).
+componentRpt = {awsComponent.EC2: EC2Rpt, awsComponent.SecurityGroups: SecurityGroupsRpt, awsComponent.Volumes: VolumesRpt,
+                awsComponent.AMIs: AMIsRpt, awsComponent.Snapshots: SnapshotsRpt,
+                awsComponent.KeyPairs: KeyPairsRpt, awsComponent.MetricAlarms: MetricAlarmsRpt, awsComponent.CloudWatchLogGroups: CloudWatchLogGroupsRpt,
+                awsComponent.ConfigRules: ConfigRulesRpt, awsComponent.ConfigurationRecorders: ConfigurationRecordersRpt,
+                awsComponent.CloudFormationStacks: CloudFormationStacksRpt, awsComponent.CloudTrail: CloudTrailRpt,
+                awsComponent.AssessmentTargets: AssessmentTargetsRpt, awsComponent.SNSTopics: SNSTopicsRpt, awsComponent.VPC: VPCRpt,
+                awsComponent.RouteTables: RouteTablesRpt, awsComponent.Subnets: SubnetsRpt, awsComponent.InternetGateways: InternetGatewaysRpt,
+                awsComponent.VPCEndpoints: VPCEndpointsRpt, awsComponent.NATGateways: NATGatewaysRpt, awsComponent.ElasticIPs: ElasticIPsRpt,
+                awsComponent.NetworkInterfaces: NetworkInterfacesRpt, awsComponent.S3: S3Rpt, awsComponent.Users: UsersRpt, awsComponent.Groups: GroupsRpt,
+                awsComponent.Policies: PoliciesRpt, awsComponent.Roles: RolesRpt, awsComponent.InstanceProfiles: InstanceProfilesRpt}
+
+#  Eh... don't know if both lists are needed, but for future use will include VPCDefaultByRegion.
+VPCDefaultByRegion = []
+VPCNoDefaultByRegion = []
+currentUserArnDel = False
+
+if args.command == 'merge':
+  mergeShards(mergeShardList, args.plan)
+  exit(0)
+
 # Load all regions from AWS into region list.
 # As this is where the initial connection occurs to AWS, included a couple traps to handle
 # connectivity errors - network MIA, invalid AWS credentials, missing AWS credentials,....
+metaCache = metaCacheClass(metaCacheFile, metaCacheTTL)
 try:
-  regions = [region['RegionName'] for region in boto3.client('ec2').describe_regions()['Regions']]
+  callerIdentity = awsClient('sts').get_caller_identity()
+  accountMeta = None if args.refresh_cache else metaCache.get(callerIdentity['Account'])
+  if accountMeta is None:
+    accountMeta = metaCache.load(callerIdentity['Account'])
+  else:
+    with serviceRegionLock:
+      serviceRegionCache.update((chkService, set(regionList)) for chkService, regionList in accountMeta['services'].items())
+  regions = list(accountMeta['regions'])
 except NoCredentialsError as e:
   print('ERROR: Cannot connect to AWS - possible credential issue.\nVerify that local AWS credentials in .aws are configured correctly.')
   exit(10)
-except EndpointConnectionError as e:
+except awsConnErrors as e:
   print('ERROR: Cannot connect to AWS - possible network issue.\nAWS error message: ', e)
   exit(11)
 except:
@@ -368,315 +2439,406 @@ if args.region_test:
   regions=regionTestSubset  #for testing#
   print('Reduced regions for script testing: ', regions, '\n\n')
 
-resourceIAM = boto3.resource('iam')
-clientIAM = boto3.client('iam')
-resourceS3 = boto3.resource('s3')
-clientS3 = boto3.client('s3')
-clientEC2 = boto3.client('ec2')
-
-currentUserArn = resourceIAM.CurrentUser().arn
-currentAccountId = resourceIAM.CurrentUser().arn.split(':')[-2]
-currentAlias = ""
-for getAlias in clientIAM.list_account_aliases()['AccountAliases']:
-  currentAlias = getAlias
+clientIAM = boto3.client('iam', config=awsConfig)
+resourceS3 = boto3.resource('s3', config=awsConfig)
+clientS3 = boto3.client('s3', config=awsConfig)
+clientEC2 = boto3.client('ec2', config=awsConfig)
+
+currentUserArn = callerIdentity['Arn']
+currentAccountId = callerIdentity['Account']
+currentAlias = accountMeta['alias']
 print('AWS Account ID/Alias:\t{0}{1}'.format(currentAccountId, formatDispName(currentAlias)))
 print('Connected User:\t\t{0}'.format(re.sub('^.+/', '', currentUserArn.split(':')[-1])))
+if args.preflight:
+  preflightCheck(args.preflight)
 
-print('Inventory of ALL AWS components\n')
-output=""
 securityGroupDepend=defaultdict(lambda : defaultdict(dict))
 
-#  Initiate all awsRpt instances for regions here. Could be programmatically done when the output
-#  is generated, but too prone to errors.
-EC2Rpt = awsRpt("{0}:".format(awsComponent.EC2.compName), *[["Region", 16],["Instance ID", 25],["Name(Tag)", 30],keepTagHeader, ["Image ID", 30],["Status", 13]])
-SecurityGroupsRpt = awsRpt("{0}:".format(awsComponent.SecurityGroups.compName), *[["Region", 16],["Group ID", 25],["Name(Tag)", 30],keepTagHeader,["Group Name", 30],["Description", 35]])
-VolumesRpt = awsRpt("{0}:".format(awsComponent.Volumes.compName), *[["Region", 16],["Volume ID", 25],["Name(Tag)", 30],keepTagHeader,["Vol Type", 10],["State", 15]])
-KeyPairsRpt = awsRpt("{0}:".format(awsComponent.KeyPairs.compName), *[["Region", 16],["KeyName", 30],["Keep"]])
-MetricAlarmsRpt = awsRpt("{0}:".format(awsComponent.MetricAlarms.compName), *[["Region", 16],["Alarm Name", 37],["Alarm Description", 40], ['State', 17], ["Namespace", 25], ["Metric Name", 30],["Keep"]])
-CloudWatchLogGroupsRpt = awsRpt("{0}:".format(awsComponent.CloudWatchLogGroups.compName), *[["Region", 16],["Cloud Watch Log Group Name", 37],["Keep"]])
-ConfigRulesRpt = awsRpt("{0}:".format(awsComponent.ConfigRules.compName), *[["Region", 16],["Config Rule Name", 37],["Rule Description", 70], ['State', 17] ,["Keep"]])
-ConfigurationRecordersRpt = awsRpt("{0}:".format(awsComponent.ConfigurationRecorders.compName), *[["Region", 16],["Config Recorder Name", 37],["Recording?"],["Keep"]])
-CloudFormationStacksRpt = awsRpt("{0}:".format(awsComponent.CloudFormationStacks.compName), *[["Region", 16], ["Name", 37],["Stack Status", 25],["Keep"]])
-CloudTrailRpt = awsRpt("{0}:".format(awsComponent.CloudTrail.compName), *[["Home Region", 16],["Name", 37],["All Regions?"],["S3BucketName", 30],["Keep"]])
-AssessmentTargetsRpt = awsRpt("{0}:".format(awsComponent.AssessmentTargets.compName), *[["Region", 16],["Assessment Target Name", 37],["Keep"]])
-SNSTopicsRpt = awsRpt("{0}:".format(awsComponent.SNSTopics.compName), *[["Region", 16],["SNS Topic", 37],["Keep"]])
-VPCRpt = awsRpt("{0}{1}:".format(awsComponent.VPC.compName, formatDispName('' if aws_cleanupArg.vpc_rebuild else 'non-default VPC')), *[["Region", 16],["CIDR Block", 20],["VPC ID", 25],["VPC Default"],["Name(Tag)", 30],keepTagHeader,["State", 10]])
-RouteTablesRpt = awsRpt("{0}{1}:".format(awsComponent.RouteTables.compName, formatDispName('' if aws_cleanupArg.vpc_rebuild else 'for non-default VPCs')), *[["Region", 16], ["Route Table ID", 28],["VPC ID", 35],["Main", 4],["Name(Tag)", 30],keepTagHeader])
-SubnetsRpt = awsRpt("{0}{1}:".format(awsComponent.Subnets.compName, formatDispName('' if aws_cleanupArg.vpc_rebuild else 'for non-default VPCs')), *[["Region", 16], ["CIDR Block", 20],["Subnet ID", 28],["VPC ID", 35],["Name(Tag)", 30],keepTagHeader,["State", 10]])
-InternetGatewaysRpt = awsRpt("{0}{1}:".format(awsComponent.InternetGateways.compName, formatDispName('' if aws_cleanupArg.vpc_rebuild else 'for non-default VPCs')), *[["Region", 16],["Internet Gateway ID", 28],["Attached VPC", 35],["VPC Status",10],["Name(Tag)", 30],keepTagHeader])
-VPCEndpointsRpt = awsRpt("{0}:".format(awsComponent.VPCEndpoints.compName), *[["Region", 16], ['Endpoint ID', 25], ['Endpoint Type', 20],['VPC ID', 35], ['Service Name', 45],['Keep']])
-
-#  Eh... don't know if both lists are needed, but for future use will include VPCDefaultByRegion.
-VPCDefaultByRegion = []
-VPCNoDefaultByRegion = []
-for currentRegion in sorted(regions):
-  print ('Inventorying region {}...'.format(currentRegion))
-  clientEC2Region = boto3.client('ec2',region_name=currentRegion)
-  clientEventsRegion = boto3.client('events',region_name=currentRegion)
-  clientCloudwatchRegion = boto3.client('cloudwatch', region_name=currentRegion)
-  clientCloudWatchLogRegion = boto3.client('logs', region_name=currentRegion)
-  clientCloudTrailRegion = boto3.client('cloudtrail', region_name=currentRegion)
-  clientConfigRegion = boto3.client('config', region_name=currentRegion)
-  clientSNSRegion = boto3.client('sns', region_name=currentRegion)
-  clientInspectorRegion = boto3.client('inspector', region_name=currentRegion)
-  clientCloudFormationRegion = boto3.client('cloudformation', region_name=currentRegion)
+def inScan(parComponent, parComponents, parRegion):
+  #  inScan - component is scanned: in-scope for this run, in parComponents (the components due
+  #    for a rescan in watch mode; None = all), owned by this shard ("--shard"), and offered in
+  #    the region. Components of an endpoint with an open circuit breaker are flagged and skipped,
+  #    and nothing is scanned once the deadline ("--deadline") is reached.
+  if parComponent in preflightSkip or not ((aws_cleanupArg.inv or parComponent.compDelete) and (parComponents is None or parComponent in parComponents) and shardOwns(parRegion, parComponent)):
+    return False
+  if parRegion and not serviceInRegion(componentService[parComponent], parRegion):
+    return False
+  if connBreaker.isOpen(componentService[parComponent], parRegion):
+    connBreaker.skip(parComponent, parRegion)
+    invTrack.fail(parComponent, parRegion)
+    return False
+  if deadline.expired():
+    deadline.skipScan(parComponent, parRegion)
+    return False
+  return True
+
+def scanStart(parRegion, parComponent):
+  progress.scanning(parRegion, parComponent)
+  metrics.scanStart(parRegion, parComponent)
+  trace.scanStart(parRegion, parComponent)
+  invTrack.begin(parComponent, parRegion)
+
+def regionScanned(parRegion):
+  progress.regionDone(parRegion)
+  metrics.scanEnd(parRegion)
+  trace.scanEnd(parRegion)
+
+def writeMetrics():
+  if args.metrics:
+    try:
+      metrics.writeFile(args.metrics)
+    except (IOError, OSError) as e:
+      print('ERROR: cannot write metrics file {0}:'.format(args.metrics), e)
+
+#  s3BucketMeta: {bucket: {'region', 'objects', 'bytes'}} from the last S3 inventory, for the
+#  S3 delete (regional client, largest buckets first).
+s3BucketMeta = {}
+
+def s3BucketRegion(parBucket):
+  #  get_bucket_location returns None for us-east-1 and 'EU' for eu-west-1 (legacy buckets).
+  bucketRegion = awsClient('s3').get_bucket_location(Bucket=parBucket).get('LocationConstraint')
+  return {None: 'us-east-1', '': 'us-east-1', 'EU': 'eu-west-1'}.get(bucketRegion, bucketRegion)
+
+def s3BucketSizes(parRegion, parBuckets):
+  #  s3BucketSizes - {bucket: (objects, bytes)} from the daily S3 storage metrics, one
+  #    GetMetricData per 250 buckets (500 queries per call) in the buckets' region. Sizes are
+  #    for the Standard storage class; buckets without metrics yet (new buckets) are left out.
+  retSizes = defaultdict(lambda : [None, None])
+  metricQueries = []
+  for i, bucket in enumerate(parBuckets):
+    for metricName, storageType in (('NumberOfObjects', 'AllStorageTypes'), ('BucketSizeBytes', 'StandardStorage')):
+      metricQueries.append({'Id': '{0}{1}'.format('n' if metricName == 'NumberOfObjects' else 's', i), 'ReturnData': True,
+                            'MetricStat': {'Metric': {'Namespace': 'AWS/S3', 'MetricName': metricName,
+                                                      'Dimensions': [{'Name': 'BucketName', 'Value': bucket}, {'Name': 'StorageType', 'Value': storageType}]},
+                                           'Period': 86400, 'Stat': 'Average'}})
+  clientCloudwatchRegion = awsClient('cloudwatch', parRegion)
+  for i in range(0, len(metricQueries), 500):
+    for page in clientCloudwatchRegion.get_paginator('get_metric_data').paginate(MetricDataQueries=metricQueries[i:i + 500], StartTime=time.time() - 3 * 86400, EndTime=time.time(), ScanBy='TimestampDescending'):
+      for metricResult in page['MetricDataResults']:
+        if metricResult['Values']:
+          retSizes[parBuckets[int(metricResult['Id'][1:])]][0 if metricResult['Id'][0] == 'n' else 1] = int(metricResult['Values'][0])
+  return retSizes
+
+def imageDelete(parImage):
+  #  imageDelete - the AMI is deleted by this plan: decided from the AMI itself (tags, state, AMIs
+  #    in scope), not from termTrack, so a shard or "--deadline" run that didn't scan the AMI
+  #    makes the same call for its snapshots.
+  return bool(awsComponent.AMIs.compDelete and awsComponent.AMIs not in preflightSkip and parImage['State'] != 'deregistered'
+              and tagScan(parImage.get('Tags'), aws_cleanupArg).delThisItem)
+
+def scanConnError(parRegion, parComponent, parError):
+  #  scanConnError - the component's scan failed (connection error or timeout): its previous
+  #    inventory is kept (invTrack.fail), and it's flagged in the report instead of ending the run.
+  print('\tComponent "{0}" - cannot connect to {1}'.format(parComponent.compName, 'region ' + parRegion if parRegion else 'the global endpoint'))
+  invTrack.fail(parComponent, parRegion)
+  connBreaker.error(componentService[parComponent], parRegion, parComponent, type(parError).__name__)
+
+def inventoryRegion(currentRegion, parComponents=None):
+  if parComponents is None:
+    print ('Inventorying region {}...'.format(currentRegion))
+  clientEC2Region = awsClient('ec2', currentRegion)
+  clientCloudwatchRegion = awsClient('cloudwatch', currentRegion)
+  clientCloudWatchLogRegion = awsClient('logs', currentRegion)
+  clientCloudTrailRegion = awsClient('cloudtrail', currentRegion)
+  clientConfigRegion = awsClient('config', currentRegion)
+  clientSNSRegion = awsClient('sns', currentRegion)
+  clientInspectorRegion = awsClient('inspector', currentRegion)
+  clientCloudFormationRegion = awsClient('cloudformation', currentRegion)
 
   #################################################################
   #  EC2 Instances
   #################################################################
   #  ...CompSci truth tables from WWU...
-  if aws_cleanupArg.inv or awsComponent.EC2.compDelete:
+  if inScan(awsComponent.EC2, parComponents, currentRegion):
+    scanStart(currentRegion, awsComponent.EC2)
     try:
       for resp in clientEC2Region.describe_instances()['Reservations']:
         for inst in resp['Instances']:
           tagData = tagScan(inst.get('Tags'), aws_cleanupArg)
           rptCommonLine = (True, currentRegion, inst['InstanceId'],tagData.nameTag,tagData.keepTagFound,inst['ImageId'],inst['State']['Name'])
+          invTrack.add(awsComponent.EC2, currentRegion, inst['InstanceId'], tagData.keepTagFound, rptCommonLine)
           if aws_cleanupArg.inv:
             EC2Rpt.addLine(*rptCommonLine)
           elif inst['State']['Name'] != 'terminated':
             if tagData.delThisItem:
               EC2Rpt.addLine(*rptCommonLine)
-              termTrack[awsComponent.EC2][currentRegion][inst['InstanceId']] = {'DISPLAY_ID': inst['InstanceId'] + formatDispName(tagData.nameTag),'TERMINATED':False}
-    except EndpointConnectionError:
-      print('\tComponent "{0}" - cannot connect to region {1}'.format(awsComponent.EC2.compName, currentRegion))
-      if aws_cleanupArg.ignore_conn_err:
-        pass
-      else:
-        exit(100)
+              ign = termTrack.add(awsComponent.EC2, currentRegion, inst['InstanceId'], display=inst['InstanceId'] + formatDispName(tagData.nameTag))
+    except awsConnErrors as e:
+      scanConnError(currentRegion, awsComponent.EC2, e)
 
   #################################################################
   #  SecurityGroups
   #################################################################
-  if aws_cleanupArg.inv or awsComponent.SecurityGroups.compDelete:
+  if inScan(awsComponent.SecurityGroups, parComponents, currentRegion):
+    scanStart(currentRegion, awsComponent.SecurityGroups)
     try:
       for SecurityGroups in clientEC2Region.describe_security_groups()['SecurityGroups']:
         # ... can't do anything with the default security group
         if SecurityGroups['GroupName'] != 'default':
           tagData = tagScan(SecurityGroups.get('Tags'), aws_cleanupArg)
           rptCommonLine = (True, currentRegion, SecurityGroups['GroupId'],tagData.nameTag,tagData.keepTagFound,SecurityGroups['GroupName'],SecurityGroups['Description'])
+          invTrack.add(awsComponent.SecurityGroups, currentRegion, SecurityGroups['GroupId'], tagData.keepTagFound, rptCommonLine)
           if aws_cleanupArg.inv:
             SecurityGroupsRpt.addLine(*rptCommonLine)
           elif tagData.delThisItem:
             SecurityGroupsRpt.addLine(*rptCommonLine)
-            termTrack[awsComponent.SecurityGroups][currentRegion][SecurityGroups['GroupId']] = {'DISPLAY_ID': SecurityGroups['GroupId'] + formatDispName(tagData.nameTag, SecurityGroups['GroupName'], SecurityGroups['Description'])}
-    except EndpointConnectionError:
-      print('\tComponent "{0}" - cannot connect to region {1}'.format(awsComponent.SecurityGroups.compName, currentRegion))
-      if aws_cleanupArg.ignore_conn_err:
-        pass
-      else:
-        exit(100)
+            ign = termTrack.add(awsComponent.SecurityGroups, currentRegion, SecurityGroups['GroupId'], display=SecurityGroups['GroupId'] + formatDispName(tagData.nameTag, SecurityGroups['GroupName'], SecurityGroups['Description']))
+    except awsConnErrors as e:
+      scanConnError(currentRegion, awsComponent.SecurityGroups, e)
           
 
   #################################################################
   #  Volumes
   #################################################################
-  if aws_cleanupArg.inv or awsComponent.Volumes.compDelete:
+  if inScan(awsComponent.Volumes, parComponents, currentRegion):
+    scanStart(currentRegion, awsComponent.Volumes)
     try:
       for Volumes in clientEC2Region.describe_volumes()['Volumes']:
         tagData = tagScan(Volumes.get('Tags'), aws_cleanupArg)
         rptCommonLine = (True, currentRegion, Volumes['VolumeId'],tagData.nameTag,tagData.keepTagFound,Volumes['VolumeType'],Volumes['State'])
+        invTrack.add(awsComponent.Volumes, currentRegion, Volumes['VolumeId'], tagData.keepTagFound, rptCommonLine)
         if aws_cleanupArg.inv:
           VolumesRpt.addLine(*rptCommonLine)
         elif tagData.delThisItem:
           VolumesRpt.addLine(*rptCommonLine)
-          termTrack[awsComponent.Volumes][currentRegion][Volumes['VolumeId']] = {'DISPLAY_ID': Volumes['VolumeId'] + formatDispName(tagData.nameTag)}
-    except EndpointConnectionError:
-      print('\tComponent "{0}" - cannot connect to region {1}'.format(awsComponent.Volumes.compName, currentRegion))
-      if aws_cleanupArg.ignore_conn_err:
-        pass
-      else:
-        exit(100)
+          ign = termTrack.add(awsComponent.Volumes, currentRegion, Volumes['VolumeId'], display=Volumes['VolumeId'] + formatDispName(tagData.nameTag))
+    except awsConnErrors as e:
+      scanConnError(currentRegion, awsComponent.Volumes, e)
+
+  #################################################################
+  #  AMIs
+  #################################################################
+  #  imageSnapshots: {snapshot id: (image id, image deleted)} for the account's AMIs, so the snapshots backing
+  #  an AMI that isn't deleted stay (deleting them would fail with InvalidSnapshot.InUse).
+  imageSnapshots = None
+  if inScan(awsComponent.AMIs, parComponents, currentRegion):
+    scanStart(currentRegion, awsComponent.AMIs)
+    try:
+      imageSnapshots = {}
+      for AMIsPage in clientEC2Region.get_paginator('describe_images').paginate(Owners=['self']):
+        for AMIs in AMIsPage['Images']:
+          tagData = tagScan(AMIs.get('Tags'), aws_cleanupArg)
+          for blockDevice in AMIs.get('BlockDeviceMappings', []):
+            if blockDevice.get('Ebs', {}).get('SnapshotId'):
+              imageSnapshots[blockDevice['Ebs']['SnapshotId']] = (AMIs['ImageId'], imageDelete(AMIs))
+          rptCommonLine = (True, currentRegion, AMIs['ImageId'],tagData.nameTag,tagData.keepTagFound,AMIs.get('Name', ''),AMIs['State'])
+          invTrack.add(awsComponent.AMIs, currentRegion, AMIs['ImageId'], tagData.keepTagFound, rptCommonLine)
+          if aws_cleanupArg.inv:
+            AMIsRpt.addLine(*rptCommonLine)
+          elif tagData.delThisItem and AMIs['State'] != 'deregistered':
+            AMIsRpt.addLine(*rptCommonLine)
+            ign = termTrack.add(awsComponent.AMIs, currentRegion, AMIs['ImageId'], display=AMIs['ImageId'] + formatDispName(tagData.nameTag, AMIs.get('Name')))
+    except awsConnErrors as e:
+      imageSnapshots = None
+      scanConnError(currentRegion, awsComponent.AMIs, e)
+
+  #################################################################
+  #  Snapshots
+  #################################################################
+  if inScan(awsComponent.Snapshots, parComponents, currentRegion):
+    scanStart(currentRegion, awsComponent.Snapshots)
+    try:
+      if imageSnapshots is None:
+        #  AMIs not scanned this time (out of scope, another shard, not due in watch mode).
+        imageSnapshots = {}
+        for AMIsPage in clientEC2Region.get_paginator('describe_images').paginate(Owners=['self']):
+          for AMIs in AMIsPage['Images']:
+            for blockDevice in AMIs.get('BlockDeviceMappings', []):
+              if blockDevice.get('Ebs', {}).get('SnapshotId'):
+                imageSnapshots[blockDevice['Ebs']['SnapshotId']] = (AMIs['ImageId'], imageDelete(AMIs))
+      for SnapshotsPage in clientEC2Region.get_paginator('describe_snapshots').paginate(OwnerIds=['self']):
+        for Snapshots in SnapshotsPage['Snapshots']:
+          tagData = tagScan(Snapshots.get('Tags'), aws_cleanupArg)
+          imageId, imageDeleted = imageSnapshots.get(Snapshots['SnapshotId'], ('', False))
+          rptCommonLine = (True, currentRegion, Snapshots['SnapshotId'],tagData.nameTag,tagData.keepTagFound,Snapshots.get('VolumeId', ''),str(Snapshots.get('VolumeSize', '')),imageId)
+          invTrack.add(awsComponent.Snapshots, currentRegion, Snapshots['SnapshotId'], tagData.keepTagFound, rptCommonLine)
+          if aws_cleanupArg.inv:
+            SnapshotsRpt.addLine(*rptCommonLine)
+          elif tagData.delThisItem and (not imageId or imageDeleted):
+            SnapshotsRpt.addLine(*rptCommonLine)
+            ign = termTrack.add(awsComponent.Snapshots, currentRegion, Snapshots['SnapshotId'], display=Snapshots['SnapshotId'] + formatDispName(tagData.nameTag, Snapshots.get('Description')))
+    except awsConnErrors as e:
+      scanConnError(currentRegion, awsComponent.Snapshots, e)
 
   #################################################################
   #  KeyPairs
   #################################################################
-  if aws_cleanupArg.inv or awsComponent.KeyPairs.compDelete:
+  if inScan(awsComponent.KeyPairs, parComponents, currentRegion):
+    scanStart(currentRegion, awsComponent.KeyPairs)
     try:
       for KeyPairs in clientEC2Region.describe_key_pairs()['KeyPairs']:
         chkItemKeep = reScanItemsKeep(KeyPairs['KeyName'], awsComponent.KeyPairs)
         rptCommonLine = (True, currentRegion, KeyPairs['KeyName'], chkItemKeep)
+        invTrack.add(awsComponent.KeyPairs, currentRegion, KeyPairs['KeyName'], chkItemKeep, rptCommonLine)
         if aws_cleanupArg.inv:
           KeyPairsRpt.addLine(*rptCommonLine)
         elif not chkItemKeep:
           KeyPairsRpt.addLine(*rptCommonLine)
-          termTrack[awsComponent.KeyPairs][currentRegion][KeyPairs['KeyName']] = None
-    except EndpointConnectionError:
-      print('\tComponent "{0}" - cannot connect to region {1}'.format(awsComponent.KeyPairs.compName, currentRegion))
-      if aws_cleanupArg.ignore_conn_err:
-        pass
-      else:
-        exit(100)
+          ign = termTrack.add(awsComponent.KeyPairs, currentRegion, KeyPairs['KeyName'])
+    except awsConnErrors as e:
+      scanConnError(currentRegion, awsComponent.KeyPairs, e)
 
   #################################################################
   #  MetricAlarms - Cloudwatch
   #################################################################
-  if aws_cleanupArg.inv or awsComponent.MetricAlarms.compDelete:
+  if inScan(awsComponent.MetricAlarms, parComponents, currentRegion):
+    scanStart(currentRegion, awsComponent.MetricAlarms)
     try:
       for MetricAlarms in clientCloudwatchRegion.describe_alarms()['MetricAlarms']:
         chkItemKeep = reScanItemsKeep(MetricAlarms['AlarmName'], awsComponent.MetricAlarms)
         rptCommonLine = (True, currentRegion, MetricAlarms['AlarmName'], str(MetricAlarms.get('AlarmDescription') or ''), MetricAlarms.get('StateValue'), MetricAlarms.get('Namespace'), MetricAlarms.get('MetricName'),chkItemKeep)
+        invTrack.add(awsComponent.MetricAlarms, currentRegion, MetricAlarms['AlarmName'], chkItemKeep, rptCommonLine)
         if aws_cleanupArg.inv:
           MetricAlarmsRpt.addLine(*rptCommonLine)
         elif not chkItemKeep:
           MetricAlarmsRpt.addLine(*rptCommonLine)
-          termTrack[awsComponent.MetricAlarms][currentRegion][MetricAlarms['AlarmName']] = {'DISPLAY_ID': MetricAlarms['AlarmName'] + formatDispName(MetricAlarms.get('AlarmDescription'))}
-    except EndpointConnectionError:
-      print('\tComponent "{0}" - cannot connect to region {1}'.format(awsComponent.MetricAlarms.compName, currentRegion))
-      if aws_cleanupArg.ignore_conn_err:
-        pass
-      else:
-        exit(100)
+          ign = termTrack.add(awsComponent.MetricAlarms, currentRegion, MetricAlarms['AlarmName'], display=MetricAlarms['AlarmName'] + formatDispName(MetricAlarms.get('AlarmDescription')))
+    except awsConnErrors as e:
+      scanConnError(currentRegion, awsComponent.MetricAlarms, e)
 
   #################################################################
   #  CloudWatchLogGroups
   #################################################################
-  if aws_cleanupArg.inv or awsComponent.CloudWatchLogGroups.compDelete:
+  if inScan(awsComponent.CloudWatchLogGroups, parComponents, currentRegion):
+    scanStart(currentRegion, awsComponent.CloudWatchLogGroups)
     try:
       for CloudWatchLogGroups in clientCloudWatchLogRegion.describe_log_groups()['logGroups']:
         chkItemKeep = reScanItemsKeep(CloudWatchLogGroups['logGroupName'], awsComponent.CloudWatchLogGroups)
         rptCommonLine = (True, currentRegion, CloudWatchLogGroups['logGroupName'],chkItemKeep)
+        invTrack.add(awsComponent.CloudWatchLogGroups, currentRegion, CloudWatchLogGroups['logGroupName'], chkItemKeep, rptCommonLine)
         if aws_cleanupArg.inv:
           CloudWatchLogGroupsRpt.addLine(*rptCommonLine)
         elif not chkItemKeep:
           CloudWatchLogGroupsRpt.addLine(*rptCommonLine)
-          termTrack[awsComponent.CloudWatchLogGroups][currentRegion][CloudWatchLogGroups['logGroupName']] = None
-    except EndpointConnectionError:
-      print('\tComponent "{0}" - cannot connect to region {1}'.format(awsComponent.CloudWatchLogGroups.compName, currentRegion))
-      if aws_cleanupArg.ignore_conn_err:
-        pass
-      else:
-        exit(100)
+          ign = termTrack.add(awsComponent.CloudWatchLogGroups, currentRegion, CloudWatchLogGroups['logGroupName'])
+    except awsConnErrors as e:
+      scanConnError(currentRegion, awsComponent.CloudWatchLogGroups, e)
 
 
   #################################################################
   #  ConfigRules
   #################################################################
-  if aws_cleanupArg.inv or awsComponent.ConfigRules.compDelete:
+  if inScan(awsComponent.ConfigRules, parComponents, currentRegion):
+    scanStart(currentRegion, awsComponent.ConfigRules)
     try:
       for ConfigRules in clientConfigRegion.describe_config_rules()['ConfigRules']:
         chkItemKeep = reScanItemsKeep(ConfigRules['ConfigRuleName'], awsComponent.ConfigRules)
         rptCommonLine = (True, currentRegion, ConfigRules['ConfigRuleName'], str(ConfigRules.get('Description') or ''), ConfigRules.get('ConfigRuleState'), chkItemKeep)
+        invTrack.add(awsComponent.ConfigRules, currentRegion, ConfigRules['ConfigRuleName'], chkItemKeep, rptCommonLine)
         if aws_cleanupArg.inv:
           ConfigRulesRpt.addLine(*rptCommonLine)
         elif not chkItemKeep and ConfigRules.get('ConfigRuleState') != "DELETING":
           ConfigRulesRpt.addLine(*rptCommonLine)
-          termTrack[awsComponent.ConfigRules][currentRegion][ConfigRules['ConfigRuleName']] = {'DISPLAY_ID': ConfigRules['ConfigRuleName'] + formatDispName(ConfigRules.get('Description'))}
-    except EndpointConnectionError:
-      print('\tComponent "{0}" - cannot connect to region {1}'.format(awsComponent.ConfigRules.compName, currentRegion))
-      if aws_cleanupArg.ignore_conn_err:
-        pass
-      else:
-        exit(100)
+          ign = termTrack.add(awsComponent.ConfigRules, currentRegion, ConfigRules['ConfigRuleName'], display=ConfigRules['ConfigRuleName'] + formatDispName(ConfigRules.get('Description')))
+    except awsConnErrors as e:
+      scanConnError(currentRegion, awsComponent.ConfigRules, e)
 
   #################################################################
   #  ConfigurationRecorders
   #################################################################
-  if aws_cleanupArg.inv or awsComponent.ConfigurationRecorders.compDelete:
+  if inScan(awsComponent.ConfigurationRecorders, parComponents, currentRegion):
+    scanStart(currentRegion, awsComponent.ConfigurationRecorders)
     try:
       for ConfigurationRecorders in clientConfigRegion.describe_configuration_recorder_status()['ConfigurationRecordersStatus']:
         chkItemKeep = reScanItemsKeep(ConfigurationRecorders['name'], awsComponent.ConfigurationRecorders)
         rptCommonLine = (True, currentRegion, ConfigurationRecorders['name'], dispYesNo(ConfigurationRecorders.get('recording')), chkItemKeep)
+        invTrack.add(awsComponent.ConfigurationRecorders, currentRegion, ConfigurationRecorders['name'], chkItemKeep, rptCommonLine)
         if aws_cleanupArg.inv:
           ConfigurationRecordersRpt.addLine(*rptCommonLine)
         elif not chkItemKeep:
           ConfigurationRecordersRpt.addLine(*rptCommonLine)
-          termTrack[awsComponent.ConfigurationRecorders][currentRegion][ConfigurationRecorders['name']] = None
-    except EndpointConnectionError:
-      print('\tComponent "{0}" - cannot connect to region {1}'.format(awsComponent.ConfigurationRecorders.compName, currentRegion))
-      if aws_cleanupArg.ignore_conn_err:
-        pass
-      else:
-        exit(100)
+          ign = termTrack.add(awsComponent.ConfigurationRecorders, currentRegion, ConfigurationRecorders['name'])
+    except awsConnErrors as e:
+      scanConnError(currentRegion, awsComponent.ConfigurationRecorders, e)
 
   #################################################################
   #  CloudFormationStacks
   #################################################################
-  if aws_cleanupArg.inv or awsComponent.CloudFormationStacks.compDelete:
+  if inScan(awsComponent.CloudFormationStacks, parComponents, currentRegion):
+    scanStart(currentRegion, awsComponent.CloudFormationStacks)
     try:
       for CloudFormationStacks in clientCloudFormationRegion.list_stacks()['StackSummaries']:
         chkItemKeep = reScanItemsKeep(CloudFormationStacks['StackName'], awsComponent.CloudFormationStacks)
         rptCommonLine = (True, currentRegion, CloudFormationStacks['StackName'],CloudFormationStacks['StackStatus'], chkItemKeep)
+        invTrack.add(awsComponent.CloudFormationStacks, currentRegion, CloudFormationStacks['StackId'], chkItemKeep, rptCommonLine)
         if aws_cleanupArg.inv:
           CloudFormationStacksRpt.addLine(*rptCommonLine)
         elif not chkItemKeep:
           #  Included the most likely status below...
           if CloudFormationStacks['StackStatus'] not in ('DELETE_IN_PROGRESS', 'DELETE_FAILED', 'DELETE_COMPLETE'):
             CloudFormationStacksRpt.addLine(*rptCommonLine)
-            termTrack[awsComponent.CloudFormationStacks][currentRegion][CloudFormationStacks['StackId']] = {'DISPLAY_ID': CloudFormationStacks['StackName']}
-    except EndpointConnectionError:
-      print('\tComponent "{0}" - cannot connect to region {1}'.format(awsComponent.CloudFormationStacks.compName, currentRegion))
-      if aws_cleanupArg.ignore_conn_err:
-        pass
-      else:
-        exit(100)
+            ign = termTrack.add(awsComponent.CloudFormationStacks, currentRegion, CloudFormationStacks['StackId'], display=CloudFormationStacks['StackName'])
+    except awsConnErrors as e:
+      scanConnError(currentRegion, awsComponent.CloudFormationStacks, e)
 
   #################################################################
   #  CloudTrail
   #################################################################
-  if aws_cleanupArg.inv or awsComponent.CloudTrail.compDelete:
+  if inScan(awsComponent.CloudTrail, parComponents, currentRegion):
+    scanStart(currentRegion, awsComponent.CloudTrail)
     try:
       for CloudTrail in clientCloudTrailRegion.describe_trails()['trailList']:
         if not (CloudTrail['IsMultiRegionTrail'] and CloudTrail['HomeRegion'] != currentRegion):
           chkItemKeep = reScanItemsKeep(CloudTrail['Name'], awsComponent.CloudTrail)
           rptCommonLine = (True, currentRegion, CloudTrail['Name'], 'Yes' if CloudTrail['IsMultiRegionTrail'] else "", CloudTrail['S3BucketName'], chkItemKeep)
+          invTrack.add(awsComponent.CloudTrail, currentRegion, CloudTrail['TrailARN'], chkItemKeep, rptCommonLine)
           if aws_cleanupArg.inv:
             CloudTrailRpt.addLine(*rptCommonLine)
           elif not chkItemKeep:
             CloudTrailRpt.addLine(*rptCommonLine)
-            termTrack[awsComponent.CloudTrail][currentRegion][CloudTrail['TrailARN']] = {'DISPLAY_ID': CloudTrail['Name']}
-    except EndpointConnectionError:
-      print('\tComponent "{0}" - cannot connect to region {1}'.format(awsComponent.CloudTrail.compName, currentRegion))
-      if aws_cleanupArg.ignore_conn_err:
-        pass
-      else:
-        exit(100)
+            ign = termTrack.add(awsComponent.CloudTrail, currentRegion, CloudTrail['TrailARN'], display=CloudTrail['Name'])
+    except awsConnErrors as e:
+      scanConnError(currentRegion, awsComponent.CloudTrail, e)
 
   #################################################################
   #  AssessmentTargets 
   #################################################################
-  if aws_cleanupArg.inv or awsComponent.AssessmentTargets.compDelete:
-    #  If a region desn't have Inspector, list_assessment_targets will raise an EndpointConnectionError.
-    #  The "try:" below will catch that error and keep the script executing. May need this for
-    #  other cases.
+  #  Regions without Inspector are skipped up front by inScan (serviceInRegion checks the
+  #  endpoint data bundled with botocore), instead of waiting for an EndpointConnectionError.
+  if inScan(awsComponent.AssessmentTargets, parComponents, currentRegion):
+    scanStart(currentRegion, awsComponent.AssessmentTargets)
     try:
-      for AssessmentTargetsArn in clientInspectorRegion.list_assessment_targets()['assessmentTargetArns']:
-        for AssessmentTargets in clientInspectorRegion.describe_assessment_targets(assessmentTargetArns = [AssessmentTargetsArn])['assessmentTargets']:
+      AssessmentTargetsArnList = []
+      for AssessmentTargetsPage in clientInspectorRegion.get_paginator('list_assessment_targets').paginate():
+        AssessmentTargetsArnList += AssessmentTargetsPage['assessmentTargetArns']
+      #  describe_assessment_targets accepts up to 10 ARNs per call.
+      for i in range(0, len(AssessmentTargetsArnList), 10):
+        for AssessmentTargets in clientInspectorRegion.describe_assessment_targets(assessmentTargetArns = AssessmentTargetsArnList[i:i + 10])['assessmentTargets']:
           chkItemKeep = reScanItemsKeep(AssessmentTargets['name'], awsComponent.AssessmentTargets)
           rptCommonLine = (True, currentRegion, AssessmentTargets['name'], chkItemKeep)
+          invTrack.add(awsComponent.AssessmentTargets, currentRegion, AssessmentTargets['arn'], chkItemKeep, rptCommonLine)
           if aws_cleanupArg.inv:
             AssessmentTargetsRpt.addLine(*rptCommonLine)
           elif not chkItemKeep:
             AssessmentTargetsRpt.addLine(*rptCommonLine)
-            termTrack[awsComponent.AssessmentTargets][currentRegion][AssessmentTargetsArn] = {'DISPLAY_ID': AssessmentTargets['name']}
-    except EndpointConnectionError: 
-      pass
-   
+            ign = termTrack.add(awsComponent.AssessmentTargets, currentRegion, AssessmentTargets['arn'], display=AssessmentTargets['name'])
+    except awsConnErrors as e:
+      scanConnError(currentRegion, awsComponent.AssessmentTargets, e)
 
   #################################################################
   #  SNSTopics
   #################################################################
-  if aws_cleanupArg.inv or awsComponent.SNSTopics.compDelete:
+  if inScan(awsComponent.SNSTopics, parComponents, currentRegion):
+    scanStart(currentRegion, awsComponent.SNSTopics)
     try:
       for SNSTopics in clientSNSRegion.list_topics()['Topics']:
         chkItemKeep = reScanItemsKeep(SNSTopics['TopicArn'].split(':')[-1], awsComponent.SNSTopics)
         rptCommonLine = (True, currentRegion, SNSTopics['TopicArn'].split(':')[-1], chkItemKeep)
+        invTrack.add(awsComponent.SNSTopics, currentRegion, SNSTopics['TopicArn'], chkItemKeep, rptCommonLine)
         if aws_cleanupArg.inv:
           SNSTopicsRpt.addLine(*rptCommonLine)
         elif not chkItemKeep:
           SNSTopicsRpt.addLine(*rptCommonLine)
-          termTrack[awsComponent.SNSTopics][currentRegion][SNSTopics['TopicArn']] = {'DISPLAY_ID': SNSTopics['TopicArn'].split(':')[-1]}
-    except EndpointConnectionError:
-      print('\tComponent "{0}" - cannot connect to region {1}'.format(awsComponent.SNSTopics.compName, currentRegion))
-      if aws_cleanupArg.ignore_conn_err:
-        pass
-      else:
-        exit(100)
+          ign = termTrack.add(awsComponent.SNSTopics, currentRegion, SNSTopics['TopicArn'], display=SNSTopics['TopicArn'].split(':')[-1])
+    except awsConnErrors as e:
+      scanConnError(currentRegion, awsComponent.SNSTopics, e)
           
 
   #################################################################
   #  VPC
   #################################################################
-  if aws_cleanupArg.inv or awsComponent.VPC.compDelete:
+  if inScan(awsComponent.VPC, parComponents, currentRegion):
+    scanStart(currentRegion, awsComponent.VPC)
     try:
       VPCThereIsDefault = False
       for VPC in clientEC2Region.describe_vpcs()['Vpcs']:
@@ -685,26 +2847,27 @@ for currentRegion in sorted(regions):
         if aws_cleanupArg.vpc_rebuild or (not aws_cleanupArg.vpc_rebuild and not VPC['IsDefault']):
           tagData = tagScan(VPC.get('Tags'), aws_cleanupArg)
           rptCommonLine = (True, currentRegion, VPC['CidrBlock'], VPC['VpcId'], dispYesNo(VPC['IsDefault']), tagData.nameTag,tagData.keepTagFound,VPC['State'])
+          invTrack.add(awsComponent.VPC, currentRegion, VPC['VpcId'], tagData.keepTagFound, rptCommonLine)
           if aws_cleanupArg.inv:
             VPCRpt.addLine(*rptCommonLine)
           elif tagData.delThisItem:
             VPCRpt.addLine(*rptCommonLine)
-            termTrack[awsComponent.VPC][currentRegion][VPC['VpcId']] = {'DISPLAY_ID': VPC['VpcId'] + formatDispName(tagData.nameTag, VPC['CidrBlock'])}
+            ign = termTrack.add(awsComponent.VPC, currentRegion, VPC['VpcId'], display=VPC['VpcId'] + formatDispName(tagData.nameTag, VPC['CidrBlock']), isDefault=VPC['IsDefault'])
+      for regionList in (VPCDefaultByRegion, VPCNoDefaultByRegion):
+        if currentRegion in regionList:
+          regionList.remove(currentRegion)
       if VPCThereIsDefault:
         VPCDefaultByRegion.append(currentRegion)
       else:
         VPCNoDefaultByRegion.append(currentRegion)
-    except EndpointConnectionError:
-      print('\tComponent "{0}" - cannot connect to region {1}'.format(awsComponent.VPC.compName, currentRegion))
-      if aws_cleanupArg.ignore_conn_err:
-        pass
-      else:
-        exit(100)
+    except awsConnErrors as e:
+      scanConnError(currentRegion, awsComponent.VPC, e)
 
   #################################################################
   #  RouteTables
   #################################################################
-  if aws_cleanupArg.inv or awsComponent.RouteTables.compDelete:
+  if inScan(awsComponent.RouteTables, parComponents, currentRegion):
+    scanStart(currentRegion, awsComponent.RouteTables)
     try:
       for RouteTables in clientEC2Region.describe_route_tables()['RouteTables']:
         tagData = tagScan(RouteTables.get('Tags'), aws_cleanupArg)
@@ -718,22 +2881,20 @@ for currentRegion in sorted(regions):
           isVPCDefault = True
         if aws_cleanupArg.vpc_rebuild or not isVPCDefault:
           rptCommonLine = (True, currentRegion, RouteTables['RouteTableId'], RouteTables['VpcId'] + (" (default)" if isVPCDefault else ""), RouteTablesDispMain, tagData.nameTag,tagData.keepTagFound)
+          invTrack.add(awsComponent.RouteTables, currentRegion, RouteTables['RouteTableId'], tagData.keepTagFound, rptCommonLine)
           if aws_cleanupArg.inv:
             RouteTablesRpt.addLine(*rptCommonLine)
           elif tagData.delThisItem:
             RouteTablesRpt.addLine(*rptCommonLine)
-            termTrack[awsComponent.RouteTables][currentRegion][RouteTables['RouteTableId']] = {'DISPLAY_ID': RouteTables['RouteTableId'] + formatDispName(tagData.nameTag),'VpcId':RouteTables['VpcId']}
-    except EndpointConnectionError:
-      print('\tComponent "{0}" - cannot connect to region {1}'.format(awsComponent.RouteTables.compName, currentRegion))
-      if aws_cleanupArg.ignore_conn_err:
-        pass
-      else:
-        exit(100)
+            ign = termTrack.add(awsComponent.RouteTables, currentRegion, RouteTables['RouteTableId'], display=RouteTables['RouteTableId'] + formatDispName(tagData.nameTag), vpcId=RouteTables['VpcId'])
+    except awsConnErrors as e:
+      scanConnError(currentRegion, awsComponent.RouteTables, e)
 
   #################################################################
   #  Subnets
   #################################################################
-  if aws_cleanupArg.inv or awsComponent.Subnets.compDelete:
+  if inScan(awsComponent.Subnets, parComponents, currentRegion):
+    scanStart(currentRegion, awsComponent.Subnets)
     try:
       for Subnets in clientEC2Region.describe_subnets()['Subnets']:
         isVPCDefault = False
@@ -742,22 +2903,20 @@ for currentRegion in sorted(regions):
         if aws_cleanupArg.vpc_rebuild or not isVPCDefault:
           tagData = tagScan(Subnets.get('Tags'), aws_cleanupArg)
           rptCommonLine = (True, currentRegion, Subnets['CidrBlock'], Subnets['SubnetId'], Subnets['VpcId']  + (" (default)" if isVPCDefault else ""), tagData.nameTag,tagData.keepTagFound,Subnets['State'])
+          invTrack.add(awsComponent.Subnets, currentRegion, Subnets['SubnetId'], tagData.keepTagFound, rptCommonLine)
           if aws_cleanupArg.inv:
             SubnetsRpt.addLine(*rptCommonLine)
           elif tagData.delThisItem:
             SubnetsRpt.addLine(*rptCommonLine)
-            termTrack[awsComponent.Subnets][currentRegion][Subnets['SubnetId']] = {'DISPLAY_ID': Subnets['SubnetId'] + formatDispName(tagData.nameTag, Subnets['CidrBlock']), 'VpcId': Subnets['VpcId']}
-    except EndpointConnectionError:
-      print('\tComponent "{0}" - cannot connect to region {1}'.format(awsComponent.Subnets.compName, currentRegion))
-      if aws_cleanupArg.ignore_conn_err:
-        pass
-      else:
-        exit(100)
+            ign = termTrack.add(awsComponent.Subnets, currentRegion, Subnets['SubnetId'], display=Subnets['SubnetId'] + formatDispName(tagData.nameTag, Subnets['CidrBlock']), vpcId=Subnets['VpcId'])
+    except awsConnErrors as e:
+      scanConnError(currentRegion, awsComponent.Subnets, e)
 
   #################################################################
   #  InternetGateways
   #################################################################
-  if aws_cleanupArg.inv or awsComponent.InternetGateways.compDelete:
+  if inScan(awsComponent.InternetGateways, parComponents, currentRegion):
+    scanStart(currentRegion, awsComponent.InternetGateways)
     try:
       for InternetGateways  in clientEC2Region.describe_internet_gateways()['InternetGateways']:
         if InternetGateways['Attachments']:
@@ -772,22 +2931,20 @@ for currentRegion in sorted(regions):
         if aws_cleanupArg.vpc_rebuild or not isVPCDefault:
           tagData = tagScan(InternetGateways.get('Tags'), aws_cleanupArg)
           rptCommonLine = (True, currentRegion, InternetGateways['InternetGatewayId'], InternetGatewaysDispVpcId + (" (default)" if isVPCDefault else ""), InternetGatewaysDispState, tagData.nameTag,tagData.keepTagFound)
+          invTrack.add(awsComponent.InternetGateways, currentRegion, InternetGateways['InternetGatewayId'], tagData.keepTagFound, rptCommonLine)
           if aws_cleanupArg.inv:
             InternetGatewaysRpt.addLine(*rptCommonLine)
           elif tagData.delThisItem:
             InternetGatewaysRpt.addLine(*rptCommonLine)
-            termTrack[awsComponent.InternetGateways][currentRegion][InternetGateways['InternetGatewayId']] = {'DISPLAY_ID': InternetGateways['InternetGatewayId'] + formatDispName(tagData.nameTag),'VpcID':InternetGatewaysDispVpcId}
-    except EndpointConnectionError:
-      print('\tComponent "{0}" - cannot connect to region {1}'.format(awsComponent.InternetGateways.compName, currentRegion))
-      if aws_cleanupArg.ignore_conn_err:
-        pass
-      else:
-        exit(100)
+            ign = termTrack.add(awsComponent.InternetGateways, currentRegion, InternetGateways['InternetGatewayId'], display=InternetGateways['InternetGatewayId'] + formatDispName(tagData.nameTag), vpcId=InternetGatewaysDispVpcId)
+    except awsConnErrors as e:
+      scanConnError(currentRegion, awsComponent.InternetGateways, e)
 
   #################################################################
   #  VPCEndpoints
   #################################################################
-  if aws_cleanupArg.inv or awsComponent.VPCEndpoints.compDelete:
+  if inScan(awsComponent.VPCEndpoints, parComponents, currentRegion):
+    scanStart(currentRegion, awsComponent.VPCEndpoints)
     try:
       for VPCEndpoints in clientEC2Region.describe_vpc_endpoints()['VpcEndpoints']:
         isVPCDefault = False
@@ -795,150 +2952,429 @@ for currentRegion in sorted(regions):
           isVPCDefault = True
         chkItemKeep = reScanItemsKeep(VPCEndpoints['VpcEndpointId'], awsComponent.VPCEndpoints)
         rptCommonLine = (True, currentRegion, VPCEndpoints['VpcEndpointId'], VPCEndpoints['VpcEndpointType'], VPCEndpoints['VpcId']  + (" (default)" if isVPCDefault else ""),VPCEndpoints['ServiceName'], chkItemKeep)
+        invTrack.add(awsComponent.VPCEndpoints, currentRegion, VPCEndpoints['VpcEndpointId'], chkItemKeep, rptCommonLine)
 
         if aws_cleanupArg.inv:
           VPCEndpointsRpt.addLine(*rptCommonLine)
         elif not chkItemKeep: 
           VPCEndpointsRpt.addLine(*rptCommonLine)
-          termTrack[awsComponent.VPCEndpoints][currentRegion][VPCEndpoints['VpcEndpointId']] = {'DISPLAY_ID': VPCEndpoints['VpcEndpointId'] + formatDispName(VPCEndpoints['VpcEndpointType'],VPCEndpoints['ServiceName'])}
-    except EndpointConnectionError:
-      print('\tComponent "{0}" - cannot connect to region {1}'.format(awsComponent.VPCEndpoints.compName, currentRegion))
-      if aws_cleanupArg.ignore_conn_err:
-        pass
-      else:
-        exit(100)
-
-output += EC2Rpt.resultf()
-output += SecurityGroupsRpt.resultf()
-output += VolumesRpt.resultf()
-output += KeyPairsRpt.resultf() 
-output += VPCRpt.resultf()
-if VPCNoDefaultByRegion:
-  output += '\nThe following regions do not have default VPCs: {0}'.format(', '.join(VPCNoDefaultByRegion)) + ("\n" * 2)
-output += RouteTablesRpt.resultf()
-output += SubnetsRpt.resultf()
-output += InternetGatewaysRpt.resultf()
-output += VPCEndpointsRpt.resultf() 
-output += MetricAlarmsRpt.resultf() 
-output += CloudWatchLogGroupsRpt.resultf()
-output += ConfigRulesRpt.resultf()
-output += ConfigurationRecordersRpt.resultf()
-output += CloudFormationStacksRpt.resultf()
-output += CloudTrailRpt.resultf()
-output += AssessmentTargetsRpt.resultf()
-output += SNSTopicsRpt.resultf()
-
-#################################################################
-#  S3
-#################################################################
-S3Rpt = awsRpt("{0}:".format(awsComponent.S3.compName), *[["Bucket Name", 40],keepTagHeader])
-if aws_cleanupArg.inv or awsComponent.S3.compDelete:
-  for buckets in clientS3.list_buckets()['Buckets']:
+          ign = termTrack.add(awsComponent.VPCEndpoints, currentRegion, VPCEndpoints['VpcEndpointId'], display=VPCEndpoints['VpcEndpointId'] + formatDispName(VPCEndpoints['VpcEndpointType'],VPCEndpoints['ServiceName']))
+    except awsConnErrors as e:
+      scanConnError(currentRegion, awsComponent.VPCEndpoints, e)
+
+  #################################################################
+  #  NATGateways
+  #################################################################
+  if inScan(awsComponent.NATGateways, parComponents, currentRegion):
+    scanStart(currentRegion, awsComponent.NATGateways)
     try:
-      bucketTag = clientS3.get_bucket_tagging(Bucket=buckets['Name'])['TagSet']
-    except ClientError as e:
-      bucketTag=[]
-    tagData = tagScan(bucketTag, aws_cleanupArg)
-    rptCommonLine = (False, buckets['Name'], tagData.keepTagFound)
-    if aws_cleanupArg.inv:
-      S3Rpt.addLine(*rptCommonLine)
-    elif tagData.delThisItem:
-      S3Rpt.addLine(*rptCommonLine)
-      termTrack[awsComponent.S3][buckets['Name']] = None
-output += S3Rpt.resultf()
-
-#################################################################
-#  Users 
-#################################################################
-currentUserArnDel = False
-UsersRpt = awsRpt("{0}:".format(awsComponent.Users.compName),*[["User Name", 20], ["ARN", 50], ["Keep"]])
-if aws_cleanupArg.inv or awsComponent.Users.compDelete:
-  for Users in clientIAM.list_users()['Users']:
-    chkItemKeep = reScanItemsKeep(Users['UserName'], awsComponent.Users)
-    rptCommonLine = (False, Users['UserName'], Users['Arn'],chkItemKeep)
-    if aws_cleanupArg.inv:
-      UsersRpt.addLine(*rptCommonLine)
-    elif not chkItemKeep:
-      UsersRpt.addLine(*rptCommonLine)
-      # Safety feature - don't let the current connected user be deleted.
-      if currentUserArn == Users['Arn']:
-        currentUserArnDel  = True
+      for NATGatewaysPage in clientEC2Region.get_paginator('describe_nat_gateways').paginate():
+        for NATGateways in NATGatewaysPage['NatGateways']:
+          if NATGateways['State'] in ('deleting', 'deleted'):
+            continue
+          tagData = tagScan(NATGateways.get('Tags'), aws_cleanupArg)
+          rptCommonLine = (True, currentRegion, NATGateways['NatGatewayId'],tagData.nameTag,tagData.keepTagFound,NATGateways.get('VpcId', ''),NATGateways['State'])
+          invTrack.add(awsComponent.NATGateways, currentRegion, NATGateways['NatGatewayId'], tagData.keepTagFound, rptCommonLine)
+          if aws_cleanupArg.inv:
+            NATGatewaysRpt.addLine(*rptCommonLine)
+          elif tagData.delThisItem:
+            NATGatewaysRpt.addLine(*rptCommonLine)
+            ign = termTrack.add(awsComponent.NATGateways, currentRegion, NATGateways['NatGatewayId'], display=NATGateways['NatGatewayId'] + formatDispName(tagData.nameTag), vpcId=NATGateways.get('VpcId'))
+    except awsConnErrors as e:
+      scanConnError(currentRegion, awsComponent.NATGateways, e)
+
+  #################################################################
+  #  ElasticIPs
+  #################################################################
+  if inScan(awsComponent.ElasticIPs, parComponents, currentRegion):
+    scanStart(currentRegion, awsComponent.ElasticIPs)
+    try:
+      for ElasticIPs in clientEC2Region.describe_addresses()['Addresses']:
+        if not ElasticIPs.get('AllocationId'):
+          continue
+        tagData = tagScan(ElasticIPs.get('Tags'), aws_cleanupArg)
+        rptCommonLine = (True, currentRegion, ElasticIPs['AllocationId'],tagData.nameTag,tagData.keepTagFound,ElasticIPs.get('PublicIp', ''),ElasticIPs.get('InstanceId') or ElasticIPs.get('NetworkInterfaceId') or '')
+        invTrack.add(awsComponent.ElasticIPs, currentRegion, ElasticIPs['AllocationId'], tagData.keepTagFound, rptCommonLine)
+        if aws_cleanupArg.inv:
+          ElasticIPsRpt.addLine(*rptCommonLine)
+        elif tagData.delThisItem:
+          ElasticIPsRpt.addLine(*rptCommonLine)
+          ign = termTrack.add(awsComponent.ElasticIPs, currentRegion, ElasticIPs['AllocationId'], display=ElasticIPs.get('PublicIp', ElasticIPs['AllocationId']) + formatDispName(tagData.nameTag))
+    except awsConnErrors as e:
+      scanConnError(currentRegion, awsComponent.ElasticIPs, e)
+
+  #################################################################
+  #  NetworkInterfaces
+  #################################################################
+  #  Interfaces attached to an EC2 instance go with the instance. Interfaces of NAT gateways and
+  #  VPC endpoints are listed, but are removed by AWS with their owner.
+  if inScan(awsComponent.NetworkInterfaces, parComponents, currentRegion):
+    scanStart(currentRegion, awsComponent.NetworkInterfaces)
+    try:
+      for NetworkInterfacesPage in clientEC2Region.get_paginator('describe_network_interfaces').paginate():
+        for NetworkInterfaces in NetworkInterfacesPage['NetworkInterfaces']:
+          if NetworkInterfaces.get('Attachment', {}).get('InstanceId'):
+            continue
+          tagData = tagScan(NetworkInterfaces.get('TagSet'), aws_cleanupArg)
+          interfaceType = NetworkInterfaces.get('InterfaceType', 'interface')
+          rptCommonLine = (True, currentRegion, NetworkInterfaces['NetworkInterfaceId'],tagData.keepTagFound,interfaceType,NetworkInterfaces['Status'],NetworkInterfaces.get('Description', ''))
+          invTrack.add(awsComponent.NetworkInterfaces, currentRegion, NetworkInterfaces['NetworkInterfaceId'], tagData.keepTagFound, rptCommonLine)
+          if aws_cleanupArg.inv:
+            NetworkInterfacesRpt.addLine(*rptCommonLine)
+          elif tagData.delThisItem and interfaceType not in ('nat_gateway', 'vpc_endpoint', 'gateway_load_balancer_endpoint'):
+            NetworkInterfacesRpt.addLine(*rptCommonLine)
+            ign = termTrack.add(awsComponent.NetworkInterfaces, currentRegion, NetworkInterfaces['NetworkInterfaceId'], display=NetworkInterfaces['NetworkInterfaceId'] + formatDispName(interfaceType if interfaceType != 'interface' else '', NetworkInterfaces.get('Description')), vpcId=NetworkInterfaces.get('VpcId'))
+    except awsConnErrors as e:
+      scanConnError(currentRegion, awsComponent.NetworkInterfaces, e)
+
+def inventoryGlobal(parComponents=None):
+  global currentUserArnDel
+  #################################################################
+  #  S3
+  #################################################################
+  if inScan(awsComponent.S3, parComponents, None):
+    scanStart(None, awsComponent.S3)
+    #  Bucket region and tags per bucket (concurrently; the tags through a client for the
+    #  bucket's region, not redirected), then one metrics query per region. A bucket whose
+    #  location can't be read is listed with an unknown region (None) and without a size.
+    def bucketDetail(parBucket):
+      try:
+        bucketRegion, regionError = s3BucketRegion(parBucket), None
+      except (ClientError,) + awsConnErrors as e:
+        bucketRegion, regionError = None, e
+      try:
+        bucketTag = (awsClient('s3', bucketRegion) if bucketRegion else clientS3).get_bucket_tagging(Bucket=parBucket)['TagSet']
+      except (ClientError,) + awsConnErrors as e:
+        bucketTag=[]
+      return parBucket, bucketRegion, bucketTag, regionError
+    try:
+      bucketList = [buckets['Name'] for buckets in clientS3.list_buckets()['Buckets']]
+    except awsConnErrors as e:
+      scanConnError(None, awsComponent.S3, e)
+      bucketList = []
+    with ThreadPoolExecutor(max_workers=deleteMaxWorkers) as executor:
+      bucketDetailList = list(executor.map(bucketDetail, bucketList))
+    bucketsByRegion = defaultdict(list)
+    for bucket, bucketRegion, bucketTag, regionError in bucketDetailList:
+      if bucketRegion:
+        bucketsByRegion[bucketRegion].append(bucket)
       else:
-        termTrack[awsComponent.Users][Users['UserName']] = {'DISPLAY_ID': Users['Arn']}
-output += UsersRpt.resultf()
+        print('\tComponent "{0}" - unknown region for bucket {1}:'.format(awsComponent.S3.compName, bucket), regionError)
+    bucketSizes = {}
+    for bucketRegion, regionBuckets in bucketsByRegion.items():
+      try:
+        bucketSizes.update(s3BucketSizes(bucketRegion, regionBuckets))
+      except (ClientError,) + awsConnErrors as e:
+        print('\tComponent "{0}" - no bucket sizes for region {1}:'.format(awsComponent.S3.compName, bucketRegion), e)
+    for bucket, bucketRegion, bucketTag, regionError in bucketDetailList:
+      tagData = tagScan(bucketTag, aws_cleanupArg)
+      objectCount, byteCount = bucketSizes.get(bucket, (None, None))
+      s3BucketMeta[bucket] = {'region': bucketRegion, 'objects': objectCount, 'bytes': byteCount}
+      rptCommonLine = (False, bucket, bucketRegion or 'unknown', '' if objectCount is None else str(objectCount), '' if byteCount is None else fmtBytes(byteCount), tagData.keepTagFound)
+      invTrack.add(awsComponent.S3, None, bucket, tagData.keepTagFound, rptCommonLine)
+      if aws_cleanupArg.inv:
+        S3Rpt.addLine(*rptCommonLine)
+      elif tagData.delThisItem:
+        S3Rpt.addLine(*rptCommonLine)
+        ign = termTrack.add(awsComponent.S3, None, bucket)
+
+  #################################################################
+  #  Users 
+  #################################################################
+  if inScan(awsComponent.Users, parComponents, None):
+    scanStart(None, awsComponent.Users)
+    try:
+      for Users in clientIAM.list_users()['Users']:
+        chkItemKeep = reScanItemsKeep(Users['UserName'], awsComponent.Users)
+        rptCommonLine = (False, Users['UserName'], Users['Arn'],chkItemKeep)
+        invTrack.add(awsComponent.Users, None, Users['UserName'], chkItemKeep, rptCommonLine)
+        if aws_cleanupArg.inv:
+          UsersRpt.addLine(*rptCommonLine)
+        elif not chkItemKeep:
+          UsersRpt.addLine(*rptCommonLine)
+          # Safety feature - don't let the current connected user be deleted.
+          if currentUserArn == Users['Arn']:
+            currentUserArnDel  = True
+          else:
+            ign = termTrack.add(awsComponent.Users, None, Users['UserName'], display=Users['Arn'])
+    except awsConnErrors as e:
+      scanConnError(None, awsComponent.Users, e)
     
-#################################################################
-#  Groups 
-#################################################################
-GroupsRpt = awsRpt("{0}:".format(awsComponent.Groups.compName),*[["Group Name", 60], ["Keep"]])
-if aws_cleanupArg.inv or awsComponent.Groups.compDelete:
-  for Groups in clientIAM.list_groups()['Groups']:
-    chkItemKeep = reScanItemsKeep(Groups['GroupName'], awsComponent.Groups)
-    rptCommonLine=(False, Groups['GroupName'],chkItemKeep)
-    if aws_cleanupArg.inv:
-      GroupsRpt.addLine(*rptCommonLine)
-    elif not chkItemKeep:
-      GroupsRpt.addLine(*rptCommonLine)
-      termTrack[awsComponent.Groups][Groups['GroupName']] = None
-output += GroupsRpt.resultf()
-
-#################################################################
-#  Policies 
-#################################################################
-PoliciesRpt = awsRpt("{0}:".format(awsComponent.Policies.compName),*[["Policy Name", 70], ["Description", 40], ["Keep"]])
-if aws_cleanupArg.inv or awsComponent.Policies.compDelete:
-  for Policies in clientIAM.list_policies(Scope='Local')['Policies']:
-    chkItemKeep = reScanItemsKeep(Policies['PolicyName'], awsComponent.Policies)
-    rptCommonLine=(False, Policies['PolicyName'], str(Policies.get('Description') or ''), chkItemKeep)
-    if aws_cleanupArg.inv:
-      PoliciesRpt.addLine(*rptCommonLine)
-    elif not chkItemKeep:
-      PoliciesRpt.addLine(*rptCommonLine)
-      termTrack[awsComponent.Policies][Policies['Arn']] = {'DISPLAY_ID': Policies['PolicyName']}
-output += PoliciesRpt.resultf()
-
-#################################################################
-#  Roles
-#################################################################
-RolesRpt = awsRpt("{0}:".format(awsComponent.Roles.compName),*[["Role Name", 75], ["AWS Service"], ["Keep"]])
-if aws_cleanupArg.inv or awsComponent.Roles.compDelete:
-  for Roles in clientIAM.list_roles()['Roles']:
-    chkItemKeep = reScanItemsKeep(Roles['RoleName'], awsComponent.Roles)
-    if re.search('^/aws-service-role/',Roles['Path']):
-      Roles_IsAwsService = True
+  #################################################################
+  #  Groups 
+  #################################################################
+  if inScan(awsComponent.Groups, parComponents, None):
+    scanStart(None, awsComponent.Groups)
+    try:
+      for Groups in clientIAM.list_groups()['Groups']:
+        chkItemKeep = reScanItemsKeep(Groups['GroupName'], awsComponent.Groups)
+        rptCommonLine=(False, Groups['GroupName'],chkItemKeep)
+        invTrack.add(awsComponent.Groups, None, Groups['GroupName'], chkItemKeep, rptCommonLine)
+        if aws_cleanupArg.inv:
+          GroupsRpt.addLine(*rptCommonLine)
+        elif not chkItemKeep:
+          GroupsRpt.addLine(*rptCommonLine)
+          ign = termTrack.add(awsComponent.Groups, None, Groups['GroupName'])
+    except awsConnErrors as e:
+      scanConnError(None, awsComponent.Groups, e)
+
+  #################################################################
+  #  Policies 
+  #################################################################
+  if inScan(awsComponent.Policies, parComponents, None):
+    scanStart(None, awsComponent.Policies)
+    try:
+      for Policies in clientIAM.list_policies(Scope='Local')['Policies']:
+        chkItemKeep = reScanItemsKeep(Policies['PolicyName'], awsComponent.Policies)
+        rptCommonLine=(False, Policies['PolicyName'], str(Policies.get('Description') or ''), chkItemKeep)
+        invTrack.add(awsComponent.Policies, None, Policies['Arn'], chkItemKeep, rptCommonLine)
+        if aws_cleanupArg.inv:
+          PoliciesRpt.addLine(*rptCommonLine)
+        elif not chkItemKeep:
+          PoliciesRpt.addLine(*rptCommonLine)
+          ign = termTrack.add(awsComponent.Policies, None, Policies['Arn'], display=Policies['PolicyName'])
+    except awsConnErrors as e:
+      scanConnError(None, awsComponent.Policies, e)
+
+  #################################################################
+  #  Roles
+  #################################################################
+  if inScan(awsComponent.Roles, parComponents, None):
+    scanStart(None, awsComponent.Roles)
+    try:
+      for Roles in clientIAM.list_roles()['Roles']:
+        chkItemKeep = reScanItemsKeep(Roles['RoleName'], awsComponent.Roles)
+        if re.search('^/aws-service-role/',Roles['Path']):
+          Roles_IsAwsService = True
+        else:
+          Roles_IsAwsService = False
+        invTrack.add(awsComponent.Roles, None, Roles['RoleName'], chkItemKeep, (False, Roles['RoleName'], dispYesNo(Roles_IsAwsService), chkItemKeep))
+        if aws_cleanupArg.inv:
+          RolesRpt.addLine(False, Roles['RoleName'],dispYesNo(Roles_IsAwsService), chkItemKeep)
+        elif not chkItemKeep:
+          if Roles['RoleName'] == 'AWSServiceRoleForSupport':
+            #  Special handing for role AWSServiceRoleForSupport - this cannot be deleted.
+            RolesRpt.addLine(False, '{0} - this service-linked role cannot be deleted. Review AWS support docs for details'.format(Roles['RoleName']),dispYesNo(Roles_IsAwsService), "Yes")
+          elif Roles['RoleName'] == 'AWSServiceRoleForTrustedAdvisor':
+            #  Special handling for role AWSServiceRoleForTrustedAdvisor 
+            RolesRpt.addLine(False, '{0} - service-linked role isn\'t removed by this script. To manually remove, seach AWS documentation for "Deleting a Service-Linked Role for Trusted Advisor"'.format(Roles['RoleName']),dispYesNo(Roles_IsAwsService), "Yes")
+          else:
+            RolesRpt.addLine(False, Roles['RoleName'],dispYesNo(Roles_IsAwsService), chkItemKeep)
+            ign = termTrack.add(awsComponent.Roles, None, Roles['RoleName'], isAwsService=Roles_IsAwsService)
+    except awsConnErrors as e:
+      scanConnError(None, awsComponent.Roles, e)
+
+  #################################################################
+  #  InstanceProfiles
+  #################################################################
+  if inScan(awsComponent.InstanceProfiles, parComponents, None):
+    scanStart(None, awsComponent.InstanceProfiles)
+    try:
+      for InstanceProfiles in clientIAM.list_instance_profiles()['InstanceProfiles']:
+        chkItemKeep = reScanItemsKeep(InstanceProfiles['InstanceProfileName'], awsComponent.InstanceProfiles)
+        rptCommonLine = (False, InstanceProfiles['InstanceProfileName'],chkItemKeep)
+        invTrack.add(awsComponent.InstanceProfiles, None, InstanceProfiles['InstanceProfileName'], chkItemKeep, rptCommonLine)
+        if aws_cleanupArg.inv:
+          InstanceProfilesRpt.addLine(*rptCommonLine)
+        elif not chkItemKeep:
+          InstanceProfilesRpt.addLine(*rptCommonLine)
+          ign = termTrack.add(awsComponent.InstanceProfiles, None, InstanceProfiles['InstanceProfileName'])
+    except awsConnErrors as e:
+      scanConnError(None, awsComponent.InstanceProfiles, e)
+
+#  rescanLock - watch rescans and server cache refreshes run one at a time (invTrack.commit()
+#  takes everything scanned since the previous commit).
+rescanLock = threading.Lock()
+def rescan(parComponents, parProgress=True):
+  #  rescan - re-inventories parComponents in all regions; returns invTrack change events.
+  with rescanLock:
+    connBreaker.reset(parComponents)
+    if parProgress:
+      progress.startInventory(len(regions) + 1)
+    for currentRegion in sorted(regions):
+      inventoryRegion(currentRegion, parComponents)
+      regionScanned(currentRegion)
+    inventoryGlobal(parComponents)
+    regionScanned(None)
+    if parProgress:
+      progress.stop()
+    for compDef in parComponents:
+      componentRpt[compDef].reset()
+    retEvents = invTrack.commit()
+    writeMetrics()
+    writeHistory(parComponents)
+    return retEvents
+
+def watchInventory(parInterval):
+  #  watchInventory - "--watch INTERVAL": rescans until ctrl-c, reusing the clients, regions and
+  #    account details from the first inventory. Every INTERVAL seconds the components due (each
+  #    component is rescanned every watchSchedule[name] intervals) are rescanned in all regions,
+  #    and added/removed/changed items are printed as change events.
+  watchTick = 0
+  while not shutdownEvent.wait(parInterval):
+    watchTick += 1
+    dueList = [compDef for compDef in componentKey if watchTick % watchSchedule.get(componentKey[compDef], 1) == 0]
+    if not dueList:
+      continue
+    apiCallsStart = progress.apiCalls
+    eventList = rescan(dueList)
+    watchTime = time.strftime('%Y-%m-%d %H:%M:%S')
+    for watchEvent, compDef, currentRegion, id in eventList:
+      print('[watch] {0} {1:<7} {2} {3} {4}'.format(watchTime, watchEvent, compDef.compName, currentRegion or 'global', id))
+    print('[watch] {0} rescanned: {1} - {2} change(s), {3} API calls'.format(watchTime, ', '.join(compDef.compName for compDef in dueList), len(eventList), progress.apiCalls - apiCallsStart))
+
+class invCacheClass:
+  #  invCacheClass - keeps the inventory served by "--serve" no older than parTTL seconds. A
+  #    request for stale data gets the cached data right away (flagged "stale") and starts a
+  #    background rescan - unless one is already running, so any number of concurrent
+  #    requests cause at most one rescan.
+  def __init__(self, parTTL):
+    self.ttl = parTTL
+    self.lock = threading.Lock()
+    self.refreshing = False
+
+  def check(self):
+    #  Returns True when the cached data is older than the TTL.
+    with self.lock:
+      stale = time.time() - invTrack.oldestScan() > self.ttl
+      if stale and not self.refreshing:
+        self.refreshing = True
+        threading.Thread(target=self.refresh, daemon=True).start()
+    return stale
+
+  def refresh(self):
+    try:
+      ign = rescan(list(componentKey), parProgress=False)
+    finally:
+      with self.lock:
+        self.refreshing = False
+
+class invHTTPHandler(http.server.BaseHTTPRequestHandler):
+  #  GET /inventory[?component=EC2&region=us-east-1&keep=yes|no] - items from the latest scans
+  #  GET /components - component names accepted by the component filter
+  #  GET /metrics - Prometheus metrics (see metricsClass)
+  def do_GET(self):
+    url = urlparse(self.path)
+    query = dict((k, v[-1]) for k, v in parse_qs(url.query).items())
+    if url.path == '/metrics':
+      ign = invCache.check()
+      self.sendBody(200, 'text/plain; version=0.0.4', metrics.text().encode('utf-8'))
+    elif url.path == '/components':
+      self.sendJson(200, {'components': sorted(componentKey.values())})
+    elif url.path == '/inventory':
+      compDef = None
+      if query.get('component'):
+        compDef = dict((v.lower(), k) for k, v in componentKey.items()).get(query['component'].lower())
+        if compDef is None:
+          self.sendJson(400, {'error': 'unknown component "{0}" (see /components)'.format(query['component'])})
+          return
+      keep = {'yes': True, 'no': False}.get(query.get('keep', '').lower())
+      stale = invCache.check()
+      self.sendJson(200, {'account': currentAccountId, 'scanned': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(invTrack.oldestScan())),
+                          'stale': stale, 'failed': invTrack.failedScans(), 'items': invTrack.query(compDef, query.get('region'), keep)})
     else:
-      Roles_IsAwsService = False
-    if aws_cleanupArg.inv:
-      RolesRpt.addLine(False, Roles['RoleName'],dispYesNo(Roles_IsAwsService), chkItemKeep)
-    elif not chkItemKeep:
-      if Roles['RoleName'] == 'AWSServiceRoleForSupport':
-        #  Special handing for role AWSServiceRoleForSupport - this cannot be deleted.
-        RolesRpt.addLine(False, '{0} - this service-linked role cannot be deleted. Review AWS support docs for details'.format(Roles['RoleName']),dispYesNo(Roles_IsAwsService), "Yes")
-      elif Roles['RoleName'] == 'AWSServiceRoleForTrustedAdvisor':
-        #  Special handling for role AWSServiceRoleForTrustedAdvisor 
-        RolesRpt.addLine(False, '{0} - service-linked role isn\'t removed by this script. To manually remove, seach AWS documentation for "Deleting a Service-Linked Role for Trusted Advisor"'.format(Roles['RoleName']),dispYesNo(Roles_IsAwsService), "Yes")
-      else:
-        RolesRpt.addLine(False, Roles['RoleName'],dispYesNo(Roles_IsAwsService), chkItemKeep)
-        termTrack[awsComponent.Roles][Roles['RoleName']] = {'IsAwsService': Roles_IsAwsService}
-output += RolesRpt.resultf()
+      self.sendJson(404, {'error': 'not found; use /inventory, /components or /metrics'})
 
-#################################################################
-#  InstanceProfiles
-#################################################################
-InstanceProfilesRpt = awsRpt("{0}:".format(awsComponent.InstanceProfiles.compName), *[["Instance Profile Name", 75], ["Keep"]])
-if aws_cleanupArg.inv or awsComponent.InstanceProfiles.compDelete:
-  for InstanceProfiles in clientIAM.list_instance_profiles()['InstanceProfiles']:
-    chkItemKeep = reScanItemsKeep(InstanceProfiles['InstanceProfileName'], awsComponent.InstanceProfiles)
-    rptCommonLine = (False, InstanceProfiles['InstanceProfileName'],chkItemKeep)
-    if aws_cleanupArg.inv:
-      InstanceProfilesRpt.addLine(*rptCommonLine)
-    elif not chkItemKeep:
-      InstanceProfilesRpt.addLine(*rptCommonLine)
-      termTrack[awsComponent.InstanceProfiles] = [InstanceProfiles['InstanceProfileName']] = None
-output += InstanceProfilesRpt.resultf()
+  def sendJson(self, parStatus, parBody):
+    self.sendBody(parStatus, 'application/json', json.dumps(parBody).encode('utf-8'))
 
-print(output)
-print("\n")
+  def sendBody(self, parStatus, parType, parBody):
+    self.send_response(parStatus)
+    self.send_header('Content-Type', parType)
+    self.send_header('Content-Length', str(len(parBody)))
+    self.end_headers()
+    self.wfile.write(parBody)
+
+  def log_message(self, format, *args):
+    pass
+
+class invHTTPServer(socketserver.ThreadingMixIn, http.server.HTTPServer):
+  daemon_threads = True
+
+def serveInventory(parPort):
+  #  serveInventory - "--serve PORT": HTTP server thread on 127.0.0.1.
+  server = invHTTPServer(('127.0.0.1', parPort), invHTTPHandler)
+  threading.Thread(target=server.serve_forever, daemon=True).start()
+  print('Serving inventory on http://127.0.0.1:{0}/inventory (ctrl-c to exit)...'.format(parPort))
+
+invCache = invCacheClass(serveCacheTTL)
+
+if args.summary:
+  summaryInventory()
+  exit(0)
+
+if resumeHeader:
+  #  Resuming - the items still to delete come from the journal; nothing is re-inventoried.
+  try:
+    resumeHeader, termTrack = deleteJournal.load()
+  except ValueError as e:
+    print('ERROR:', e)
+    exit(13)
+  if resumeHeader['account'] != currentAccountId:
+    print('ERROR: {0} was written for AWS account {1}; connected account is {2}'.format(deleteJournal.path, resumeHeader['account'], currentAccountId))
+    exit(13)
+  regions = resumeHeader['regions']
+  VPCNoDefaultByRegion = resumeHeader['VPCNoDefaultByRegion']
+  vpcRebuildRegions = resumeHeader.get('vpcRebuildRegions', VPCNoDefaultByRegion)
+else:
+  print('Inventory of ALL AWS components\n')
+  if args.deadline:
+    #  Each component in all regions before the next one, so a run cut short by the deadline
+    #  has found the items that cost the most.
+    deadlineOrder = [x for x in deadline.order() if aws_cleanupArg.inv or x.compDelete]
+    progress.startInventory(sum(1 if x in awsComponentGlobal else len(regions) for x in deadlineOrder), 'components/regions')
+    for compDef in deadlineOrder:
+      if not deadline.expired():
+        print('Inventorying {0}...'.format(compDef.compName))
+      for currentRegion in ([None] if compDef in awsComponentGlobal else sorted(regions)):
+        if currentRegion:
+          inventoryRegion(currentRegion, [compDef])
+        else:
+          inventoryGlobal([compDef])
+        regionScanned(currentRegion)
+  else:
+    progress.startInventory(len(regions) + 1)
+    for currentRegion in sorted(regions):
+      inventoryRegion(currentRegion)
+      regionScanned(currentRegion)
+      if args.stream:
+        print(inventoryReport(parStream=True), end='')
+    inventoryGlobal()
+    regionScanned(None)
+  progress.stop()
+  if args.stream:
+    print(inventoryReport(parStream=True), end='')
+    if VPCNoDefaultByRegion:
+      print('\nThe following regions do not have default VPCs: {0}'.format(', '.join(VPCNoDefaultByRegion)) + ("\n" * 2))
+    if not args.final_report:
+      print(connBreaker.report(), end='')
+    if args.final_report:
+      print('\nConsolidated report:')
+  if not args.stream or args.final_report:
+    print(inventoryReport())
+  print(deadline.report('inventory'), end='')
+  ign = invTrack.commit()
+  writeMetrics()
+  writeHistory()
+  if args.shard:
+    shardPath = args.shard_file or 'aws_cleanup_shard_{0}of{1}.json'.format(*args.shard)
+    writeShard(shardPath)
+    print('Shard {0} of {1} written to {2}; combine all shards with "aws_cleanup.py merge"'.format(args.shard[0], args.shard[1], shardPath))
+    exit(0)
+  if args.serve:
+    serveInventory(args.serve)
+  if args.watch:
+    print('Watching for changes every {0} seconds (ctrl-c to exit)...'.format(args.watch))
+    watchInventory(args.watch)
+  elif args.serve:
+    while not shutdownEvent.wait(3600):
+      pass
+  print("\n")
+  #  A delete based on a partial inventory can leave dependencies behind (e.g. a VPC whose
+  #  subnets weren't scanned) - only with "--ignore_conn_err".
+  if connBreaker.failed and not aws_cleanupArg.inv and not aws_cleanupArg.ignore_conn_err:
+    print('ERROR: the inventory is incomplete (connection errors); nothing deleted. Rerun, or add "--ignore_conn_err" to delete the items listed.')
+    exit(100)
 if not aws_cleanupArg.inv:
 
   if currentUserArnDel:
@@ -954,7 +3390,19 @@ if not aws_cleanupArg.inv:
     print("No AWS items found that are in-scope for terminating/deleting")
   else:
     #  Verify that they really want to terminate/delete everything listed as in-scope.
-    if VPCNoDefaultByRegion and not termTrack:
+    if resumeHeader:
+      #  The plan was verified when the journal was written.
+      print('Resuming delete from {0}; remaining items:'.format(deleteJournal.path))
+      for compDef in termTrack.components():
+        print('  * {0}: {1}'.format(compDef.compName, termTrack.count(compDef)))
+      if resumeHeader.get('merged'):
+        #  A plan merged from shards hasn't been confirmed yet.
+        verifyDelCode = str(random.randint(0, 9999)).zfill(4)
+        print("\nALL AWS COMPONENTS LISTED ABOVE WILL BE TERMINATED/DELETED. Verification Code ---> {}".format(verifyDelCode))
+        verifyTermProceed = input('Enter above 4-digit Verification Code to proceed (ctrl-c to exit): ')
+      else:
+        verifyTermProceed = verifyDelCode = resumeHeader['time']
+    elif VPCNoDefaultByRegion and not termTrack:
       print("No AWS items found that are in-scope for terminating/deleting; however")
       print("the following regions don't have default VPCs: {0}".format(', '.join(VPCNoDefaultByRegion)))
       print("Default VPCs are created in all the regions when your AWS environment is setup.")
@@ -978,15 +3426,48 @@ if not aws_cleanupArg.inv:
       verifyDelCode = str(random.randint(0, 9999)).zfill(4)
       print("\nALL AWS COMPONENTS LISTED ABOVE WILL BE TERMINATED/DELETED. Verification Code ---> {}".format(verifyDelCode))
       verifyTermProceed = input('Enter above 4-digit Verification Code to proceed (ctrl-c to exit): ')
-    #################################################################
-    #  EC2 Instances terminate
-    #################################################################
     if verifyTermProceed == verifyDelCode:
-      for currentRegion,idDict in termTrack.get(awsComponent.EC2, {}).items():
-        clientEC2Region = boto3.client('ec2',region_name=currentRegion)
+      if not resumeHeader:
+        vpcRebuildRegions = set(VPCNoDefaultByRegion)
+        for currentRegion, idDict in termTrack.byRegion(awsComponent.VPC).items():
+          for idDetail in idDict.values():
+            if idDetail.isDefault:
+              vpcRebuildRegions.add(currentRegion)
+        deleteJournal = deleteJournalClass(args.journal or 'aws_cleanup_{0}.journal'.format(time.strftime('%Y%m%d_%H%M%S')))
+        deleteJournal.plan(termTrack, {'time': time.strftime('%Y-%m-%d %H:%M:%S'), 'account': currentAccountId, 'vpc_rebuild': aws_cleanupArg.vpc_rebuild,
+                                       'regions': sorted(regions), 'VPCNoDefaultByRegion': VPCNoDefaultByRegion, 'vpcRebuildRegions': sorted(vpcRebuildRegions)})
+      print('Delete journal: {0} (if interrupted, continue with "--resume {0}")\n'.format(deleteJournal.path))
+      progress.startDelete(len(termTrack))
+
+      #################################################################
+      #  CloudFormationStacks delete
+      #################################################################
+      #  Stacks own resources listed in the other components, so they're deleted first. The
+      #  teardown runs in the background; each regional stage below waits for its region's
+      #  stacks to be gone, and the global stages wait for all regions.
+      ign = deadline.startStage(awsComponent.CloudFormationStacks, awsComponent.NATGateways, awsComponent.ElasticIPs, awsComponent.NetworkInterfaces)
+      cfnTeardown = cfnTeardownClass(termTrack.byRegion(awsComponent.CloudFormationStacks))
+      cfnTeardown.start()
+
+      #################################################################
+      #  NATGateways / ElasticIPs / NetworkInterfaces delete
+      #################################################################
+      #  Also in the background (NAT gateways take minutes to delete); the Security Group and
+      #  VPC stages below wait for their region.
+      netTeardown = netTeardownClass(termTrack.byRegion(awsComponent.NATGateways), termTrack.byRegion(awsComponent.ElasticIPs),
+                                     termTrack.byRegion(awsComponent.NetworkInterfaces), cfnTeardown)
+      netTeardown.start()
+
+      #################################################################
+      #  EC2 Instances terminate
+      #################################################################
+      deleteStage(awsComponent.EC2)
+      for currentRegion,idDict in termTrack.byRegion(awsComponent.EC2).items():
+        cfnTeardown.waitRegion(currentRegion)
+        clientEC2Region = awsClient('ec2', currentRegion)
 
         for id, idDetail in idDict.items():
-          print('Terminating ' + currentRegion + ' EC2 instance ' + idDetail['DISPLAY_ID'])
+          print('Terminating ' + currentRegion + ' EC2 instance ' + idDetail.display)
           ec2DryRunSuccessful=False
           #  Not sure if there's an advantage to having the DryRun test;
           #  will leave this segment of code in place for future.
@@ -1003,174 +3484,163 @@ if not aws_cleanupArg.inv:
           if ec2DryRunSuccess:
             try:
               response = clientEC2Region.terminate_instances(InstanceIds=[id], DryRun=False)
-              idDetail['TERMINATED'] = True
+              idDetail.state = 'terminating'
             except ClientError as e:
               print("    ERROR:", e, '\n')
       #  Loop through terminated instances and wait for the termination to 
       #  complete before continuing.
-      for currentRegion,idDict in termTrack.get(awsComponent.EC2, {}).items():
-        clientEC2Region = boto3.client('ec2',region_name=currentRegion)
+      for currentRegion,idDict in termTrack.byRegion(awsComponent.EC2).items():
+        clientEC2Region = awsClient('ec2', currentRegion)
         waiter = clientEC2Region.get_waiter('instance_terminated')
         for id, idDetail in idDict.items():
-          if idDetail['TERMINATED']:
-            print('Waiting for {0} EC2 instance {1} to terminate...'.format(currentRegion, idDetail['DISPLAY_ID']))
+          if idDetail.state == 'terminating':
+            print('Waiting for {0} EC2 instance {1} to terminate...'.format(currentRegion, idDetail.display))
             waiter.wait(InstanceIds=[id])
+            markDeleted(awsComponent.EC2, currentRegion, id)
              
       #################################################################
       #  SecurityGroups delete
       #################################################################
+      deleteStage(awsComponent.SecurityGroups)
       #  Delete Security Groups
-      for currentRegion,idDict in termTrack.get(awsComponent.SecurityGroups, {}).items():
-        clientEC2Region = boto3.client('ec2',region_name=currentRegion)
+      for currentRegion,idDict in termTrack.byRegion(awsComponent.SecurityGroups).items():
+        cfnTeardown.waitRegion(currentRegion)
+        netTeardown.waitRegion(currentRegion)
+        clientEC2Region = awsClient('ec2', currentRegion)
         for id, idDetail in idDict.items():
-          print('Deleting ' + currentRegion + ' Security Group ' + idDetail['DISPLAY_ID'])
-          conflictList = []
-          for instResvChk in clientEC2Region.describe_instances(Filters=[{'Name': 'instance.group-id', 'Values': [id]}])['Reservations']:
-            for instChk in instResvChk['Instances']:
-              conflictList.append(instChk['InstanceId'] + tagNameFind(instChk.get('Tags'), aws_cleanupArg))
+          print('Deleting ' + currentRegion + ' Security Group ' + idDetail.display)
+          conflictList = dependIndex(currentRegion).dependents(id, 'instance')
           if conflictList:
             print('  WARNING: Security Group {0} is attached to the following EC2 instance(s):\n\t{1}'.format(id, '\n\t'.join(conflictList)))
+          conflictList = dependIndex(currentRegion).dependents(id, 'interface')
+          if conflictList:
+            print('  WARNING: Security Group {0} is used by the following network interface(s):\n\t{1}'.format(id, '\n\t'.join(conflictList)))
           try:
             response = clientEC2Region.delete_security_group(GroupId = id, DryRun=False)
+            markDeleted(awsComponent.SecurityGroups, currentRegion, id)
           except ClientError as e:
             print("    ERROR:", e, '\n')
 
       #################################################################
       #  Volumes delete
       #################################################################
+      deleteStage(awsComponent.Volumes)
       if awsComponent.Volumes in termTrack:
         print("NOTE: Volumes may already been deleted with assoicated EC2 instances.")
-        for currentRegion,idDict in termTrack.get(awsComponent.Volumes, {}).items():
-          clientEC2Region = boto3.client('ec2',region_name=currentRegion)
-          for id, idDetail in idDict.items():
-            print('Deleting ' + currentRegion + ' Volume ' + idDetail['DISPLAY_ID'])
-            try:
-              response = clientEC2Region.delete_volume(VolumeId = id, DryRun=False)
-            except ClientError as e:
-              if e.response["Error"]["Code"] == 'InvalidVolume.NotFound':
-                print("    Volume already deleted")
-              else:
-                print("    ERROR:", e, '\n')
+      ign = volumeTeardown(termTrack.byRegion(awsComponent.Volumes), cfnTeardown.waitRegion)
 
 
+      #################################################################
+      #  AMIs deregister / Snapshots delete
+      #################################################################
+      #  An AMI's snapshots can't be deleted while it's registered, so all AMIs go first. Both
+      #  run over the bulkDelete thread pool (deleteMaxWorkers calls in flight, all regions).
+      deleteStage(awsComponent.AMIs)
+      ign = bulkDelete(awsComponent.AMIs, 'ec2', termTrack.byRegion(awsComponent.AMIs),
+          lambda client, idList: client.deregister_image(ImageId=idList[0]), parGoneCodes=('InvalidAMIID.NotFound', 'InvalidAMIID.Unavailable'), parWaitRegion=cfnTeardown.waitRegion)
+      deleteStage(awsComponent.Snapshots)
+      ign = bulkDelete(awsComponent.Snapshots, 'ec2', termTrack.byRegion(awsComponent.Snapshots),
+          lambda client, idList: client.delete_snapshot(SnapshotId=idList[0]), parGoneCodes=('InvalidSnapshot.NotFound',), parWaitRegion=cfnTeardown.waitRegion)
+
       #################################################################
       #  KeyPairs delete
       #################################################################
-      for currentRegion,idDict in termTrack.get(awsComponent.KeyPairs, {}).items():
-        clientEC2Region = boto3.resource('ec2',region_name=currentRegion)
-        for id, idDetail in idDict.items():
-          print('Deleting {0} "{1}"'.format(awsComponent.KeyPairs.compName, id))
-          try:
-            response = clientEC2Region.KeyPair(id).delete(DryRun=False)
-          except ClientError as e:
-            print("    ERROR:", e, '\n')
+      deleteStage(awsComponent.KeyPairs)
+      ign = bulkDelete(awsComponent.KeyPairs, 'ec2', termTrack.byRegion(awsComponent.KeyPairs),
+          lambda client, idList: client.delete_key_pair(KeyName=idList[0]), parWaitRegion=cfnTeardown.waitRegion)
 
       #################################################################
       #  MetricAlarms delete
       #################################################################
-      for currentRegion,idDict in termTrack.get(awsComponent.MetricAlarms, {}).items():
-        clientCloudwatchRegion = boto3.client('cloudwatch', region_name=currentRegion)
-        for id, idDetail in idDict.items():
-          print('Deleting {0} alarm {1}'.format(currentRegion, idDetail['DISPLAY_ID']))
-          try:
-            ign = clientCloudwatchRegion.delete_alarms(AlarmNames=[id])
-          except ClientError as e:
-            print("    ERROR:", e, '\n')
+      deleteStage(awsComponent.MetricAlarms)
+      #  delete_alarms takes up to 100 alarm names per call.
+      ign = bulkDelete(awsComponent.MetricAlarms, 'cloudwatch', termTrack.byRegion(awsComponent.MetricAlarms),
+          lambda client, idList: client.delete_alarms(AlarmNames=idList), parBatchSize=100, parGoneCodes=('ResourceNotFound',), parWaitRegion=cfnTeardown.waitRegion)
 
       #################################################################
       #  CloudWatchLogGroups delete
       #################################################################
-      for currentRegion,idDict in termTrack.get(awsComponent.CloudWatchLogGroups, {}).items():
-        clientCloudWatchLogRegion = boto3.client('logs', region_name=currentRegion)
-        for id, idDetail in idDict.items():
-          print('Deleting {0} {1} "{2}"'.format(currentRegion, awsComponent.CloudWatchLogGroups.compName, id))
-          try:
-            ign = clientCloudWatchLogRegion.delete_log_group(logGroupName=id)
-          except ClientError as e:
-            print("    ERROR:", e, '\n')
+      deleteStage(awsComponent.CloudWatchLogGroups)
+      ign = bulkDelete(awsComponent.CloudWatchLogGroups, 'logs', termTrack.byRegion(awsComponent.CloudWatchLogGroups),
+          lambda client, idList: client.delete_log_group(logGroupName=idList[0]), parGoneCodes=('ResourceNotFoundException',), parWaitRegion=cfnTeardown.waitRegion)
 
       #################################################################
       #  ConfigRules delete
       #################################################################
-      for currentRegion,idDict in termTrack.get(awsComponent.ConfigRules, {}).items():
-        clientConfigRegion = boto3.client('config', region_name=currentRegion)
-        for id, idDetail in idDict.items():
-          #  The description for ConfigRules can get wordy; leaving off for the moment.
-          print('Deleting {0} {1} "{2}"'.format(currentRegion, awsComponent.ConfigRules.compName, id))
-          try:
-            ign = clientConfigRegion.delete_config_rule(ConfigRuleName=id)
-          except ClientError as e:
-            print("    ERROR:", e, '\n')
-
-      #################################################################
-      #  CloudFormationStacks delete 
-      #################################################################
-      for currentRegion,idDict in termTrack.get(awsComponent.CloudFormationStacks, {}).items():
-        clientCloudFormationRegion = boto3.client('cloudformation', region_name=currentRegion)
-        for id, idDetail in idDict.items():
-          print('Deleting {0} {1} "{2}"'.format(currentRegion, awsComponent.CloudFormationStacks.compName, idDetail['DISPLAY_ID']))
-          try:
-            ign = clientCloudFormationRegion.delete_stack(StackName=id)
-          except ClientError as e:
-            print("    ERROR:", e, '\n')
+      deleteStage(awsComponent.ConfigRules)
+      ign = bulkDelete(awsComponent.ConfigRules, 'config', termTrack.byRegion(awsComponent.ConfigRules),
+          lambda client, idList: client.delete_config_rule(ConfigRuleName=idList[0]), parGoneCodes=('NoSuchConfigRuleException',), parWaitRegion=cfnTeardown.waitRegion)
 
       #################################################################
       #  CloudTrail delete
       #################################################################
-      for currentRegion,idDict in termTrack.get(awsComponent.CloudTrail, {}).items():
-        clientCloudTrailRegion = boto3.client('cloudtrail', region_name=currentRegion)
+      deleteStage(awsComponent.CloudTrail)
+      for currentRegion,idDict in termTrack.byRegion(awsComponent.CloudTrail).items():
+        cfnTeardown.waitRegion(currentRegion)
+        clientCloudTrailRegion = awsClient('cloudtrail', currentRegion)
         for id, idDetail in idDict.items():
-          print('Deleting {0} {1} "{2}"'.format(currentRegion, awsComponent.CloudTrail.compName, idDetail['DISPLAY_ID']))
+          print('Deleting {0} {1} "{2}"'.format(currentRegion, awsComponent.CloudTrail.compName, idDetail.display))
           try:
             ign = clientCloudTrailRegion.delete_trail(Name=id)
+            markDeleted(awsComponent.CloudTrail, currentRegion, id)
           except ClientError as e:
             print("    ERROR:", e, '\n')
 
       #################################################################
       #  ConfigurationRecorders delete
       #################################################################
-      for currentRegion,idDict in termTrack.get(awsComponent.ConfigurationRecorders, {}).items():
-        clientConfigRegion = boto3.client('config', region_name=currentRegion)
+      deleteStage(awsComponent.ConfigurationRecorders)
+      for currentRegion,idDict in termTrack.byRegion(awsComponent.ConfigurationRecorders).items():
+        cfnTeardown.waitRegion(currentRegion)
+        clientConfigRegion = awsClient('config', currentRegion)
         for id, idDetail in idDict.items():
           print('Deleting {0} {1} "{2}"'.format(currentRegion, awsComponent.ConfigurationRecorders.compName, id))
           try:
             response = clientConfigRegion.delete_configuration_recorder(ConfigurationRecorderName=id)
+            markDeleted(awsComponent.ConfigurationRecorders, currentRegion, id)
           except ClientError as e:
             print("    ERROR:", e, '\n')
 
       #################################################################
       #  AssessmentTargets delete 
       #################################################################
-      for currentRegion,idDict in termTrack.get(awsComponent.AssessmentTargets, {}).items():
-        clientInspectorRegion = boto3.client('inspector', region_name=currentRegion)
+      deleteStage(awsComponent.AssessmentTargets)
+      for currentRegion,idDict in termTrack.byRegion(awsComponent.AssessmentTargets).items():
+        cfnTeardown.waitRegion(currentRegion)
+        clientInspectorRegion = awsClient('inspector', currentRegion)
         for id, idDetail in idDict.items():
-          print('Deleting {0} Assessment Target {1}'.format(currentRegion, idDetail['DISPLAY_ID']))
+          print('Deleting {0} Assessment Target {1}'.format(currentRegion, idDetail.display))
           try:
             response = clientInspectorRegion.delete_assessment_target(assessmentTargetArn=id)
+            markDeleted(awsComponent.AssessmentTargets, currentRegion, id)
           except ClientError as e:
             print("    ERROR:", e, '\n')
 
       #################################################################
       #  SNSTopics delete
       #################################################################
-      for currentRegion,idDict in termTrack.get(awsComponent.SNSTopics, {}).items():
-        clientSNSRegion = boto3.client('sns', region_name=currentRegion)
-        for id, idDetail in idDict.items():
-          print('Deleting {0} SNS Topic {1}'.format(currentRegion, idDetail['DISPLAY_ID']))
-          try:
-            response = clientSNSRegion.delete_topic(TopicArn=id)
-          except ClientError as e:
-            print("    ERROR:", e, '\n')
+      deleteStage(awsComponent.SNSTopics)
+      ign = bulkDelete(awsComponent.SNSTopics, 'sns', termTrack.byRegion(awsComponent.SNSTopics),
+          lambda client, idList: client.delete_topic(TopicArn=idList[0]), parGoneCodes=('NotFound',), parWaitRegion=cfnTeardown.waitRegion)
 
       #################################################################
       #  VPCEndpoints delete
       #################################################################
-      for currentRegion,idDict in termTrack.get(awsComponent.VPCEndpoints, {}).items():
-        clientEC2Region = boto3.client('ec2',region_name=currentRegion)
+      deleteStage(awsComponent.VPCEndpoints)
+      for currentRegion,idDict in termTrack.byRegion(awsComponent.VPCEndpoints).items():
+        cfnTeardown.waitRegion(currentRegion)
+        clientEC2Region = awsClient('ec2', currentRegion)
         for id, idDetail in idDict.items():
-          print('Deleting {0} VPC Endpoint {1}'.format(currentRegion, idDetail['DISPLAY_ID']))
+          print('Deleting {0} VPC Endpoint {1}'.format(currentRegion, idDetail.display))
           try:
-            ign = clientEC2Region.delete_vpc_endpoints(VpcEndpointIds=[id])
+            response = clientEC2Region.delete_vpc_endpoints(VpcEndpointIds=[id])
+            #  Failures are listed in the response ("Unsuccessful"), not raised.
+            unsuccessfulList = [x for x in response.get('Unsuccessful', []) if x.get('ResourceId') == id]
+            if unsuccessfulList:
+              print('    ERROR: {0} - {1}: {2}\n'.format(id, unsuccessfulList[0]['Error'].get('Code'), unsuccessfulList[0]['Error'].get('Message')))
+            else:
+              dependIndex(currentRegion).markGone(id)
+              markDeleted(awsComponent.VPCEndpoints, currentRegion, id)
           except ClientError as e:
             print("    ERROR:", e, '\n')
 
@@ -1178,72 +3648,85 @@ if not aws_cleanupArg.inv:
       #################################################################
       #  Subnets delete
       #################################################################
-      for currentRegion,idDict in termTrack.get(awsComponent.Subnets, {}).items():
-        clientEC2Region = boto3.client('ec2',region_name=currentRegion)
+      deleteStage(awsComponent.Subnets)
+      for currentRegion,idDict in termTrack.byRegion(awsComponent.Subnets).items():
+        cfnTeardown.waitRegion(currentRegion)
+        netTeardown.waitRegion(currentRegion)
+        clientEC2Region = awsClient('ec2', currentRegion)
         for id, idDetail in idDict.items():
-          print('Deleting {0} subnet {1}'.format(currentRegion, idDetail['DISPLAY_ID']))
-          conflictList = []
-          for instResvChk in clientEC2Region.describe_instances(Filters=[{'Name': 'subnet-id', 'Values': [id]}])['Reservations']:
-            for instChk in instResvChk['Instances']:
-              conflictList.append(instChk['InstanceId'] + tagNameFind(instChk.get('Tags'), aws_cleanupArg))
+          print('Deleting {0} subnet {1}'.format(currentRegion, idDetail.display))
+          conflictList = dependIndex(currentRegion).dependents(id, 'instance')
           if conflictList:
             print('  WARNING: {0} subnet {1} is associated with the following EC2 instance(s):\n\t{2}'.format(currentRegion, id, '\n\t'.join(conflictList)))
 
-          conflictList = []
-          for idChk in clientEC2Region.describe_vpc_endpoints(Filters=[{'Name': 'vpc-id', 'Values': [idDetail['VpcId']]}])['VpcEndpoints']:
-            if id in idChk['SubnetIds']:
-              conflictList.append(idChk['VpcEndpointId'])
+          conflictList = dependIndex(currentRegion).dependents(id, 'endpoint')
           if conflictList:
             print('  WARNING: {0} subnet {1} is associated with the following endpoints:\n\t{2}'.format(currentRegion, id, '\n\t'.join(conflictList)))
 
+          conflictList = dependIndex(currentRegion).dependents(id, 'interface')
+          if conflictList:
+            print('  WARNING: {0} subnet {1} is used by the following network interface(s):\n\t{2}'.format(currentRegion, id, '\n\t'.join(conflictList)))
+
           try:
             ign = clientEC2Region.delete_subnet(SubnetId=id)
+            dependIndex(currentRegion).markGone(id)
+            markDeleted(awsComponent.Subnets, currentRegion, id)
           except ClientError as e:
             print("    ERROR:", e, '\n')
 
       #################################################################
       #  RouteTables delete
       #################################################################
-      for currentRegion, idDict in termTrack.get(awsComponent.RouteTables, {}).items():
-        clientEC2Region = boto3.client('ec2',region_name=currentRegion)
+      deleteStage(awsComponent.RouteTables)
+      for currentRegion, idDict in termTrack.byRegion(awsComponent.RouteTables).items():
+        cfnTeardown.waitRegion(currentRegion)
+        netTeardown.waitRegion(currentRegion)
+        clientEC2Region = awsClient('ec2', currentRegion)
         for id, idDetail in idDict.items():
-          print('Deleting {0} Route Table {1}'.format(currentRegion, idDetail['DISPLAY_ID']))
+          print('Deleting {0} Route Table {1}'.format(currentRegion, idDetail.display))
           delRouteTables = True
           #  Check main
-          RouteTablesAssociations = chkRouteTablesAssociations(id, aws_cleanupArg, currentRegion)
+          RouteTablesAssociations = dependIndex(currentRegion).routeTables.get(id, {'Main': False, 'Subnets': []})
           if RouteTablesAssociations['Main']:
-            chkVpc = clientEC2Region.describe_vpcs(VpcIds=[idDetail['VpcId']])['Vpcs'][0]
-            if awsComponent.VPC in termTrack and currentRegion in termTrack[awsComponent.VPC] and idDetail['VpcId'] in termTrack[awsComponent.VPC][currentRegion]:
-              print('  NOTE: {0} {1} is the Main route table for VPC {2}; it\'s deleted automatically when the VPC is deleted.\n'.format(currentRegion, id, idDetail['VpcId'] + tagNameFind(chkVpc.get('Tags'), aws_cleanupArg)))
+            chkVpcDisplay = dependIndex(currentRegion).vpcDisplay.get(idDetail.vpcId, idDetail.vpcId)
+            if termTrack.lookup(awsComponent.VPC, currentRegion, idDetail.vpcId):
+              print('  NOTE: {0} {1} is the Main route table for VPC {2}; it\'s deleted automatically when the VPC is deleted.\n'.format(currentRegion, id, chkVpcDisplay))
               delRouteTables = False
             else:
-              print('  WARNING: {0} {1} is the Main route table for VPC {2}; it cannot be deleted until the VPC is in-scope for deletion.'.format(currentRegion, id, idDetail['VpcId']  + tagNameFind(chkVpc.get('Tags'), aws_cleanupArg)))
+              print('  WARNING: {0} {1} is the Main route table for VPC {2}; it cannot be deleted until the VPC is in-scope for deletion.'.format(currentRegion, id, chkVpcDisplay))
           if delRouteTables:
             if RouteTablesAssociations['Subnets'] and not RouteTablesAssociations['Main']:
               print('  WARNING: {0} Route Table {1} is associated with the following subnets:\n\t{2}.'.format(currentRegion, id, '\n\t'.join(RouteTablesAssociations['Subnets'])))
             try:
               ign = clientEC2Region.delete_route_table(RouteTableId=id)
+              dependIndex(currentRegion).markGone(id)
+              markDeleted(awsComponent.RouteTables, currentRegion, id)
             except ClientError as e:
               print("    ERROR:", e, '\n')
 
       #################################################################
       #  InternetGateways delete
       #################################################################
-      for currentRegion, idDict in termTrack.get(awsComponent.InternetGateways, {}).items():
-        clientEC2Region = boto3.client('ec2',region_name=currentRegion)
+      deleteStage(awsComponent.InternetGateways)
+      for currentRegion, idDict in termTrack.byRegion(awsComponent.InternetGateways).items():
+        cfnTeardown.waitRegion(currentRegion)
+        netTeardown.waitRegion(currentRegion)
+        clientEC2Region = awsClient('ec2', currentRegion)
         for id, idDetail in idDict.items():
           error_detach_InternetGateways = False
-          if idDetail['VpcID']:
-            print('Detaching {0} internet Gateway {1} from VPC ID {2}'.format(currentRegion, idDetail['DISPLAY_ID'], idDetail['VpcID']))
+          if idDetail.vpcId:
+            print('Detaching {0} internet Gateway {1} from VPC ID {2}'.format(currentRegion, idDetail.display, idDetail.vpcId))
             try:
-              ign = clientEC2Region.detach_internet_gateway(InternetGatewayId=id,VpcId=idDetail['VpcID'])
+              ign = clientEC2Region.detach_internet_gateway(InternetGatewayId=id,VpcId=idDetail.vpcId)
             except ClientError as e:
               print("    ERROR:", e, '\n')
               error_detach_InternetGateways = True
           if not error_detach_InternetGateways:
-            print('Deleting {0} internet Gateway {1}'.format(currentRegion, idDetail['DISPLAY_ID']))
+            print('Deleting {0} internet Gateway {1}'.format(currentRegion, idDetail.display))
             try:
               ign = clientEC2Region.delete_internet_gateway(InternetGatewayId=id)
+              dependIndex(currentRegion).markGone(id)
+              markDeleted(awsComponent.InternetGateways, currentRegion, id)
             except ClientError as e:
               print("    ERROR:", e, '\n')
 
@@ -1251,94 +3734,87 @@ if not aws_cleanupArg.inv:
       #################################################################
       #  VPC delete
       #################################################################
-      for currentRegion, idDict in termTrack.get(awsComponent.VPC, {}).items():
-        clientEC2Region = boto3.client('ec2',region_name=currentRegion)
+      deleteStage(awsComponent.VPC)
+      for currentRegion, idDict in termTrack.byRegion(awsComponent.VPC).items():
+        cfnTeardown.waitRegion(currentRegion)
+        netTeardown.waitRegion(currentRegion)
+        clientEC2Region = awsClient('ec2', currentRegion)
         for id, idDetail in idDict.items():
 
-          print('Deleting {0} VPC {1}'.format(currentRegion, idDetail['DISPLAY_ID']))
+          print('Deleting {0} VPC {1}'.format(currentRegion, idDetail.display))
           #  Trap a couple simple error conditions. Provide warnings & explanation
-          conflictList = []
-          for idChk in clientEC2Region.describe_internet_gateways(Filters=[{'Name': 'attachment.vpc-id', 'Values': [id]}])['InternetGateways']:
-            conflictList.append(idChk['InternetGatewayId'] + tagNameFind(idChk.get('Tags'), aws_cleanupArg))
-          if conflictList:
-            print('  WARNING: {0} VPC {1} is attached to the following gateway(s):\n\t{2}'.format(currentRegion, id, '\n\t'.join(conflictList)))
-
-          conflictList = []
-          for idChk in clientEC2Region.describe_subnets(Filters=[{'Name': 'vpc-id', 'Values': [id]}])['Subnets']:
-            conflictList.append(idChk['SubnetId']  + tagNameFind(idChk.get('Tags'), aws_cleanupArg))
-          if conflictList:
-            print('  WARNING: {0} VPC {1} is associated with the following subnet(s):\n\t{2}'.format(currentRegion, id, '\n\t'.join(conflictList)))
-
-          conflictList = []
-          for idChk in clientEC2Region.describe_vpc_endpoints(Filters=[{'Name': 'vpc-id', 'Values': [id]}])['VpcEndpoints']:
-            conflictList.append(idChk['VpcEndpointId'])
-          if conflictList:
-            print('  WARNING: {0} VPC {1} is associated with the following endpoints:\n\t{2}'.format(currentRegion, id, '\n\t'.join(conflictList)))
-
-          conflictList = []
-          for idChk in clientEC2Region.describe_route_tables(Filters=[{'Name': 'vpc-id', 'Values':[id]}])['RouteTables']:
-            RouteTablesAssociations = chkRouteTablesAssociations(idChk['RouteTableId'], aws_cleanupArg, currentRegion)
-            if not RouteTablesAssociations['Main']:
-              conflictList.append(idChk['RouteTableId']  + tagNameFind(idChk.get('Tags'), aws_cleanupArg))
-          if conflictList:
-            print('  WARNING: {0} VPC {1} is associated with the following route table(s):\n\t{2}'.format(currentRegion, id, '\n\t'.join(conflictList)))
-
-          conflictList = []
-          for instResvChk in clientEC2Region.describe_instances(Filters=[{'Name': 'vpc-id', 'Values': [id]}])['Reservations']:
-            for instChk in instResvChk['Instances']:
-              conflictList.append(instChk['InstanceId'] + tagNameFind(instChk.get('Tags'), aws_cleanupArg))
-          if conflictList:
-            print('  WARNING: {0} VPC {1} is associated with the following EC2 instance(s):\n\t{2}'.format(currentRegion, id, '\n\t'.join(conflictList)))
+          for conflictKind, conflictMsg in (('gateway', 'is attached to the following gateway(s)'),
+                                            ('subnet', 'is associated with the following subnet(s)'),
+                                            ('endpoint', 'is associated with the following endpoints'),
+                                            ('routeTable', 'is associated with the following route table(s)'),
+                                            ('instance', 'is associated with the following EC2 instance(s)'),
+                                            ('interface', 'is used by the following network interface(s)')):
+            conflictList = dependIndex(currentRegion).dependents(id, conflictKind)
+            if conflictList:
+              print('  WARNING: {0} VPC {1} {2}:\n\t{3}'.format(currentRegion, id, conflictMsg, '\n\t'.join(conflictList)))
 
           try:
             ign = clientEC2Region.delete_vpc(VpcId=id)
+            markDeleted(awsComponent.VPC, currentRegion, id)
           except ClientError as e:
             print("    ERROR:", e, '\n')
 
       #################################################################
       #  S3 delete
       #################################################################
-      for id, idDetail in termTrack.get(awsComponent.S3, {}).items():
+      deleteStage(awsComponent.S3)
+      #  Buckets and the IAM components below can be owned by stacks in any region.
+      cfnTeardown.waitAll()
+      netTeardown.waitAll()
+      #  Largest buckets first (sizes from the inventory; unknown after --resume), each through
+      #  a resource for its own region.
+      resourceS3Region = {}
+      s3BucketList = sorted(termTrack.ids(awsComponent.S3), key=lambda x: (-(s3BucketMeta.get(x, {}).get('bytes') or 0), x))
+      for bucketNo, id in enumerate(s3BucketList):
+        #  A bucket purge can take long; none is started after the deadline.
+        if deadline.expired():
+          deadline.undone[('delete', awsComponent.S3)].append(len(s3BucketList) - bucketNo)
+          break
+        try:
+          bucketRegion = s3BucketMeta[id]['region'] if id in s3BucketMeta else s3BucketRegion(id)
+        except (ClientError,) + awsConnErrors as e:
+          bucketRegion = None
+        if bucketRegion not in resourceS3Region:
+          resourceS3Region[bucketRegion] = boto3.resource('s3', region_name=bucketRegion, config=awsConfig) if bucketRegion else resourceS3
         #  Before a bucket can be deleted, the objects in the bucket first have to be
         #  deleted.
-        print('Deleting any objects contained in S3 Bucket {0}...'.format(id))
+        print('Deleting any objects contained in S3 Bucket {0}{1}...'.format(id, formatDispName(fmtBytes(s3BucketMeta[id]['bytes']) if s3BucketMeta.get(id, {}).get('bytes') is not None else '')))
         try:
-          ign = resourceS3.Bucket(id).objects.delete()
+          ign = resourceS3Region[bucketRegion].Bucket(id).objects.delete()
         except ClientError as e:
           print("   ERROR: ", e, '\n')
         print('Deleting S3 Bucket {0}'.format(id))
         try:
-          ign = resourceS3.Bucket(id).delete()
+          ign = resourceS3Region[bucketRegion].Bucket(id).delete()
+          markDeleted(awsComponent.S3, None, id)
         except ClientError as e:
           print("   ERROR:", e, '\n')
 
+      deleteStage(None)
       #################################################################
       #  VPC re-create (assuming to re-create by default)
       #################################################################
-      print('Re-creating missing default VPCs...')
-      for currentRegion in sorted(regions):
-        clientEC2Region = boto3.client('ec2',region_name=currentRegion)
-        #  Check to see the default VPC exists for this region
-        isVPCDefault = False
-        for chkVpc in clientEC2Region.describe_vpcs(Filters=[{'Name': 'isDefault', 'Values':['true']}])['Vpcs']:
-          isVPCDefault = True
-        if isVPCDefault:
-          print("\tRegion {0} - default VPC exists; no need to re-create".format(currentRegion).format(currentRegion))
-        else:
-          print("\tRegion {0} - re-creating VPC".format(currentRegion))
-          try:
-            ign = clientEC2Region.create_default_vpc()
-          except ClientError as e:
-            print("\t   ERROR:", e, '\n')
-         
+      #  Regions come from the inventory: regions without a default VPC, plus regions where
+      #  the default VPC was planned for deletion (--vpc_rebuild).
+      if vpcRebuildRegions and deadline.expired():
+        print('DEADLINE: default VPCs not re-created in: {0}'.format(', '.join(sorted(vpcRebuildRegions))))
+      elif vpcRebuildRegions:
+        print('Re-creating missing default VPCs...')
+        vpcRebuild(vpcRebuildRegions)
 
       #################################################################
       #  Users delete 
       #################################################################
-      for id, idDetail in termTrack.get(awsComponent.Users, {}).items():
+      deleteStage(awsComponent.Users)
+      for id, idDetail in termTrack.ids(awsComponent.Users).items():
         #  Before a user can be deleted, need to delete the access key and login profile.
         #  Remove access key from user (if it exists)
-        dispItemsLine = dispItemsLineClass('User "{0}" ({1}) - deleting access key(s): '.format(id, idDetail['DISPLAY_ID']))
+        dispItemsLine = dispItemsLineClass('User "{0}" ({1}) - deleting access key(s): '.format(id, idDetail.display))
         for scanPrepDel in clientIAM.list_access_keys(UserName=id)['AccessKeyMetadata']:
           try:
             print(dispItemsLine.newItemName(scanPrepDel.get('AccessKeyId')), end = '')
@@ -1350,7 +3826,7 @@ if not aws_cleanupArg.inv:
         #  Remove login profile from user (if it exists)
         try:
           ign = clientIAM.get_login_profile(UserName = id)
-          print('User "{0}" ({1}) - deleting login profile'.format(id, idDetail['DISPLAY_ID']))
+          print('User "{0}" ({1}) - deleting login profile'.format(id, idDetail.display))
           ign = clientIAM.delete_login_profile(UserName = id)
         except ClientError as e:
           if e.response['Error']['Code'] == 'NoSuchEntity':
@@ -1359,7 +3835,7 @@ if not aws_cleanupArg.inv:
             print("   ERROR:", e, '\n')
 
         #  Remove any groups granted to the user (required before deleting user)
-        dispItemsLine = dispItemsLineClass('User "{0}" ({1}) - removing group(s): '.format(id, idDetail['DISPLAY_ID']))
+        dispItemsLine = dispItemsLineClass('User "{0}" ({1}) - removing group(s): '.format(id, idDetail.display))
         for scanPrepDel in clientIAM.list_groups_for_user(UserName=id)['Groups']:
           try:
             print(dispItemsLine.newItemName(scanPrepDel.get('GroupName')), end = '')
@@ -1369,7 +3845,7 @@ if not aws_cleanupArg.inv:
         print("", end = dispItemsLine.EOL())
 
         #  Remove any policies directly granted to the user (required before deleting user)
-        dispItemsLine = dispItemsLineClass('User "{0}" ({1}) - detaching policies: '.format(id, idDetail['DISPLAY_ID']))
+        dispItemsLine = dispItemsLineClass('User "{0}" ({1}) - detaching policies: '.format(id, idDetail.display))
         for scanPrepDel in clientIAM.list_attached_user_policies(UserName=id)['AttachedPolicies']:
           try:
             print(dispItemsLine.newItemName(scanPrepDel.get('PolicyName')), end = '')
@@ -1378,16 +3854,18 @@ if not aws_cleanupArg.inv:
             print("\n   ERROR:", e, '\n')
         print("", end = dispItemsLine.EOL())
 
-        print('User "{0}" ({1}) - dropping account'.format(id, idDetail['DISPLAY_ID']))
+        print('User "{0}" ({1}) - dropping account'.format(id, idDetail.display))
         try:
           ign = clientIAM.delete_user(UserName=id)
+          markDeleted(awsComponent.Users, None, id)
         except ClientError as e:
           print("   ERROR:", e, '\n')
 
       #################################################################
       #  Groups delete 
       #################################################################
-      for id, idDetail in termTrack.get(awsComponent.Groups, {}).items():
+      deleteStage(awsComponent.Groups)
+      for id, idDetail in termTrack.ids(awsComponent.Groups).items():
         dispItemsLine = dispItemsLineClass('Group "{0}" - detaching users: '.format(id))
         for scanPrepDel in clientIAM.get_group(GroupName=id)['Users']:
           try:
@@ -1418,14 +3896,16 @@ if not aws_cleanupArg.inv:
         try:
           print('Group "{0}" - deleting'.format(id))
           ign = clientIAM.delete_group(GroupName=id)
+          markDeleted(awsComponent.Groups, None, id)
         except ClientError as e:
           print("   ERROR:", e, '\n')
             
       #################################################################
       #  Policies delete
       #################################################################
-      for id, idDetail in termTrack.get(awsComponent.Policies, {}).items():
-        dispItemsLine = dispItemsLineClass('Policy "{0}" - detaching groups: '.format(idDetail['DISPLAY_ID']))
+      deleteStage(awsComponent.Policies)
+      for id, idDetail in termTrack.ids(awsComponent.Policies).items():
+        dispItemsLine = dispItemsLineClass('Policy "{0}" - detaching groups: '.format(idDetail.display))
         for scanPrepDel in clientIAM.list_entities_for_policy(PolicyArn=id)['PolicyGroups']:
           try:
             print(dispItemsLine.newItemName(scanPrepDel.get('GroupName')), end = '')
@@ -1434,7 +3914,7 @@ if not aws_cleanupArg.inv:
             print("\n   ERROR:", e, '\n')
         print("", end = dispItemsLine.EOL())
 
-        dispItemsLine = dispItemsLineClass('Policy "{0}" - detaching users: '.format(idDetail['DISPLAY_ID']))
+        dispItemsLine = dispItemsLineClass('Policy "{0}" - detaching users: '.format(idDetail.display))
         for scanPrepDel in clientIAM.list_entities_for_policy(PolicyArn=id)['PolicyUsers']:
           try:
             print(dispItemsLine.newItemName(scanPrepDel.get('UserName')), end = '')
@@ -1443,7 +3923,7 @@ if not aws_cleanupArg.inv:
             print("\n   ERROR:", e, '\n')
         print("", end = dispItemsLine.EOL())
 
-        dispItemsLine = dispItemsLineClass('Policy "{0}" - detaching roles: '.format(idDetail['DISPLAY_ID']))
+        dispItemsLine = dispItemsLineClass('Policy "{0}" - detaching roles: '.format(idDetail.display))
         for scanPrepDel in clientIAM.list_entities_for_policy(PolicyArn=id)['PolicyRoles']:
           try:
             print(dispItemsLine.newItemName(scanPrepDel.get('RoleName')), end = '')
@@ -1452,7 +3932,7 @@ if not aws_cleanupArg.inv:
             print("\n   ERROR:", e, '\n')
         print("", end = dispItemsLine.EOL())
 
-        dispItemsLine = dispItemsLineClass('Policy "{0}" - deleting non-default versions: '.format(idDetail['DISPLAY_ID']))
+        dispItemsLine = dispItemsLineClass('Policy "{0}" - deleting non-default versions: '.format(idDetail.display))
         for scanPrepDel in clientIAM.list_policy_versions(PolicyArn=id)['Versions']:
           if not scanPrepDel['IsDefaultVersion']:
             try:
@@ -1463,16 +3943,18 @@ if not aws_cleanupArg.inv:
         print("", end = dispItemsLine.EOL())
           
         try:
-          print('Policy "{0}" - deleting'.format(idDetail['DISPLAY_ID']))
+          print('Policy "{0}" - deleting'.format(idDetail.display))
           ign = clientIAM.delete_policy(PolicyArn = id)
+          markDeleted(awsComponent.Policies, None, id)
         except ClientError as e:
           print("   ERROR:", e, '\n')
 
       #################################################################
       #  Roles delete
       #################################################################
-      for id, idDetail in termTrack.get(awsComponent.Roles,{}).items():
-        if not idDetail['IsAwsService']:
+      deleteStage(awsComponent.Roles)
+      for id, idDetail in termTrack.ids(awsComponent.Roles).items():
+        if not idDetail.isAwsService:
           dispItemsLine = dispItemsLineClass('Role "{0}" - detaching policies: '.format(id))
           for scanPrepDel in clientIAM.list_attached_role_policies(RoleName=id)['AttachedPolicies']:
             try:
@@ -1500,27 +3982,38 @@ if not aws_cleanupArg.inv:
             print("\n   ERROR:", e, '\n')
         print("", end = dispItemsLine.EOL())
 
-        if idDetail['IsAwsService']:
+        if idDetail.isAwsService:
           try:
             print('Role "{0}" - deleting service linked role'.format(id))
             ign = clientIAM.delete_service_linked_role(RoleName = id)
+            markDeleted(awsComponent.Roles, None, id)
           except ClientError as e:
             print("   ERROR:", e, '\n')
         else:
           try:
             print('Role "{0}" - deleting'.format(id))
             ign = clientIAM.delete_role(RoleName = id)
+            markDeleted(awsComponent.Roles, None, id)
           except ClientError as e:
             print("   ERROR:", e, '\n')
 
       #################################################################
       #  InstanceProfiles delete
       #################################################################
-      for id, idDetail in termTrack.get(awsComponent.InstanceProfiles, {}).items():
+      deleteStage(awsComponent.InstanceProfiles)
+      for id, idDetail in termTrack.ids(awsComponent.InstanceProfiles).items():
         try:
           print('Instance profile "{0}" - deleting'.format(id))
           ign = clientIAM.delete_instance_profile(InstanceProfileName = id)
+          markDeleted(awsComponent.InstanceProfiles, None, id)
         except ClientError as e:
           print("   ERROR:", e, '\n')
+      deleteStage(None)
+      deleteJournal.sync()
+      progress.stop()
+      verifyDeletes()
+      writeMetrics()
+      if deadline.undone:
+        print(deadline.report('delete') + 'The remaining deletes can be continued with "--resume {0}"'.format(deleteJournal.path))
     else:
       print('Invalid Verification Code entered. Exiting script WITHOUT terminating/deleting AWS components')
@@ -3,7 +3,7 @@
 from collections import deque,defaultdict,namedtuple  
 
 #  aws_cleanup_import_ver needs to match version number in aws_cleanup.py
-aws_cleanup_import_ver = 2.10
+aws_cleanup_import_ver = 2.21
 
 #  Can enabled multiple "keep" tags.
 constantKeepTag = ['keep']
@@ -11,6 +11,70 @@ constantKeepTag = ['keep']
 #  Subset of regions for script testing via "--region_test"  (shortens execution time)
 regionTestSubset=['us-west-1','us-west-2','us-east-1','us-east-2']
 
+#  Maximum number of regions processed at the same time by the concurrent delete stages.
+regionMaxWorkers = 8
+
+#  Maximum number of delete calls in flight at the same time for components without a
+#  batch delete API (log groups, SNS topics, key pairs, config rules).
+deleteMaxWorkers = 16
+
+#  CloudFormation stack teardown: seconds between status polls (one list_stacks per region),
+#  and maximum number of seconds to wait for the stacks in a region to finish deleting.
+cfnPollInterval = 10
+cfnTimeout = 3600
+
+#  Progress display ("--progress"): seconds between status line redraws on a terminal, and
+#  seconds between progress log lines when the output goes to a file or pipe.
+progressInterval = 1
+progressLogInterval = 30
+
+#  Watch mode ("--watch INTERVAL"): each component is rescanned every N intervals (components
+#  not listed: every interval). Fast-changing components are rescanned often, IAM rarely.
+watchSchedule = {'EC2': 1, 'Volumes': 1, 'SecurityGroups': 2, 'CloudFormationStacks': 2, 'AMIs': 4, 'Snapshots': 4,
+                 'KeyPairs': 4, 'MetricAlarms': 4, 'CloudWatchLogGroups': 4, 'SNSTopics': 4,
+                 'VPC': 4, 'Subnets': 4, 'RouteTables': 4, 'InternetGateways': 4, 'VPCEndpoints': 4,
+                 'NATGateways': 2, 'ElasticIPs': 4, 'NetworkInterfaces': 4,
+                 'ConfigRules': 8, 'ConfigurationRecorders': 8, 'CloudTrail': 8, 'AssessmentTargets': 8, 'S3': 8,
+                 'Users': 12, 'Groups': 12, 'Policies': 12, 'Roles': 12, 'InstanceProfiles': 12}
+
+#  Server mode ("--serve PORT"): maximum age in seconds of the served inventory; older data is
+#  rescanned in the background on the next request.
+serveCacheTTL = 300
+
+#  AWS connections: seconds to wait for a connection and for a response, and the maximum number of
+#  attempts per API call (first call included). After connBreakerThreshold connection errors to a
+#  service in a region, the remaining components of that service in the region are skipped.
+awsConnectTimeout = 5
+awsReadTimeout = 30
+awsMaxAttempts = 3
+connBreakerThreshold = 2
+
+#  NAT gateway / Elastic IP / network interface teardown: seconds between state polls (one
+#  describe per resource type and region), and maximum number of seconds to wait in a region.
+netPollInterval = 10
+netTimeout = 900
+
+#  Volume teardown: seconds between volume state polls (one describe_volumes per region), and
+#  maximum number of seconds to wait for a region's volumes to become available.
+volPollInterval = 5
+volTimeout = 300
+
+#  Delete journal: maximum number of seconds between fsyncs of the "done" records (each record is
+#  flushed as it's written; the plan is always fsync'd before the first delete).
+journalSyncInterval = 1
+
+#  Account/region metadata cache (regions, account alias, service regions), per AWS account:
+#  file name, and maximum age in seconds before it's reloaded from AWS.
+metaCacheFile = '~/.aws_cleanup_cache.json'
+metaCacheTTL = 86400
+
+#  Deadline ("--deadline MINUTES"): components scanned first, each in all regions (the others follow),
+#  so a run cut short still finds - and deletes - the items that cost money. Keep AMIs before
+#  Snapshots (an AMI's snapshots are only deleted with it). No new scan or delete stage is started
+#  once less than deadlineReserve seconds are left, to finish the ones in progress.
+deadlinePriority = ['EC2', 'NATGateways', 'Volumes', 'ElasticIPs', 'AMIs', 'Snapshots', 'VPCEndpoints', 'S3', 'CloudFormationStacks']
+deadlineReserve = 60
+
 componentDef = namedtuple("componentDef", ['compName', 'compDelete', 'itemsKeep'])
 componentDef.__new__.__defaults__ = (None, None, ())
 class awsComponentClass:
@@ -41,6 +105,9 @@ class awsComponentClass:
     #  NOTE: Changing compDelete = False for Volumes will not have any affect on volumes attached
     #        to an EC2 instance. When the EC2 instance is deleted, the volume will automatically be dropped.
     self.Volumes = componentDef(compName = 'Volumes', compDelete=True )
+    #  AMIs and EBS snapshots owned by the account. Snapshots backing an AMI that isn't deleted are kept.
+    self.AMIs = componentDef(compName = 'AMIs', compDelete=True )
+    self.Snapshots = componentDef(compName = 'Snapshots', compDelete=True )
     self.KeyPairs = componentDef(compName = 'Key Pairs', compDelete=True, itemsKeep=() )
     self.MetricAlarms = componentDef(compName = 'Metric Alarms', compDelete=True, itemsKeep=() )
     self.ConfigRules = componentDef(compName = 'Config Rules', compDelete=True, itemsKeep=() )
@@ -55,6 +122,11 @@ class awsComponentClass:
     self.Subnets = componentDef(compName = 'Subnets (non-default)', compDelete=True)
     self.InternetGateways = componentDef(compName = 'Internet Gateways', compDelete=True)
     self.RouteTables = componentDef(compName = 'Route Tables', compDelete=True)
+    #  NAT gateways, Elastic IPs and network interfaces not attached to an EC2 instance. These block
+    #  the Subnet, Internet Gateway and VPC deletes.
+    self.NATGateways = componentDef(compName = 'NAT Gateways', compDelete=True )
+    self.ElasticIPs = componentDef(compName = 'Elastic IPs', compDelete=True )
+    self.NetworkInterfaces = componentDef(compName = 'Network Interfaces', compDelete=True )
     self.VPCEndpoints = componentDef(compName = 'VPC Endpoints', compDelete=True, itemsKeep=() ) 	#itemsKeep=('vpce-....') - list of Endpoint IDs
     self.Users = componentDef(compName = 'User', compDelete=True, itemsKeep=() ) 	#itemsKeep=('Username1','Username2',...) 
     self.Groups = componentDef(compName = 'Group', compDelete=True, itemsKeep=() ) 	#itemsKeep=('GroupName1', 'GroupName2', ...)
@@ -0,0 +1,100 @@
+#  conftest.py - aws_cleanup.py is a script (it parses arguments and connects to AWS when run),
+#    so the tests load its definitions instead of importing it: the imports, classes, functions
+#    and the component tables below are executed into a namespace, with botocore's exceptions
+#    stubbed (boto3 isn't needed). Tests set the module globals a function uses (args,
+#    awsClient, componentRpt, ...) as attributes of the namespace.
+import ast
+import os
+import sys
+import threading
+import types
+import pytest
+
+packageDir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, packageDir)
+import aws_cleanup_import
+
+#  Module-level assignments executed besides the definitions.
+assignNames = {'scriptArgsTuple', 'awsConnErrors', 'awsComponent', 'componentService', 'summarySource', 'verifySource', 'awsComponentGlobal', 'preflightSkip'}
+
+class ClientError(Exception):
+  #  Same shape as botocore.exceptions.ClientError.
+  def __init__(self, parResponse, parOperation):
+    self.response = parResponse
+    super().__init__('An error occurred ({0}) when calling the {1} operation'.format(parResponse['Error']['Code'], parOperation))
+
+class EndpointConnectionError(Exception): pass
+class ConnectTimeoutError(Exception): pass
+class ReadTimeoutError(Exception): pass
+class NoCredentialsError(Exception): pass
+
+def scriptCode():
+  #  Compiled once; each test gets a fresh namespace.
+  if scriptCode.code is None:
+    scriptCode.code = compile(ast.Module(body=list(scriptNodes()), type_ignores=[]), 'aws_cleanup.py', 'exec')
+  return scriptCode.code
+scriptCode.code = None
+
+def scriptNodes():
+  with open(os.path.join(packageDir, 'aws_cleanup.py')) as scriptFile:
+    scriptTree = ast.parse(scriptFile.read())
+  for node in scriptTree.body:
+    if isinstance(node, (ast.Import, ast.ImportFrom)):
+      moduleName = node.module if isinstance(node, ast.ImportFrom) else node.names[0].name
+      if not moduleName.startswith(('boto3', 'botocore', 'aws_cleanup_import')):
+        yield node
+    elif isinstance(node, (ast.FunctionDef, ast.ClassDef)):
+      yield node
+    elif isinstance(node, ast.Assign) and any(isinstance(x, ast.Name) and x.id in assignNames for x in node.targets):
+      yield node
+
+class scriptNamespace(dict):
+  #  The script's globals; attribute access reads and sets them.
+  __getattr__ = dict.__getitem__
+  __setattr__ = dict.__setitem__
+
+class stubRecorder:
+  #  Stands in for metrics, trace, progress and the delete journal: every method call is accepted and ignored.
+  def __getattr__(self, parName):
+    return lambda *args, **kwargs: None
+
+@pytest.fixture
+def script():
+  ns = scriptNamespace(__name__='aws_cleanup', ClientError=ClientError, EndpointConnectionError=EndpointConnectionError,
+                       ConnectTimeoutError=ConnectTimeoutError, ReadTimeoutError=ReadTimeoutError, NoCredentialsError=NoCredentialsError)
+  ns.update((x, getattr(aws_cleanup_import, x)) for x in dir(aws_cleanup_import) if not x.startswith('_'))
+  exec(scriptCode(), ns)
+  ns.componentKey = dict((y, x) for x, y in vars(ns.awsComponent).items() if type(y) is ns.componentDef)
+  ns.aws_cleanupArg = ns.scriptArgsTuple(inv=False, vpc_rebuild=False, del_all=True, ignore_conn_err=False, keepTag=ns.constantKeepTag)
+  ns.shutdownEvent = threading.Event()
+  ns.termTrack = ns.termTrackClass()
+  ns.invTrack = ns.invTrackClass()
+  ns.connBreaker = ns.connBreakerClass(ns.connBreakerThreshold)
+  ns.progress = ns.metrics = ns.trace = stubRecorder()
+  ns.deleteJournal = stubRecorder()
+  ns.preflightSkip = set()
+  return ns
+
+class stubClient:
+  #  stubClient - stands in for a boto3 client: operation results come from parResults
+  #    ({operation: function(**params) -> response}), and every call is kept in calls.
+  def __init__(self, parResults, parPaginate=True):
+    self.results = parResults
+    self.paginate = parPaginate
+    self.calls = []
+
+  def can_paginate(self, parOperation):
+    return self.paginate
+
+  def get_paginator(self, parOperation):
+    return types.SimpleNamespace(paginate=lambda **kwargs: [getattr(self, parOperation)(**kwargs)])
+
+  def __getattr__(self, parOperation):
+    def call(**kwargs):
+      self.calls.append((parOperation, kwargs))
+      return self.results[parOperation](**kwargs)
+    return call
+
+@pytest.fixture
+def client():
+  return stubClient
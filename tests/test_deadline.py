@@ -0,0 +1,48 @@
+#  test_deadline.py - "--deadline MINUTES" (deadlineClass).
+import time
+
+def test_deadline_off(script):
+  deadline = script.deadlineClass(None)
+  assert not deadline.expired()
+  assert deadline.startStage(script.awsComponent.EC2)
+  assert deadline.report('inventory') == ''
+
+def test_deadline_expired(script, capsys):
+  deadline = script.deadlineClass(10)
+  assert not deadline.expired()
+  #  Inside the reserve (deadlineReserve seconds before the end) nothing new is started.
+  deadline.endTime = time.time() + script.deadlineReserve - 1
+  assert deadline.expired() and deadline.expired()
+  assert capsys.readouterr().out.count('DEADLINE:') == 1
+
+def test_deadline_order(script):
+  script.componentRpt = dict((x, None) for x in (script.awsComponent.Users, script.awsComponent.EC2, script.awsComponent.S3, script.awsComponent.KeyPairs))
+  script.deadlinePriority = ['S3', 'EC2', 'NotAComponent']
+  assert script.deadlineClass(10).order() == [script.awsComponent.S3, script.awsComponent.EC2, script.awsComponent.Users, script.awsComponent.KeyPairs]
+
+def test_deadline_startStage(script):
+  awsComponent = script.awsComponent
+  for id in ('vol-1', 'vol-2'):
+    ign = script.termTrack.add(awsComponent.Volumes, 'us-west-2', id)
+  ign = script.termTrack.add(awsComponent.EC2, 'us-west-2', 'i-1')
+  deadline = script.deadlineClass(10)
+  assert deadline.startStage(awsComponent.Volumes, awsComponent.EC2)
+  assert len(script.termTrack) == 3
+  deadline.endTime = time.time()
+  assert not deadline.startStage(awsComponent.Volumes, awsComponent.Snapshots)
+  assert len(script.termTrack) == 1 and awsComponent.Volumes not in script.termTrack
+  assert dict(deadline.undone) == {('delete', awsComponent.Volumes): [2]}
+
+def test_deadline_report(script):
+  awsComponent = script.awsComponent
+  deadline = script.deadlineClass(5)
+  deadline.skipScan(awsComponent.EC2, 'us-east-1')
+  deadline.skipScan(awsComponent.EC2, 'us-west-2')
+  deadline.skipScan(awsComponent.Users, None)
+  deadline.undone[('delete', awsComponent.Volumes)].append(3)
+  inventoryReport = deadline.report('inventory')
+  assert 'DEADLINE (5 minutes) - inventory not started' in inventoryReport
+  assert '{0} - us-east-1, us-west-2'.format(awsComponent.EC2.compName) in inventoryReport
+  assert '{0} - global'.format(awsComponent.Users.compName) in inventoryReport
+  assert awsComponent.Volumes.compName not in inventoryReport
+  assert '{0} - 3 item(s)'.format(awsComponent.Volumes.compName) in deadline.report('delete')
@@ -0,0 +1,80 @@
+#  test_shard.py - "--shard i/N" work unit split and the "merge" subcommand.
+import argparse
+import json
+import types
+import pytest
+
+def setShard(script, parShard):
+  script.args = types.SimpleNamespace(shard=parShard)
+  script.currentAccountId = '123456789012'
+
+def test_shardArg(script):
+  assert script.shardArg('2/4') == (2, 4)
+  for badValue in ('0/4', '5/4', 'x/4', '2'):
+    with pytest.raises(argparse.ArgumentTypeError):
+      ign = script.shardArg(badValue)
+
+def test_shardOwns_split(script):
+  workUnits = [(currentRegion, compDef) for currentRegion in ('us-east-1', 'us-west-2', 'eu-west-1', None) for compDef in script.componentKey]
+  ownerList = []
+  for workUnit in workUnits:
+    owners = []
+    for shardIndex in range(1, 4):
+      setShard(script, (shardIndex, 3))
+      if script.shardOwns(*workUnit):
+        owners.append(shardIndex)
+    assert len(owners) == 1
+    ownerList.append(owners[0])
+  #  Every shard gets work, and the split is the same when it's computed again.
+  assert set(ownerList) == {1, 2, 3}
+  setShard(script, (ownerList[0], 3))
+  assert script.shardOwns(*workUnits[0])
+  setShard(script, None)
+  assert all(script.shardOwns(*x) for x in workUnits)
+
+def writeShardFile(parPath, parHeader, parRecords=()):
+  header = {'type': 'shard', 'shard': 1, 'shards': 2, 'account': '123456789012', 'del': True, 'vpc_rebuild': False,
+            'regions': [], 'VPCNoDefaultByRegion': [], 'currentUserArnDel': False, 'connFailed': []}
+  header.update(parHeader)
+  parPath.write_text('\n'.join(json.dumps(x) for x in [header] + list(parRecords)) + '\n')
+  return str(parPath)
+
+def test_readShards_checks(script, tmp_path):
+  shard1 = writeShardFile(tmp_path / 's1', {'shard': 1})
+  shard2 = writeShardFile(tmp_path / 's2', {'shard': 2})
+  assert [x[0]['shard'] for x in script.readShards([shard1, shard2])] == [1, 2]
+  with pytest.raises(SystemExit):
+    ign = script.readShards([shard1])
+  with pytest.raises(SystemExit):
+    ign = script.readShards([shard1, writeShardFile(tmp_path / 's3', {'shard': 2, 'account': '210987654321'})])
+  with pytest.raises(SystemExit):
+    ign = script.readShards([shard1, shard1])
+
+class stubRpt:
+  def __init__(self):
+    self.lines = []
+
+  def addLine(self, *parCols):
+    self.lines.append(parCols)
+
+def test_mergeShards_plan(script, tmp_path):
+  script.componentRpt = dict((x, stubRpt()) for x in script.componentKey)
+  script.inventoryReport = lambda: ''
+  script.VPCNoDefaultByRegion = []
+  script.currentUserArnDel = False
+  shard1 = writeShardFile(tmp_path / 's1', {'shard': 1, 'regions': ['us-east-1'], 'VPCNoDefaultByRegion': ['us-east-1']},
+                          [{'type': 'item', 'component': 'EC2', 'region': 'us-east-1', 'id': 'i-1', 'keep': False, 'row': ['us-east-1', 'i-1']},
+                           {'type': 'item', 'component': 'EC2', 'region': 'us-east-1', 'id': 'i-2', 'keep': True, 'row': ['us-east-1', 'i-2']},
+                           {'type': 'plan', 'component': 'EC2', 'region': 'us-east-1', 'id': 'i-1', 'fields': {'display': 'web', 'vpcId': None, 'isDefault': False, 'isAwsService': False, 'state': 'planned'}}])
+  shard2 = writeShardFile(tmp_path / 's2', {'shard': 2, 'regions': [], 'connFailed': [['S3', None, 'EndpointConnectionError']]},
+                          [{'type': 'item', 'component': 'Users', 'region': None, 'id': 'bob', 'keep': False, 'row': ['bob']},
+                           {'type': 'plan', 'component': 'Users', 'region': None, 'id': 'bob', 'fields': {'display': 'bob', 'vpcId': None, 'isDefault': False, 'isAwsService': False, 'state': 'planned'}}])
+  script.mergeShards(script.readShards([shard1, shard2]), str(tmp_path / 'plan'))
+  #  With --del, only the items planned for deletion are in the report.
+  assert script.componentRpt[script.awsComponent.EC2].lines == [(True, 'us-east-1', 'i-1')]
+  assert script.componentRpt[script.awsComponent.Users].lines == [(False, 'bob')]
+  assert script.connBreaker.failed == {(script.awsComponent.S3, None): 'EndpointConnectionError'}
+  header, termTrack = script.deleteJournalClass(str(tmp_path / 'plan')).load()
+  assert header['merged'] is True and header['regions'] == ['us-east-1'] and header['vpcRebuildRegions'] == ['us-east-1']
+  assert sorted(x.id for x in termTrack.records()) == ['bob', 'i-1']
+  assert termTrack.lookup(script.awsComponent.EC2, 'us-east-1', 'i-1').display == 'web'
@@ -0,0 +1,167 @@
+#  test_teardown.py - CloudFormation delete ordering, and the describe parameters of the
+#    network teardown and the delete verification, against stubbed boto3 clients.
+import pytest
+
+def stackSummary(parName, parStatus='CREATE_COMPLETE', **parFields):
+  return dict({'StackId': 'id-' + parName, 'StackName': parName, 'StackStatus': parStatus}, **parFields)
+
+def cfnClient(parClientClass, parStacks, parExports, parImports):
+  #  parStacks: {StackId: summary}; a deleted stack (and its nested stacks) is DELETE_COMPLETE
+  #  at the next list_stacks.
+  def deleteStack(StackName):
+    deletedIds.append(StackName)
+    return {}
+  def listStacks():
+    for stackSummary in parStacks.values():
+      if stackSummary['StackId'] in deletedIds or stackSummary.get('RootId') in deletedIds:
+        stackSummary['StackStatus'] = 'DELETE_COMPLETE'
+    return {'StackSummaries': [dict(x) for x in parStacks.values()]}
+  def listImports(ExportName):
+    if not parImports.get(ExportName):
+      raise ClientError({'Error': {'Code': 'ValidationError'}}, 'ListImports')
+    return {'Imports': parImports[ExportName]}
+  deletedIds = []
+  ClientError = cfnClient.ClientError
+  client = parClientClass({'list_stacks': listStacks, 'list_exports': lambda: {'Exports': parExports},
+                           'list_imports': listImports, 'delete_stack': deleteStack})
+  return client, deletedIds
+
+@pytest.fixture
+def cfnScript(script, client):
+  cfnClient.ClientError = script.ClientError
+  script.cfnPollInterval = 0
+  script.markDeleted = lambda parComponent, parRegion, parId: script.deletedList.append(parId)
+  script.deletedList = []
+  return script
+
+def stackRecords(script, *parNames):
+  for stackName in parNames:
+    ign = script.termTrack.add(script.awsComponent.CloudFormationStacks, 'us-west-2', 'id-' + stackName, display=stackName)
+  return script.termTrack.byRegion(script.awsComponent.CloudFormationStacks)
+
+def test_cfn_importer_first(cfnScript, client):
+  stacks = dict((x['StackId'], x) for x in (stackSummary('a-export'), stackSummary('b-import'), stackSummary('c-other')))
+  cfnClientStub, deletedIds = cfnClient(client, stacks, [{'ExportingStackId': 'id-a-export', 'Name': 'VpcId'}], {'VpcId': ['b-import']})
+  cfnScript.awsClient = lambda parService, parRegion=None: cfnClientStub
+  cfnTeardown = cfnScript.cfnTeardownClass(stackRecords(cfnScript, 'a-export', 'b-import', 'c-other'))
+  cfnTeardown.teardownRegion('us-west-2')
+  #  The exporting stack is only deleted once the importing stack is gone.
+  assert deletedIds.index('id-b-import') < deletedIds.index('id-a-export')
+  assert sorted(cfnScript.deletedList) == ['id-a-export', 'id-b-import', 'id-c-other']
+  assert cfnTeardown.regionDone['us-west-2'].is_set()
+
+def test_cfn_kept_importer_nested(cfnScript, client, capsys):
+  stacks = dict((x['StackId'], x) for x in (stackSummary('a-export'), stackSummary('kept'), stackSummary('root'),
+                                             stackSummary('root-nested', ParentId='id-root', RootId='id-root')))
+  cfnClientStub, deletedIds = cfnClient(client, stacks, [{'ExportingStackId': 'id-a-export', 'Name': 'VpcId'}], {'VpcId': ['kept']})
+  cfnScript.awsClient = lambda parService, parRegion=None: cfnClientStub
+  cfnScript.cfnTeardownClass(stackRecords(cfnScript, 'a-export', 'root', 'root-nested')).teardownRegion('us-west-2')
+  #  An export used by a stack that's kept holds the exporter back; nested stacks go with their root.
+  assert deletedIds == ['id-root']
+  assert sorted(cfnScript.deletedList) == ['id-root', 'id-root-nested']
+  assert 'exports values used by stack(s) not in-scope for deletion: kept' in capsys.readouterr().out
+
+def test_cfn_worker_errors(cfnScript, client, capsys):
+  #  An AWS error ends the region's teardown with a message; any other error is raised by
+  #  waitRegion, in the thread waiting for the region.
+  def listStacks():
+    raise listError
+  cfnClientStub = client({'list_stacks': listStacks})
+  cfnScript.awsClient = lambda parService, parRegion=None: cfnClientStub
+  listError = cfnScript.ClientError({'Error': {'Code': 'AccessDenied'}}, 'ListStacks')
+  cfnTeardown = cfnScript.cfnTeardownClass(stackRecords(cfnScript, 'a'))
+  cfnTeardown.start()
+  cfnTeardown.waitRegion('us-west-2')
+  assert 'teardown stopped: An error occurred (AccessDenied)' in capsys.readouterr().out
+  listError = KeyError('StackSummaries')
+  cfnTeardown = cfnScript.cfnTeardownClass(stackRecords(cfnScript, 'a'))
+  cfnTeardown.start()
+  with pytest.raises(KeyError):
+    cfnTeardown.waitRegion('us-west-2')
+
+#  DescribeNatGateways takes "Filter"; the other EC2 describe calls take "Filters".
+netDescribeParams = [('describe_nat_gateways', 'NatGateways', 'Filter', 'nat-gateway-id'),
+                     ('describe_addresses', 'Addresses', 'Filters', 'allocation-id'),
+                     ('describe_network_interfaces', 'NetworkInterfaces', 'Filters', 'network-interface-id')]
+
+@pytest.mark.parametrize('paginate', [True, False])
+@pytest.mark.parametrize('operation,resultKey,filterParam,filterName', netDescribeParams)
+def test_net_describe_params(script, client, operation, resultKey, filterParam, filterName, paginate):
+  def describeCall(**parParams):
+    assert list(parParams) == [filterParam]
+    assert parParams[filterParam][0]['Name'] == filterName
+    return {resultKey: [{'Id': x} for x in parParams[filterParam][0]['Values']]}
+  ec2Client = client({operation: describeCall}, paginate)
+  idList = ['id-{0}'.format(x) for x in range(450)]
+  netTeardown = script.netTeardownClass({}, {}, {}, None)
+  assert [x['Id'] for x in netTeardown.describe(ec2Client, operation, idList)] == idList
+  assert [len(x[1][filterParam][0]['Values']) for x in ec2Client.calls] == [200, 200, 50]
+
+def test_net_eni_not_released(script, client, capsys):
+  #  An interface held by something this run doesn't delete (a kept load balancer) is reported
+  #  and skipped at the first poll instead of being polled until netTimeout.
+  awsComponent = script.awsComponent
+  script.netPollInterval = script.netTimeout = 0
+  script.markDeleted = lambda parComponent, parRegion, parId: deletedList.append(parId)
+  deletedList = []
+  ign = script.termTrack.add(awsComponent.EC2, 'us-west-2', 'i-term')
+  for id in ('eni-elb', 'eni-free', 'eni-instance'):
+    ign = script.termTrack.add(awsComponent.NetworkInterfaces, 'us-west-2', id)
+  interfaceList = [{'NetworkInterfaceId': 'eni-elb', 'Status': 'in-use', 'RequesterId': 'amazon-elb', 'Attachment': {}},
+                   {'NetworkInterfaceId': 'eni-free', 'Status': 'available'},
+                   {'NetworkInterfaceId': 'eni-instance', 'Status': 'in-use', 'Attachment': {'InstanceId': 'i-term'}}]
+  ec2Client = client({'describe_network_interfaces': lambda Filter=None, Filters=None: {'NetworkInterfaces': interfaceList},
+                      'delete_network_interface': lambda NetworkInterfaceId: {}})
+  script.awsClient = lambda parService, parRegion=None: ec2Client
+  cfnTeardown = script.cfnTeardownClass({})
+  netTeardown = script.netTeardownClass({}, {}, script.termTrack.byRegion(awsComponent.NetworkInterfaces), cfnTeardown)
+  netTeardown.teardownRegion('us-west-2')
+  netOutput = capsys.readouterr().out
+  assert deletedList == ['eni-free']
+  assert 'eni-elb - in-use, used by amazon-elb' in netOutput
+  #  The interface of the instance being terminated is waited on (here until the timeout).
+  assert 'eni-instance' not in netOutput.split('WARNING')[0] and 'still in use after 0 seconds: eni-instance' in netOutput
+
+#  verifySource parameters by summarySource operation: (parameter, filter name).
+verifyParamTable = {'describe_instances': ('Filters', 'instance-id'), 'describe_security_groups': ('Filters', 'group-id'),
+                    'describe_volumes': ('Filters', 'volume-id'), 'describe_images': ('Filters', 'image-id'),
+                    'describe_snapshots': ('Filters', 'snapshot-id'), 'describe_key_pairs': ('Filters', 'key-name'),
+                    'describe_vpcs': ('Filters', 'vpc-id'), 'describe_route_tables': ('Filters', 'route-table-id'),
+                    'describe_subnets': ('Filters', 'subnet-id'), 'describe_internet_gateways': ('Filters', 'internet-gateway-id'),
+                    'describe_vpc_endpoints': ('Filters', 'vpc-endpoint-id'), 'describe_nat_gateways': ('Filter', 'nat-gateway-id'),
+                    'describe_addresses': ('Filters', 'allocation-id'), 'describe_network_interfaces': ('Filters', 'network-interface-id'),
+                    'describe_alarms': ('AlarmNames', None)}
+
+def test_verify_params(script):
+  assert sorted(script.summarySource[x][1] for x in script.verifySource) == sorted(verifyParamTable)
+  for compDef in script.verifySource:
+    service, operation, opParams = script.summarySource[compDef][:3]
+    paramName, filterName = verifyParamTable[operation]
+    expectParams = dict(opParams, **{paramName: [{'Name': filterName, 'Values': ['x-1']}] if filterName else ['x-1']})
+    assert script.verifyParams(compDef, ['x-1']) == expectParams, operation
+  assert script.verifyParams(script.awsComponent.AMIs, ['ami-1'])['Owners'] == ['self']
+
+def test_verify_gone_states(script, client, capsys):
+  awsComponent = script.awsComponent
+  for id in ('vpce-deleting', 'vpce-deleted', 'vpce-available', 'vpce-missing'):
+    ign = script.termTrack.add(awsComponent.VPCEndpoints, 'us-west-2', id)
+  for id in ('vol-deleting', 'vol-in-use'):
+    ign = script.termTrack.add(awsComponent.Volumes, 'us-west-2', id)
+  ec2Client = client({'describe_vpc_endpoints': lambda Filters: {'VpcEndpoints': [{'VpcEndpointId': 'vpce-deleting', 'State': 'Deleting'},
+                                                                                  {'VpcEndpointId': 'vpce-deleted', 'State': 'Deleted'},
+                                                                                  {'VpcEndpointId': 'vpce-available', 'State': 'Available'}]},
+                      'describe_volumes': lambda Filters: {'Volumes': [{'VolumeId': 'vol-deleting', 'State': 'deleting'},
+                                                                       {'VolumeId': 'vol-in-use', 'State': 'in-use'}]}})
+  script.awsClient = lambda parService, parRegion=None: ec2Client
+  script.verifyDeletes()
+  verifyOutput = capsys.readouterr().out
+  assert sorted(x.split()[-1] for x in verifyOutput.splitlines() if 'STILL PRESENT' in x) == ['vol-in-use', 'vpce-available']
+  assert '6 items checked with 2 API calls' in verifyOutput
+
+def test_imageDelete(script):
+  #  The snapshot decision comes from the AMI itself, scanned or not in this run.
+  assert script.imageDelete({'ImageId': 'ami-1', 'State': 'available'})
+  assert not script.imageDelete({'ImageId': 'ami-1', 'State': 'available', 'Tags': [{'Key': 'Keep', 'Value': ''}]})
+  assert not script.imageDelete({'ImageId': 'ami-1', 'State': 'deregistered'})
+  script.preflightSkip.add(script.awsComponent.AMIs)
+  assert not script.imageDelete({'ImageId': 'ami-1', 'State': 'available'})
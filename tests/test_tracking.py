@@ -0,0 +1,116 @@
+#  test_tracking.py - termTrackClass, invTrackClass (scan commits) and deleteJournalClass (plan, done
+#    and --resume replay).
+import pytest
+
+def test_termTrack_add_count(script):
+  termTrack, awsComponent = script.termTrackClass(), script.awsComponent
+  ign = termTrack.add(awsComponent.EC2, 'us-west-2', 'i-1')
+  ign = termTrack.add(awsComponent.EC2, 'us-east-1', 'i-2', display='web')
+  ign = termTrack.add(awsComponent.EC2, 'us-east-1', 'i-2', display='web2')
+  ign = termTrack.add(awsComponent.Users, None, 'alice')
+  assert len(termTrack) == 3
+  assert termTrack.count(awsComponent.EC2) == 2
+  assert termTrack.lookup(awsComponent.EC2, 'us-east-1', 'i-2').display == 'web2'
+  assert termTrack.lookup(awsComponent.EC2, 'us-west-2', 'i-1').display == 'i-1'
+  assert awsComponent.Users in termTrack and awsComponent.S3 not in termTrack
+  assert list(termTrack.ids(awsComponent.Users)) == ['alice']
+  assert sorted(x.id for x in termTrack.records()) == ['alice', 'i-1', 'i-2']
+
+def test_termTrack_byRegion_sorted(script):
+  termTrack, awsComponent = script.termTrackClass(), script.awsComponent
+  for currentRegion in ('us-west-2', None, 'eu-west-1'):
+    ign = termTrack.add(awsComponent.Roles, currentRegion, 'x')
+  assert list(termTrack.byRegion(awsComponent.Roles)) == [None, 'eu-west-1', 'us-west-2']
+  assert termTrack.byRegion(awsComponent.S3) == {}
+
+def test_termTrack_setState_drop(script):
+  termTrack, awsComponent = script.termTrackClass(), script.awsComponent
+  ign = termTrack.add(awsComponent.EC2, 'us-west-2', 'i-1')
+  ign = termTrack.add(awsComponent.Volumes, 'us-west-2', 'vol-1')
+  ign = termTrack.add(awsComponent.Volumes, 'us-east-1', 'vol-2')
+  termTrack.setState(awsComponent.EC2, 'us-west-2', 'i-1', 'terminating')
+  termTrack.setState(awsComponent.EC2, 'us-west-2', 'i-missing', 'deleted')
+  assert termTrack.lookup(awsComponent.EC2, 'us-west-2', 'i-1').state == 'terminating'
+  termTrack.drop(awsComponent.Volumes)
+  termTrack.drop(awsComponent.S3)
+  assert len(termTrack) == 1
+  assert termTrack.components() == [awsComponent.EC2]
+
+def test_invTrack_failed_scan(script, monkeypatch):
+  invTrack, awsComponent = script.invTrackClass(), script.awsComponent
+  monkeypatch.setattr('time.time', lambda: 100)
+  invTrack.begin(awsComponent.EC2, 'us-west-2')
+  invTrack.add(awsComponent.EC2, 'us-west-2', 'i-1', False, [False, 'i-1'])
+  invTrack.begin(awsComponent.EC2, 'us-east-1')
+  ign = invTrack.commit()
+  #  A failed scan keeps the previous items, and counts for the age (the server cache
+  #  isn't stale on every request while an endpoint is down), flagged until a scan succeeds.
+  monkeypatch.setattr('time.time', lambda: 200)
+  invTrack.begin(awsComponent.EC2, 'us-west-2')
+  invTrack.fail(awsComponent.EC2, 'us-west-2')
+  invTrack.begin(awsComponent.EC2, 'us-east-1')
+  invTrack.fail(awsComponent.Users, None)
+  assert invTrack.commit() == []
+  assert list(invTrack.items[(awsComponent.EC2, 'us-west-2')]) == ['i-1']
+  assert invTrack.oldestScan() == 200
+  assert invTrack.failedScans() == [{'component': 'EC2', 'region': 'us-west-2'}, {'component': 'Users', 'region': None}]
+  invTrack.begin(awsComponent.EC2, 'us-west-2')
+  assert invTrack.commit() == [('removed', awsComponent.EC2, 'us-west-2', 'i-1')]
+  assert invTrack.failedScans() == [{'component': 'Users', 'region': None}]
+
+def planJournal(script, parPath):
+  termTrack, awsComponent = script.termTrackClass(), script.awsComponent
+  ign = termTrack.add(awsComponent.EC2, 'us-west-2', 'i-1', display='web', state='terminating')
+  ign = termTrack.add(awsComponent.EC2, 'us-west-2', 'i-2')
+  ign = termTrack.add(awsComponent.VPC, 'us-west-2', 'vpc-1', isDefault=True)
+  ign = termTrack.add(awsComponent.Roles, None, 'role-1', isAwsService=True)
+  journal = script.deleteJournalClass(str(parPath))
+  journal.plan(termTrack, {'regions': ['us-west-2'], 'vpc_rebuild': False})
+  return journal
+
+def test_journal_replay(script, tmp_path):
+  journal = planJournal(script, tmp_path / 'journal')
+  journal.done(script.awsComponent.EC2, 'us-west-2', 'i-2')
+  journal.done(script.awsComponent.Roles, None, 'role-1')
+  header, termTrack = script.deleteJournalClass(str(tmp_path / 'journal')).load()
+  assert header['regions'] == ['us-west-2'] and header['type'] == 'header'
+  assert sorted((script.componentKey[x.component], x.region, x.id) for x in termTrack.records()) == [('EC2', 'us-west-2', 'i-1'), ('VPC', 'us-west-2', 'vpc-1')]
+  #  The fields come back, except the state: a resumed terminate is issued again.
+  assert termTrack.lookup(script.awsComponent.EC2, 'us-west-2', 'i-1').display == 'web'
+  assert termTrack.lookup(script.awsComponent.EC2, 'us-west-2', 'i-1').state == 'planned'
+  assert termTrack.lookup(script.awsComponent.VPC, 'us-west-2', 'vpc-1').isDefault is True
+
+def test_journal_incomplete_plan(script, tmp_path):
+  journalPath = tmp_path / 'journal'
+  journalPath.write_text('{"type": "header"}\n{"type": "plan", "component": "EC2", "region": "us-west-2", "id": "i-1", "fields": {}}\n')
+  with pytest.raises(ValueError):
+    ign = script.deleteJournalClass(str(journalPath)).load()
+
+def test_journal_partial_line(script, tmp_path):
+  journalPath = tmp_path / 'journal'
+  journal = planJournal(script, journalPath)
+  journal.file.close()
+  #  A crash in the middle of a done record: the partial line is ignored, and the next
+  #  run (--resume) appends its records on a new line.
+  with open(str(journalPath), 'a') as journalFile:
+    journalFile.write('{"type": "done", "comp')
+  journal = script.deleteJournalClass(str(journalPath))
+  journal.done(script.awsComponent.EC2, 'us-west-2', 'i-1')
+  header, termTrack = script.deleteJournalClass(str(journalPath)).load()
+  assert sorted(x.id for x in termTrack.records()) == ['i-2', 'role-1', 'vpc-1']
+
+def test_journal_fsync_batched(script, tmp_path, monkeypatch):
+  syncList = []
+  monkeypatch.setattr('os.fsync', lambda parFd: syncList.append(parFd))
+  journal = planJournal(script, tmp_path / 'journal')
+  #  The plan: one fsync for the header and plan records, one for the "planned" record.
+  assert len(syncList) == 2
+  script.journalSyncInterval = 3600
+  for id in ('i-1', 'i-2'):
+    journal.done(script.awsComponent.EC2, 'us-west-2', id)
+  assert len(syncList) == 2
+  journal.sync()
+  assert len(syncList) == 3
+  #  Every record is flushed, synced or not.
+  header, termTrack = script.deleteJournalClass(str(tmp_path / 'journal')).load()
+  assert sorted(x.id for x in termTrack.records()) == ['role-1', 'vpc-1']